@@ -1,59 +1,94 @@
 #!/usr/bin/env python3
 """
 Capture profile dropdown GIF from the actual app.
-Creates a test user and captures high-quality screenshots.
+Reuses a cached session; a test user is only created when there is none.
+
+The interaction is recorded once as Playwright video and the GIF is built
+from the frames of the recording that change (see gifcapture.video), so the
+flow runs at full speed without a screenshot per frame and keeps every step
+of the dropdown's open/hover transitions.
 """
 
 from playwright.sync_api import sync_playwright
 import secrets
+import tempfile
 import time
 import os
 
+from gifcapture import (
+    USER_NAV_MENU,
+    CaptureBrowser,
+    FrameSelector,
+    MenuSnapshot,
+    Readiness,
+    SessionCache,
+    StreamingGifEncoder,
+    VideoClip,
+)
+
 OUTPUT_DIR = "/home/qualia/Desktop/Projects/aiagents/aibossbrainz/docs/demo/gifs"
+BASE_URL = "http://localhost:3000"
+VIEWPORT = {'width': 1400, 'height': 900}
 
 
-def capture_dropdown():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=100)
-        context = browser.new_context(
-            viewport={'width': 1400, 'height': 900},
-            record_video_dir=OUTPUT_DIR
-        )
-        page = context.new_page()
+def sign_up_demo_user(page):
+    """Create a throwaway demo user; falls back to a manual login."""
+    ready = Readiness(page)
+
+    # Generate test user
+    random_suffix = secrets.token_hex(4)
+    email = f"gif-demo-{random_suffix}@test.com"
+    password = "GifDemo123!"
 
-        # Generate test user
-        random_suffix = secrets.token_hex(4)
-        email = f"gif-demo-{random_suffix}@test.com"
-        password = "GifDemo123!"
+    print(f"Creating test user: {email}")
 
-        print(f"Creating test user: {email}")
+    # Go to signup
+    page.goto(f"{BASE_URL}/signup")
+    ready.network_idle()
 
-        # Go to signup
-        page.goto("http://localhost:3000/signup")
-        time.sleep(2)
+    # Fill signup form
+    page.locator('input[name="email"]').fill(email)
+    page.locator('input[name="password"]').fill(password)
 
-        # Fill signup form
-        page.locator('input[name="email"]').fill(email)
-        page.locator('input[name="password"]').fill(password)
+    # Submit
+    page.locator('button:has-text("Create Account"), button[type="submit"]').click()
+    ready.network_idle()
 
-        # Submit
-        page.locator('button:has-text("Create Account"), button[type="submit"]').click()
-        time.sleep(2)
+    # Check if we need to confirm email (skip for demo)
+    # Instead, let's go directly to /new which should trigger auth redirect
+    page.goto(f"{BASE_URL}/new")
+    ready.network_idle()
 
-        # Check if we need to confirm email (skip for demo)
-        # Instead, let's go directly to /new which should trigger auth redirect
-        page.goto("http://localhost:3000/new")
-        time.sleep(3)
+    print(f"Current URL: {page.url}")
 
-        print(f"Current URL: {page.url}")
+    # If redirected to login, we need a different approach
+    if "login" in page.url or "signup" in page.url:
+        print("Auth required - trying direct navigation with manual auth...")
+        print("\n=== MANUAL AUTH REQUIRED ===")
+        print("1. Complete the signup/login in the browser")
+        print("2. Press Enter here when you see the chat interface")
+        input()
 
-        # If redirected to login, we need a different approach
-        if "login" in page.url or "signup" in page.url:
-            print("Auth required - trying direct navigation with manual auth...")
-            print("\n=== MANUAL AUTH REQUIRED ===")
-            print("1. Complete the signup/login in the browser")
-            print("2. Press Enter here when you see the chat interface")
-            input()
+
+def capture_dropdown():
+    gif_path = os.path.join(OUTPUT_DIR, "profile-dropdown.gif")
+    with sync_playwright() as p, tempfile.TemporaryDirectory(prefix='gif-video-') as video_dir:
+        browser = CaptureBrowser(p, slow_mo=100)
+        session = SessionCache(BASE_URL)
+        context = session.new_context(
+            browser,
+            viewport=VIEWPORT,
+            # Record at full size; Playwright scales videos down to 800x800 otherwise
+            record_video_dir=video_dir,
+            record_video_size=VIEWPORT,
+        )
+        page = context.new_page()
+        clip = VideoClip(page)
+        ready = Readiness(page)
+
+        # Sign up a demo user only when there is no cached session
+        session.ensure_logged_in(page, "/new", login=sign_up_demo_user)
+        ready.network_idle()
 
         # Now we should be in the app
         print("Looking for sidebar...")
@@ -64,7 +99,7 @@ def capture_dropdown():
             if sidebar_toggle.is_visible(timeout=3000):
                 print("Opening sidebar...")
                 sidebar_toggle.click()
-                time.sleep(0.5)
+                ready.animations_settled()
         except:
             print("Sidebar already open or no toggle found")
 
@@ -78,66 +113,45 @@ def capture_dropdown():
             browser.close()
             return
 
-        # Capture sequence for GIF
-        frames = []
-        frame_dir = OUTPUT_DIR
-        os.makedirs(frame_dir, exist_ok=True)
-
-        frame_count = 0
+        # Everything until clip.stop() ends up in the GIF
+        clip.start()
 
-        # Helper to capture frame
-        def capture():
-            nonlocal frame_count
-            path = f"{frame_dir}/f{frame_count:03d}.png"
-            page.screenshot(path=path)
-            frames.append(path)
-            frame_count += 1
+        # 1. Initial state
+        time.sleep(0.45)
 
-        # 1. Initial state (3 frames)
-        for _ in range(3):
-            capture()
-            time.sleep(0.15)
-
-        # 2. Click user nav
+        # 2. Click user nav and let the dropdown open
         print("Clicking user nav...")
         user_nav.click()
+        ready.menu_open(USER_NAV_MENU)
         time.sleep(0.4)
 
-        # 3. Dropdown opening (4 frames)
-        for _ in range(4):
-            capture()
-            time.sleep(0.1)
-
-        # 4. Get menu items and hover each
-        menu = page.locator('[data-testid="user-nav-menu"]')
-        menu_items = menu.locator('a, button')
-        count = menu_items.count()
-        print(f"Found {count} menu items")
-
-        for i in range(count):
-            item = menu_items.nth(i)
-            text = item.inner_text()
-            print(f"Hovering item {i}: {text[:30]}...")
-
-            # Hover in (2 frames)
-            item.hover()
-            capture()
-            time.sleep(0.1)
-            capture()
-            time.sleep(0.15)
-
-            # Hold hover (2 frames)
-            capture()
-            time.sleep(0.1)
-            capture()
-            time.sleep(0.1)
-
-        print(f"\nCaptured {len(frames)} frames")
-        print(f"Frames saved to {frame_dir}/")
+        # 3. Get menu items and hover each
+        menu = MenuSnapshot(page)
+        print(f"Found {len(menu.items)} menu items")
+
+        for i, item in enumerate(menu.items):
+            print(f"Hovering item {i}: {item.text[:30]}...")
+            menu.hover(item)
+            time.sleep(0.45)
+
+        clip.stop()
+        # Closing the context finishes the video file
+        context.close()
 
+        print("\nExtracting frames from the recording...")
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        selector = FrameSelector()
+        with StreamingGifEncoder(gif_path, framerate=25) as encoder:
+            clip.encode(encoder, selector)
         browser.close()
 
-        return frames
+    print(selector.report())
+    if not encoder.ok:
+        print("FFmpeg error:", encoder.stderr)
+        return
+    print("\n".join(encoder.report()))
+    print(f"\n✓ GIF created: {gif_path}")
+    return gif_path
 
 
 if __name__ == "__main__":
@@ -1,4 +1,6 @@
-import { mkdirSync } from "node:fs";
+import { spawnSync } from "node:child_process";
+import { mkdirSync, mkdtempSync, rmSync } from "node:fs";
+import { tmpdir } from "node:os";
 import { join } from "node:path";
 import { type Browser, type BrowserContext, chromium } from "playwright";
 
@@ -9,9 +11,42 @@ const GIF_PATH = join(OUTPUT_DIR, "profile-dropdown.gif");
 // Ensure output directory exists
 mkdirSync(OUTPUT_DIR, { recursive: true });
 
+// Build the GIF from the frames of the recording that change: mpdecimate
+// drops near-duplicates, and the kept frames keep their timestamps.
+function gifFromVideo(videoPath: string, start: number, end: number): void {
+	const result = spawnSync(
+		"ffmpeg",
+		[
+			"-hide_banner",
+			"-loglevel",
+			"error",
+			"-ss",
+			start.toFixed(2),
+			"-i",
+			videoPath,
+			"-to",
+			(end - start).toFixed(2),
+			"-filter_complex",
+			"mpdecimate,scale='min(1000,iw)':-1:flags=lanczos,split[a][b];" +
+				"[a]palettegen=max_colors=256[p];[b][p]paletteuse=diff_mode=rectangle",
+			"-fps_mode",
+			"vfr",
+			"-final_delay",
+			"100",
+			"-y",
+			GIF_PATH,
+		],
+		{ stdio: "inherit" },
+	);
+	if (result.status !== 0) {
+		throw new Error(`ffmpeg failed with status ${result.status}`);
+	}
+}
+
 async function captureDropdownGif(): Promise<void> {
 	let browser: Browser | null = null;
 	let context: BrowserContext | null = null;
+	const videoDir = mkdtempSync(join(tmpdir(), "gif-video-"));
 
 	try {
 		console.log("Launching browser...");
@@ -23,12 +58,14 @@ async function captureDropdownGif(): Promise<void> {
 		context = await browser.newContext({
 			viewport: { width: 1200, height: 800 },
 			recordVideo: {
-				dir: OUTPUT_DIR,
+				dir: videoDir,
 				size: { width: 1200, height: 800 },
 			},
 		});
 
 		const page = await context.newPage();
+		// The recording starts with the page; offsets into it are measured from here
+		const recordingStarted = Date.now();
 
 		console.log("Navigating to app...");
 		await page.goto("http://localhost:3000", { waitUntil: "networkidle" });
@@ -63,9 +100,9 @@ async function captureDropdownGif(): Promise<void> {
 		await userNavButton.waitFor({ state: "visible", timeout: 10000 });
 		console.log("User nav button found");
 
-		// Get a screenshot before dropdown opens
-		console.log("Taking screenshot before dropdown...");
-		await page.screenshot({ path: join(OUTPUT_DIR, "dropdown-closed.png") });
+		// Everything from here until clipEnd ends up in the GIF
+		const clipStart = (Date.now() - recordingStarted) / 1000;
+		await page.waitForTimeout(500);
 
 		// Click to open dropdown
 		console.log("Clicking to open dropdown...");
@@ -79,10 +116,6 @@ async function captureDropdownGif(): Promise<void> {
 		// Wait a bit for animations
 		await page.waitForTimeout(500);
 
-		// Take screenshot of open dropdown
-		console.log("Taking screenshot of open dropdown...");
-		await page.screenshot({ path: join(OUTPUT_DIR, "dropdown-open.png") });
-
 		// Highlight each menu item with a delay
 		const menuItems = await dropdownMenu.locator("a, button").all();
 		console.log(`Found ${menuItems.length} menu items`);
@@ -91,22 +124,20 @@ async function captureDropdownGif(): Promise<void> {
 			const item = menuItems[i];
 			await item.hover();
 			await page.waitForTimeout(800);
-			await page.screenshot({
-				path: join(OUTPUT_DIR, `dropdown-item-${i}.png`),
-			});
+		}
+		const clipEnd = (Date.now() - recordingStarted) / 1000;
+
+		// Closing the context finishes the video file
+		const video = page.video();
+		await context.close();
+		context = null;
+		if (!video) {
+			throw new Error("Page was not recorded");
 		}
 
-		console.log("Screenshots captured successfully!");
-		console.log(`\nScreenshots saved to ${OUTPUT_DIR}:`);
-		console.log(`- dropdown-closed.png`);
-		console.log(`- dropdown-open.png`);
-		console.log(
-			`- dropdown-item-0.png to dropdown-item-${menuItems.length - 1}.png`,
-		);
-		console.log("\nTo create a GIF, use ffmpeg like:");
-		console.log(
-			`ffmpeg -framerate 2 -i ${OUTPUT_DIR}/dropdown-item-%d.png -vf "scale=600:-1" ${GIF_PATH}`,
-		);
+		console.log("Building GIF from the recording...");
+		gifFromVideo(await video.path(), clipStart, clipEnd);
+		console.log(`GIF created: ${GIF_PATH}`);
 	} catch (error) {
 		console.error("Error capturing dropdown:", error);
 		throw error;
@@ -117,6 +148,7 @@ async function captureDropdownGif(): Promise<void> {
 		if (browser) {
 			await browser.close();
 		}
+		rmSync(videoDir, { recursive: true, force: true });
 	}
 }
 
@@ -2,23 +2,27 @@
 """Capture profile dropdown screenshot for demo GIF."""
 
 from playwright.sync_api import sync_playwright
-import time
+
+from gifcapture import USER_NAV_MENU, CaptureBrowser, MenuSnapshot, Readiness, RequestFilter
 
 OUTPUT_DIR = "/home/qualia/Desktop/Projects/aiagents/aibossbrainz/docs/demo/gifs"
 
 def capture_dropdown():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
+        browser = CaptureBrowser(p)
         context = browser.new_context(
             viewport={"width": 1200, "height": 800}
         )
+        # Skip analytics and serve static assets from the shared disk cache
+        requests = RequestFilter().install(context)
         page = context.new_page()
+        ready = Readiness(page)
 
         print("Navigating to app...")
         page.goto("http://localhost:3000", wait_until="networkidle")
 
         # Wait for auth check
-        time.sleep(2)
+        ready.network_idle()
 
         # Check if on login page and use guest access
         if "login" in page.url:
@@ -30,7 +34,7 @@ def capture_dropdown():
                 print("No guest button, trying alternative...")
                 # Might need different auth approach
 
-        time.sleep(2)
+        ready.network_idle()
 
         print("Looking for user nav button...")
         # Wait for user nav button
@@ -44,28 +48,26 @@ def capture_dropdown():
         print("Clicking user nav button...")
         page.click('[data-testid="user-nav-button"]')
 
-        # Wait for dropdown menu
-        page.wait_for_selector('[data-testid="user-nav-menu"]', state="visible", timeout=5000)
-        time.sleep(0.5)  # Wait for animation
+        # Wait for dropdown menu to finish opening
+        ready.menu_open(USER_NAV_MENU)
 
         # Screenshot with dropdown open
         page.screenshot(path=f"{OUTPUT_DIR}/dropdown-open.png")
         print("Screenshot saved: dropdown-open.png")
 
         # Hover over each menu item
-        menu_items = page.locator('[data-testid="user-nav-menu"] a, [data-testid="user-nav-menu"] button')
-        count = menu_items.count()
-        print(f"Found {count} menu items")
-
-        for i in range(count):
-            item = menu_items.nth(i)
-            item.hover()
-            time.sleep(0.3)
+        menu = MenuSnapshot(page)
+        print(f"Found {len(menu.items)} menu items")
+
+        for i, item in enumerate(menu.items):
+            menu.hover(item)
+            ready.animations_settled(USER_NAV_MENU)
             page.screenshot(path=f"{OUTPUT_DIR}/dropdown-item-{i}.png")
             print(f"Screenshot saved: dropdown-item-{i}.png")
 
         print("\nAll screenshots captured!")
         print(f"Saved to {OUTPUT_DIR}/")
+        print(f"Network: {requests.report()}")
         print("\nTo create GIF:")
         print(f"ffmpeg -framerate 3 -i {OUTPUT_DIR}/dropdown-item-%d.png -vf 'scale=600:-1:flags=lanczos' {OUTPUT_DIR}/profile-dropdown.gif")
 
@@ -0,0 +1,83 @@
+"""Shared capture helpers for the demo GIF scripts in this directory."""
+
+from gifcapture.backends import (
+    PollingBackend,
+    ScreencastBackend,
+    VirtualTimeBackend,
+    capture_backend,
+    launch_options,
+)
+from gifcapture.browser import CaptureBrowser
+from gifcapture.capture import BackgroundFrameWriter, CaptureEngine
+from gifcapture.dedupe import DuplicateFrameCollapser
+from gifcapture.dom import (
+    USER_NAV_MENU,
+    DomElement,
+    MenuSnapshot,
+    discover_elements,
+    looks_like_plan_card,
+    unique_by_position,
+)
+from gifcapture.encoder import StreamingGifEncoder, encode_frames
+from gifcapture.formats import FORMATS, encode_formats
+from gifcapture.har import HarArchive, har_mode
+from gifcapture.manifest import FrameManifest
+from gifcapture.readiness import Readiness
+from gifcapture.redact import Redactor
+from gifcapture.region import CaptureRegion
+from gifcapture.routing import BLOCKED_URLS, RequestFilter
+from gifcapture.scenario import (
+    Scenario,
+    ScenarioError,
+    build_scenario,
+    execute_scenario,
+    load_scenario,
+)
+from gifcapture.scroll import scroll_positions, synthesize_scroll
+from gifcapture.session import SessionCache
+from gifcapture.store import FrameRecorder, FrameStore, RunJournal
+from gifcapture.video import FrameSelector, VideoClip, video_frames
+
+__all__ = [
+    "BLOCKED_URLS",
+    "FORMATS",
+    "USER_NAV_MENU",
+    "BackgroundFrameWriter",
+    "CaptureBrowser",
+    "CaptureEngine",
+    "CaptureRegion",
+    "DomElement",
+    "DuplicateFrameCollapser",
+    "FrameManifest",
+    "FrameRecorder",
+    "FrameSelector",
+    "FrameStore",
+    "HarArchive",
+    "MenuSnapshot",
+    "PollingBackend",
+    "Readiness",
+    "Redactor",
+    "RequestFilter",
+    "RunJournal",
+    "Scenario",
+    "ScenarioError",
+    "ScreencastBackend",
+    "SessionCache",
+    "StreamingGifEncoder",
+    "VideoClip",
+    "VirtualTimeBackend",
+    "build_scenario",
+    "capture_backend",
+    "discover_elements",
+    "encode_formats",
+    "encode_frames",
+    "execute_scenario",
+    "har_mode",
+    "launch_options",
+    "load_scenario",
+    "looks_like_plan_card",
+    "scroll_positions",
+    "synthesize_scroll",
+    "unique_by_position",
+    "video_frames",
+]
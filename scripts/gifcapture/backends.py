@@ -0,0 +1,261 @@
+"""Frame sources for CaptureEngine: polled screenshots, a CDP screencast or
+polled screenshots on Chromium's virtual clock."""
+
+import contextlib
+import functools
+import os
+import time
+
+from gifcapture.region import crop_frame
+
+BACKENDS = ('polling', 'screencast', 'virtual')
+
+# Switches that make headless rendering depend only on virtual time.
+DETERMINISTIC_ARGS = [
+    '--run-all-compositor-stages-before-draw',
+    '--disable-threaded-animation',
+    '--disable-threaded-scrolling',
+    '--disable-checker-imaging',
+]
+
+
+def capture_backend(default='polling'):
+    """Backend selected with the GIF_CAPTURE_BACKEND environment variable."""
+    backend = os.environ.get('GIF_CAPTURE_BACKEND', default)
+    if backend not in BACKENDS:
+        raise ValueError(f"GIF_CAPTURE_BACKEND must be one of {BACKENDS}, got {backend!r}")
+    return backend
+
+
+def launch_options(backend, slow_mo=0):
+    """``chromium.launch()`` keyword arguments suited to a capture backend.
+
+    The virtual-time backend runs headless with no ``slow_mo`` so it can be
+    used as a batch job; the others open a visible window as before.
+    """
+    if backend == 'virtual':
+        return {
+            'headless': True,
+            'args': ['--force-device-scale-factor=1', *DETERMINISTIC_ARGS],
+        }
+    return {
+        'headless': False,
+        'slow_mo': slow_mo,
+        'args': ['--force-device-scale-factor=1'],
+    }
+
+
+class PollingBackend:
+    """Take one ``Page.captureScreenshot`` per ``capture()`` call.
+
+    The CDP call returns base64 text, so the scenario thread only pays for
+    Chromium producing the image; decoding and writing happen in the
+    :class:`~gifcapture.capture.BackgroundFrameWriter`. With a
+    :class:`~gifcapture.region.CaptureRegion` Chromium only renders and
+    encodes the clipped area.
+    """
+
+    # The clock is wall time, so waits on the app must be excluded from
+    # frame durations.
+    clock_counts_waits = True
+
+    def __init__(self, page, writer, image_format='png', quality=None, region=None):
+        self.writer = writer
+        self.region = region
+        self.cdp = page.context.new_cdp_session(page)
+        self.params = {'format': image_format, 'optimizeForSpeed': True}
+        if quality is not None and image_format != 'png':
+            self.params['quality'] = quality
+
+    def start(self):
+        pass
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def clock(self):
+        return time.monotonic()
+
+    def waiting(self):
+        return contextlib.nullcontext()
+
+    def grab(self):
+        params = self.params
+        if self.region is not None:
+            params = {**params, 'clip': self.region.clip()}
+        return self.cdp.send('Page.captureScreenshot', params)['data']
+
+    def capture(self):
+        timestamp = self.clock()
+        return self.writer.submit(self.grab(), timestamp)
+
+    def hold(self, seconds):
+        time.sleep(seconds)
+
+    def stop(self):
+        pass
+
+
+class ScreencastBackend:
+    """Receive frames from ``Page.startScreencast`` as Chromium paints them.
+
+    Each frame is stamped with its compositor timestamp. With ``resample``
+    frames are placed on a fixed ``fps`` grid: the most recent frame is
+    repeated for every tick until the next paint, so the constant-rate GIF
+    encoder plays transitions at their real speed. Without it every paint is
+    submitted once with its timestamp for variable-frame-rate output.
+    ``capture()`` is a no-op because frames are pushed, and
+    ``hold()`` waits through Playwright so screencast events keep being
+    dispatched while the scenario pauses. The screencast can't be clipped,
+    so with a region every frame is cropped in the writer's workers;
+    ``capture()`` re-reads the region's position after layout changes.
+    """
+
+    clock_counts_waits = False
+
+    def __init__(self, page, writer, fps, image_format='png', quality=None,
+                 resample=True, region=None):
+        self.page = page
+        self.writer = writer
+        self.region = region
+        self.resample = resample
+        self.interval = 1 / fps
+        self.timestamps = []
+        self._last_frame = None
+        self._next_tick = None
+        self.params = {'format': image_format}
+        if quality is not None and image_format != 'png':
+            self.params['quality'] = quality
+        viewport = page.viewport_size
+        if viewport:
+            # The limits are in device pixels, like screenshots and scroll
+            # slices; CSS-pixel limits would shrink retina and mobile frames.
+            scale = page.evaluate('window.devicePixelRatio')
+            self.params['maxWidth'] = round(viewport['width'] * scale)
+            self.params['maxHeight'] = round(viewport['height'] * scale)
+        self.cdp = page.context.new_cdp_session(page)
+        self.cdp.on('Page.screencastFrame', self._on_frame)
+
+    def start(self):
+        self.cdp.send('Page.startScreencast', self.params)
+
+    def pause(self):
+        """Stop receiving paints while frames are inserted off-page."""
+        self.cdp.send('Page.stopScreencast')
+
+    def resume(self):
+        self._last_frame = None
+        self._next_tick = None
+        self.start()
+
+    def clock(self):
+        return time.time()
+
+    def waiting(self):
+        return contextlib.nullcontext()
+
+    def capture(self):
+        if self.region is not None:
+            self.region.clip()
+        return True
+
+    def hold(self, seconds):
+        self.page.wait_for_timeout(seconds * 1000)
+
+    def stop(self):
+        self.cdp.send('Page.stopScreencast')
+        if self._last_frame is None or not self.resample:
+            return
+        self._advance(self.clock())
+        if not self.writer.submitted:
+            self.writer.submit(self._last_frame, self._next_tick)
+
+    def _on_frame(self, event):
+        self.cdp.send('Page.screencastFrameAck', {'sessionId': event['sessionId']})
+        stamp = event.get('metadata', {}).get('timestamp') or self.clock()
+        self.timestamps.append(stamp)
+        frame = event['data']
+        if self.region is not None and self.region.view_box is not None:
+            frame = functools.partial(
+                crop_frame, frame, self.region.view_box, event['metadata']['deviceWidth']
+            )
+        if not self.resample:
+            self.writer.submit(frame, stamp)
+            return
+        self._advance(stamp)
+        self._last_frame = frame
+
+    def _advance(self, until):
+        if self._next_tick is None:
+            self._next_tick = until
+            return
+        while self._next_tick < until:
+            self.writer.submit(self._last_frame, self._next_tick)
+            self._next_tick += self.interval
+
+
+class VirtualTimeBackend(PollingBackend):
+    """Polled screenshots on a virtual clock that only moves inside ``hold()``.
+
+    Chromium's virtual time (``Emulation.setVirtualTimePolicy``) stays paused
+    between steps. ``hold(seconds)`` grants exactly that budget and returns
+    once ``Emulation.virtualTimeBudgetExpired`` fires, so page timers and
+    animations run as fast as Chromium can execute them and a long demo
+    renders in a fraction of its wall-clock length. Frame timestamps come
+    from the virtual clock, so every run produces the same timing.
+
+    Readiness waits run inside :meth:`waiting`, which lets virtual time
+    advance freely until the app is ready; that time is not part of the
+    frame timeline.
+    """
+
+    clock_counts_waits = False
+
+    def __init__(self, page, writer, image_format='png', quality=None, region=None,
+                 budget_timeout=30):
+        super().__init__(page, writer, image_format, quality, region)
+        self.page = page
+        self.budget_timeout = budget_timeout
+        self.now = 0.0
+        self._expired = False
+        self.cdp.on('Emulation.virtualTimeBudgetExpired', self._on_expired)
+
+    def start(self):
+        self._set_policy('pause')
+
+    def stop(self):
+        self._set_policy('advance')
+
+    def clock(self):
+        return self.now
+
+    def hold(self, seconds):
+        self._expired = False
+        self._set_policy('pauseIfNetworkFetchesPending', budget=seconds * 1000)
+        deadline = time.monotonic() + self.budget_timeout
+        while not self._expired:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'virtual time budget of {seconds}s did not expire')
+            # Lets Playwright dispatch the CDP event without sleeping in page time.
+            self.page.wait_for_timeout(5)
+        self.now += seconds
+
+    @contextlib.contextmanager
+    def waiting(self):
+        self._set_policy('advance')
+        try:
+            yield
+        finally:
+            self._set_policy('pause')
+
+    def _set_policy(self, policy, budget=None):
+        params = {'policy': policy}
+        if budget is not None:
+            params['budget'] = budget
+        self.cdp.send('Emulation.setVirtualTimePolicy', params)
+
+    def _on_expired(self, event):
+        self._expired = True
@@ -0,0 +1,133 @@
+"""Warm, long-lived Chromium that capture scripts attach to instead of launching.
+
+Start it once (for example at the top of the nightly job)::
+
+    cd scripts && python3 -m gifcapture.browser
+
+and every capture script run afterwards connects to it over CDP, gets a
+fresh isolated context and detaches without closing the browser.
+
+This only saves the browser's startup. Each context starts with an empty
+HTTP cache, so static assets are kept across runs by the disk cache of
+:class:`~gifcapture.routing.RequestFilter` instead, and logins by
+:class:`~gifcapture.session.SessionCache`.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import tempfile
+import time
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import sync_playwright
+
+from gifcapture.backends import launch_options
+from gifcapture.common import cache_dir, write_atomic
+
+ENDPOINT_FILE = cache_dir('GIF_BROWSER_ENDPOINT_FILE', os.path.join('browser', 'endpoint'))
+
+
+def browser_endpoint():
+    """CDP endpoint of the warm browser, if one has been started."""
+    endpoint = os.environ.get('GIF_BROWSER_ENDPOINT')
+    if endpoint:
+        return endpoint
+    if os.path.exists(ENDPOINT_FILE):
+        with open(ENDPOINT_FILE) as f:
+            return f.read().strip() or None
+    return None
+
+
+class CaptureBrowser:
+    """Attach to the warm browser when it is running, otherwise launch one.
+
+    Mirrors the parts of ``Browser`` the scripts use. ``new_context()``
+    always creates a fresh isolated context; ``close()`` closes only those
+    contexts when attached, and the whole browser when it was launched here.
+    """
+
+    def __init__(self, playwright, backend='polling', slow_mo=0, endpoint=None):
+        self.shared = False
+        self.contexts = []
+        endpoint = endpoint or browser_endpoint()
+        if endpoint:
+            try:
+                self.browser = playwright.chromium.connect_over_cdp(endpoint, slow_mo=slow_mo)
+                self.shared = True
+            except PlaywrightError as exc:
+                print(f"Warm browser at {endpoint} unavailable ({exc}); launching a new one")
+        if not self.shared:
+            self.browser = playwright.chromium.launch(**launch_options(backend, slow_mo))
+
+    def new_context(self, **options):
+        context = self.browser.new_context(**options)
+        self.contexts.append(context)
+        return context
+
+    def close(self):
+        # Closing contexts explicitly also flushes HAR recordings
+        for context in self.contexts:
+            try:
+                context.close()
+            except PlaywrightError:
+                pass
+        self.contexts = []
+        if not self.shared:
+            self.browser.close()
+
+
+def _active_port(profile, timeout=10):
+    """The port Chromium listens on, from ``DevToolsActivePort`` in ``profile``."""
+    path = os.path.join(profile, 'DevToolsActivePort')
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with open(path) as f:
+                return int(f.readline())
+        except (FileNotFoundError, ValueError):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Chromium wrote no {path}") from None
+            time.sleep(0.1)
+
+
+def serve(port=0, headed=False):
+    """Run Chromium for capture scripts to attach to until interrupted.
+
+    The CDP endpoint has no authentication and its contexts hold logged-in
+    sessions, so by default Chromium picks a free port and only the
+    endpoint file, readable by its owner alone, says which.
+    """
+    options = launch_options('polling' if headed else 'virtual')
+    options['args'] = [*options['args'], f'--remote-debugging-port={port}']
+    with sync_playwright() as p, tempfile.TemporaryDirectory() as profile:
+        # A throwaway profile, only so the chosen port can be read back;
+        # capture runs bring their own contexts
+        context = p.chromium.launch_persistent_context(profile, **options)
+        endpoint = f'http://127.0.0.1:{_active_port(profile)}'
+        write_atomic(ENDPOINT_FILE, endpoint.encode(), private=True)
+        print(f"Warm browser listening on {endpoint} (Ctrl-C to stop)")
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        idle_page = context.pages[0] if context.pages else context.new_page()
+        try:
+            while True:
+                idle_page.wait_for_timeout(60_000)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(ENDPOINT_FILE):
+                os.remove(ENDPOINT_FILE)
+            context.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=0, help='CDP port (default: any free one)')
+    parser.add_argument('--headed', action='store_true', help='show the browser window')
+    args = parser.parse_args()
+    serve(args.port, args.headed)
+
+
+if __name__ == '__main__':
+    main()
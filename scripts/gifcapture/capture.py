@@ -0,0 +1,287 @@
+"""Frame grabbing with encoding and persistence handed to background workers."""
+
+import base64
+import queue
+import threading
+import time
+
+from gifcapture.backends import PollingBackend, ScreencastBackend, VirtualTimeBackend
+from gifcapture.dedupe import DuplicateFrameCollapser
+from gifcapture.manifest import FrameManifest
+
+
+class BackgroundFrameWriter:
+    """Bounded worker pool that decodes frames and feeds a sink in order.
+
+    ``sink`` is anything with ``write(image_bytes)`` (normally a
+    :class:`~gifcapture.encoder.StreamingGifEncoder`). At most ``max_pending``
+    frames are in flight; once that many are queued, :meth:`submit` either
+    waits for a free slot (``on_full='block'``, counted as delayed) or
+    discards the frame (``on_full='drop'``, counted as dropped).
+
+    Frames carry their capture timestamp, and every written frame is logged
+    in :attr:`manifest`. With ``variable_frame_rate`` each frame is held back
+    until the next one arrives and is written with the real gap between
+    them (divided by ``playback_speed``) as its duration.
+
+    ``transform``, when set, is applied to every accepted frame on the
+    submitting thread, e.g. to queue redaction for the workers. ``step`` is
+    recorded in the manifest with every frame submitted while it is set.
+    """
+
+    def __init__(self, sink, workers=2, max_pending=16, on_full='block',
+                 variable_frame_rate=False, playback_speed=1.0):
+        if on_full not in ('block', 'drop'):
+            raise ValueError(f"on_full must be 'block' or 'drop', got {on_full!r}")
+        self.sink = sink
+        self.on_full = on_full
+        self.variable_frame_rate = variable_frame_rate
+        self.playback_speed = playback_speed
+        self.manifest = FrameManifest()
+        self.time_offset = 0.0
+        self.transform = None
+        self.step = None
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.delayed = 0
+        self.wait_time = 0.0
+        self.error = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._inbox = queue.Queue()
+        self._done = {}
+        self._ready = threading.Condition()
+        self._next_seq = 0
+        self._held = None
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._decode_loop, daemon=True)
+            for _ in range(workers)
+        ]
+        self._sink_thread = threading.Thread(target=self._sink_loop, daemon=True)
+        for thread in self._workers:
+            thread.start()
+        self._sink_thread.start()
+
+    def submit(self, data, timestamp=None, transform=True):
+        """Hand off one frame; returns False if it was dropped.
+
+        ``data`` is base64 text from CDP, encoded image bytes, or a callable
+        that produces image bytes on a worker thread. ``timestamp`` is shifted
+        by :attr:`time_offset`, which tracks frames inserted off the clock.
+        Pass ``transform=False`` for frames that were already processed.
+        """
+        if self.error is not None:
+            raise RuntimeError('frame writer failed') from self.error
+        if not self._slots.acquire(blocking=False):
+            if self.on_full == 'drop':
+                self.dropped += 1
+                return False
+            started = time.monotonic()
+            self._slots.acquire()
+            self.delayed += 1
+            self.wait_time += time.monotonic() - started
+        if transform and self.transform is not None:
+            data = self.transform(data)
+        if timestamp is not None:
+            timestamp += self.time_offset
+        self._inbox.put((self.submitted, data, timestamp, self.step))
+        self.submitted += 1
+        return True
+
+    def close(self, end_timestamp=None):
+        """Wait for every accepted frame to reach the sink.
+
+        ``end_timestamp`` closes the last frame's duration when frames are
+        timed; it never plays for less than one nominal frame.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._inbox.put(None)
+        for thread in self._workers:
+            thread.join()
+        with self._ready:
+            self._done[None] = None
+            self._ready.notify_all()
+        self._sink_thread.join()
+        if self.error is None and self._held is not None:
+            try:
+                self._write_held(end_timestamp, last=True)
+            except Exception as exc:
+                self.error = exc
+        if self.error is None and hasattr(self.sink, 'flush'):
+            self.sink.flush()
+        if self.error is not None:
+            raise RuntimeError('frame writer failed') from self.error
+
+    def report(self):
+        return (
+            f"{self.written} frames written, {self.dropped} dropped, "
+            f"{self.delayed} delayed ({self.wait_time:.2f}s waiting on workers)"
+        )
+
+    def _decode_loop(self):
+        while True:
+            item = self._inbox.get()
+            if item is None:
+                return
+            seq, data, timestamp, step = item
+            try:
+                if callable(data):
+                    frame = data()
+                elif isinstance(data, str):
+                    frame = base64.b64decode(data)
+                else:
+                    frame = data
+            except Exception as exc:
+                frame = exc
+            with self._ready:
+                self._done[seq] = (frame, timestamp, step)
+                self._ready.notify_all()
+
+    def _sink_loop(self):
+        while True:
+            with self._ready:
+                while self._next_seq not in self._done and None not in self._done:
+                    self._ready.wait()
+                if self._next_seq not in self._done:
+                    return
+                frame, timestamp, step = self._done.pop(self._next_seq)
+                self._next_seq += 1
+            try:
+                if isinstance(frame, Exception):
+                    raise frame
+                if self.error is None:
+                    if self._held is not None:
+                        self._write_held(timestamp)
+                    self._held = (frame, timestamp, step)
+            except Exception as exc:
+                self.error = exc
+            finally:
+                self._slots.release()
+
+    def _write_held(self, next_timestamp, last=False):
+        frame, timestamp, step = self._held
+        self._held = None
+        duration = None
+        if self.variable_frame_rate and None not in (timestamp, next_timestamp):
+            duration = (next_timestamp - timestamp) / self.playback_speed
+            if last:
+                duration = max(duration, 1 / self.sink.framerate)
+        self.manifest.add(
+            timestamp, duration if duration is not None else 1 / self.sink.framerate, step
+        )
+        self.sink.write(frame, duration=duration)
+        self.written += 1
+
+
+class CaptureEngine:
+    """Grab frames from a backend and encode/persist them in the background.
+
+    ``backend='polling'`` screenshots on every ``capture()`` call;
+    ``backend='screencast'`` streams painted frames from Chromium, resampled
+    to the sink's ``framerate``; ``backend='virtual'`` polls on Chromium's
+    virtual clock so holds take no wall-clock time. Scenarios call ``capture()`` and ``hold()``
+    the same way with either backend.
+
+    With ``collapse_duplicates`` the sink is wrapped in a
+    :class:`~gifcapture.dedupe.DuplicateFrameCollapser`, so repeated "hold"
+    frames become one GIF frame with a longer delay.
+
+    With ``variable_frame_rate`` each frame plays for as long as it was on
+    screen during capture (screencast frames are then passed through as
+    painted instead of resampled), sped up by ``playback_speed``. The timing
+    of every frame is kept in :attr:`manifest`.
+
+    A :class:`~gifcapture.region.CaptureRegion` clips every frame to part of
+    the page; it is resolved as the engine starts, which fixes its size. A
+    :class:`~gifcapture.redact.Redactor` hides sensitive elements in every
+    grabbed frame, from the very first one.
+    """
+
+    def __init__(self, page, sink, backend='polling', image_format='png',
+                 quality=None, workers=2, max_pending=16, on_full='block',
+                 collapse_duplicates=False, tolerance=0,
+                 variable_frame_rate=False, playback_speed=1.0, region=None,
+                 redactor=None):
+        self.collapser = None
+        self.region = region
+        self.redactor = redactor
+        if collapse_duplicates:
+            self.collapser = sink = DuplicateFrameCollapser(sink, tolerance)
+        self.writer = BackgroundFrameWriter(
+            sink, workers, max_pending, on_full, variable_frame_rate, playback_speed
+        )
+        if backend == 'polling':
+            self.backend = PollingBackend(page, self.writer, image_format, quality, region)
+        elif backend == 'virtual':
+            self.backend = VirtualTimeBackend(page, self.writer, image_format, quality, region)
+        elif backend == 'screencast':
+            self.backend = ScreencastBackend(
+                page, self.writer, sink.framerate, image_format, quality,
+                resample=not variable_frame_rate, region=region,
+            )
+        else:
+            raise ValueError(f"Unknown capture backend {backend!r}")
+        if region is not None:
+            region.clip()
+        if redactor is not None:
+            # Read the sensitive boxes before the first frame can be grabbed
+            redactor.refresh()
+            self.writer.transform = self._redact
+        self.backend.start()
+
+    def capture(self):
+        return self.backend.capture()
+
+    def hold(self, seconds):
+        self.backend.hold(seconds)
+
+    @property
+    def manifest(self):
+        return self.writer.manifest
+
+    def insert_frames(self, frames, frame_duration, started=None):
+        """Submit frames that were produced off-page, e.g. a synthesized scroll.
+
+        Each frame plays for ``frame_duration`` seconds of capture time. The
+        time spent producing them since ``started`` (a backend clock reading)
+        is taken back out of the timeline so it doesn't stretch the frame
+        shown before them. They bypass the redactor, so redact them first.
+        """
+        now = self.backend.clock()
+        if started is not None:
+            self.writer.time_offset -= now - started
+        for i, frame in enumerate(frames):
+            self.writer.submit(frame, now + i * frame_duration, transform=False)
+        self.writer.time_offset += len(frames) * frame_duration
+
+    def exclude_wait(self, seconds):
+        """Keep ``seconds`` spent waiting on the app out of frame durations.
+
+        Only needed when the backend clock is wall time: screencast frames
+        painted during a wait are real motion and keep their timing, and the
+        virtual clock never advances during waits.
+        """
+        if self.backend.clock_counts_waits:
+            self.writer.time_offset -= seconds
+
+    def close(self):
+        self.backend.stop()
+        self.writer.close(end_timestamp=self.backend.clock())
+
+    def report(self):
+        parts = [self.writer.report()]
+        if self.collapser is not None:
+            parts.append(self.collapser.report())
+        if self.region is not None:
+            parts.append(self.region.report())
+        if self.redactor is not None:
+            parts.append(self.redactor.report())
+        return '; '.join(parts)
+
+    def _redact(self, data):
+        frame_box = self.region.view_box if self.region is not None else None
+        return self.redactor.wrap(data, frame_box)
@@ -0,0 +1,104 @@
+"""Cache locations, file writes and optional imports shared by the capture modules."""
+
+import os
+import shutil
+import tempfile
+import threading
+
+CACHE_DIR = os.path.expanduser('~/.cache/aibossbrainz-gifs')
+
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def cache_dir(variable, name):
+    """The path in environment ``variable``, or ``name`` under :data:`CACHE_DIR`."""
+    return os.environ.get(variable, os.path.join(CACHE_DIR, name))
+
+
+def arrays(purpose):
+    """``(numpy, PIL.Image)``, or a RuntimeError saying ``purpose`` needs them."""
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError(f'{purpose} needs numpy and Pillow installed') from exc
+    return np, Image
+
+
+def pillow(purpose):
+    """``PIL.Image``, or a RuntimeError saying ``purpose`` needs Pillow."""
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise RuntimeError(f'{purpose} needs Pillow installed') from exc
+    return Image
+
+
+def private_dir(directory):
+    """Create ``directory`` (if needed) readable by the owner only.
+
+    For anything holding session cookies: saved logins, page checkpoints
+    and network recordings.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    os.chmod(directory, 0o700)
+
+
+def _read_umask():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    # Elsewhere it can only be read by setting it; a restrictive value
+    # means a file another thread creates meanwhile is at worst too private.
+    umask = os.umask(0o077)
+    os.umask(umask)
+    return umask
+
+
+def _file_mode():
+    """The mode ``open()`` would give a new file: mkstemp's 0600 is only for private files."""
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            _umask = _read_umask()
+        return 0o666 & ~_umask
+
+
+def _staged(path, private=False):
+    directory = os.path.dirname(os.path.abspath(path))
+    if private:
+        private_dir(directory)
+    else:
+        os.makedirs(directory, exist_ok=True)
+    fd, staged = tempfile.mkstemp(dir=directory)
+    if not private:
+        os.fchmod(fd, _file_mode())
+    return fd, staged
+
+
+def write_atomic(path, data, private=False):
+    """Write ``data`` to ``path`` so readers see either the old or the new file.
+
+    Runs sharing a cache never read a partial file: the bytes go to a
+    temporary file next to ``path`` that then replaces it. ``private``
+    files are 0600 in a 0700 directory (see :func:`private_dir`).
+    """
+    fd, staged = _staged(path, private)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(staged, path)
+
+
+def move_atomic(source, path):
+    """Move the file ``source`` (possibly on another filesystem) onto ``path`` atomically."""
+    fd, staged = _staged(path)
+    os.close(fd)
+    mode = os.stat(staged).st_mode
+    shutil.move(source, staged)
+    os.chmod(staged, mode)
+    os.replace(staged, path)
@@ -0,0 +1,73 @@
+"""Collapse runs of duplicate frames into single frames with longer delays."""
+
+import hashlib
+import io
+
+from gifcapture.common import arrays
+
+
+def _pixels(image_bytes):
+    np, Image = arrays('near-duplicate collapsing')
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        return np.asarray(image.convert('RGB'), dtype=np.int16)
+
+
+class DuplicateFrameCollapser:
+    """Sink stage that merges repeated frames before they reach the encoder.
+
+    Every frame is hashed; a frame identical to the start of the current run
+    (or, with ``tolerance > 0``, whose pixels all differ by at most
+    ``tolerance`` per channel) extends that run instead of being encoded.
+    When the run ends its first frame is written once with a delay covering
+    the whole run, so holds cost one GIF frame rather than one per capture.
+    """
+
+    def __init__(self, sink, tolerance=0):
+        self.sink = sink
+        self.tolerance = tolerance
+        self.framerate = sink.framerate
+        self.received = 0
+        self._run_frame = None
+        self._run_hash = None
+        self._run_pixels = None
+        self._run_length = 0
+
+    @property
+    def count(self):
+        return self.sink.count
+
+    def write(self, image_bytes, duration=None):
+        duration = 1 / self.framerate if duration is None else duration
+        self.received += 1
+        digest = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        if self._run_frame is not None and self._matches(image_bytes, digest):
+            self._run_length += duration
+            return
+        self.flush()
+        self._run_frame = image_bytes
+        self._run_hash = digest
+        self._run_pixels = None
+        self._run_length = duration
+
+    def flush(self):
+        """Write the pending run; called when the capture engine closes."""
+        if self._run_frame is None:
+            return
+        self.sink.write(self._run_frame, duration=self._run_length)
+        self._run_frame = None
+        self._run_pixels = None
+
+    def report(self):
+        return f"{self.received} captured frames collapsed into {self.sink.count}"
+
+    def _matches(self, image_bytes, digest):
+        if digest == self._run_hash:
+            return True
+        if not self.tolerance:
+            return False
+        if self._run_pixels is None:
+            self._run_pixels = _pixels(self._run_frame)
+        pixels = _pixels(image_bytes)
+        if pixels.shape != self._run_pixels.shape:
+            return False
+        return int(abs(pixels - self._run_pixels).max()) <= self.tolerance
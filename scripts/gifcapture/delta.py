@@ -0,0 +1,145 @@
+"""Rewrite a GIF so every frame only stores the rectangle that changed."""
+
+import functools
+import io
+import os
+import struct
+
+from gifcapture.common import arrays, write_atomic
+from gifcapture.gif import _skip_sub_blocks
+
+_arrays = functools.partial(arrays, 'delta encoding')
+
+
+def _frames(path):
+    """``(palette, loop, [(rgb, delay_cs), ...])`` with every frame composited."""
+    np, Image = _arrays()
+    frames = []
+    with Image.open(path) as image:
+        palette = image.getpalette() or []
+        loop = image.info.get('loop')
+        for index in range(getattr(image, 'n_frames', 1)):
+            image.seek(index)
+            delay = round(image.info.get('duration', 0) / 10)
+            frames.append((np.asarray(image.convert('RGB')), delay))
+    return palette, loop, frames
+
+
+def _indices(rgb, palette_keys, order):
+    """Palette index of every pixel, or None if a colour isn't in the palette."""
+    np, _ = _arrays()
+    keys = (rgb[..., 0].astype(np.int32) << 16) | (rgb[..., 1].astype(np.int32) << 8) | rgb[..., 2]
+    sorted_keys = palette_keys[order]
+    positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    if not np.array_equal(sorted_keys[positions], keys):
+        return None
+    return order[positions].astype(np.uint8)
+
+
+def _image_data(indices):
+    """LZW-compressed image data (minimum code size + sub-blocks) for ``indices``."""
+    _, Image = _arrays()
+    buffer = io.BytesIO()
+    # An 8-bit greyscale GIF keeps the values as palette indices untouched
+    Image.fromarray(indices, 'L').save(buffer, format='GIF', optimize=False, interlace=False)
+    data = buffer.getvalue()
+    packed = data[10]
+    pos = 13 + (3 * (2 ** ((packed & 0x07) + 1)) if packed & 0x80 else 0)
+    while data[pos] == 0x21:
+        pos = _skip_sub_blocks(data, pos + 2)
+    if data[pos] != 0x2C:
+        raise ValueError('unexpected block in encoded frame')
+    start = pos + 10
+    if data[pos + 9] & 0x80:
+        start += 3 * (2 ** ((data[pos + 9] & 0x07) + 1))
+    return data[start:_skip_sub_blocks(data, start + 1)]
+
+
+def _changed_box(changed):
+    """``(top, bottom, left, right)`` bounding the True pixels, or None."""
+    np, _ = _arrays()
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not len(rows):
+        return None
+    cols = np.flatnonzero(changed.any(axis=0))
+    return rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+
+def optimize_gif(path, tolerance=0):
+    """Store each frame of the GIF at ``path`` as its changed sub-rectangle.
+
+    Frames are composited, compared with what is on screen before them
+    (a vectorized NumPy diff, counting pixels whose channels moved by more
+    than ``tolerance``) and cropped to the bounding box of the change.
+    Inside that box, unchanged pixels use a palette index no frame needs as
+    the transparent colour, and every frame is kept on screen under the
+    next one (disposal method 1), which leaves long runs of one index for
+    LZW. A frame with no change is folded into the previous frame's delay.
+
+    ``tolerance`` above 0 also drops dithering noise, at the cost of
+    keeping pixels up to that far from their exact colour. The GIF is only
+    replaced if the result is smaller. Returns the sizes before and after.
+    """
+    np, _ = _arrays()
+    before = os.path.getsize(path)
+    palette, loop, frames = _frames(path)
+    palette = (palette + [0] * 768)[:768]
+    colors = np.array(palette, dtype=np.int32).reshape(256, 3)
+    palette_keys = (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+    order = np.argsort(palette_keys, kind='stable')
+    indexed = [_indices(rgb, palette_keys, order) for rgb, _ in frames]
+    if any(indices is None for indices in indexed):
+        # Frames with local palettes; leave the GIF as ffmpeg wrote it
+        return before, before
+    used = np.zeros(256, dtype=bool)
+    for indices in indexed:
+        used[np.unique(indices)] = True
+    unused = np.flatnonzero(~used)
+    transparent = int(unused[0]) if len(unused) else None
+
+    height, width = indexed[0].shape
+    images = []
+    canvas = canvas_rgb = None
+    for (rgb, delay), indices in zip(frames, indexed):
+        if canvas is None:
+            changed = np.ones(indices.shape, dtype=bool)
+        elif tolerance:
+            changed = (np.abs(rgb.astype(np.int16) - canvas_rgb).max(axis=2) > tolerance)
+        else:
+            changed = indices != canvas
+        box = _changed_box(changed)
+        if box is None:
+            images[-1][1] += delay
+            continue
+        top, bottom, left, right = box
+        window = changed[top:bottom, left:right]
+        sub = indices[top:bottom, left:right].copy()
+        if canvas is None:
+            canvas = indices.copy()
+            canvas_rgb = rgb.astype(np.int16)
+        else:
+            canvas[top:bottom, left:right][window] = sub[window]
+            canvas_rgb[top:bottom, left:right][window] = rgb[top:bottom, left:right][window]
+            if transparent is not None:
+                sub[~window] = transparent
+        images.append([(left, top, sub), delay])
+
+    out = bytearray(b'GIF89a')
+    out += struct.pack('<HHBBB', width, height, 0xF7, 0, 0)
+    out += bytes(palette)
+    if loop is not None:
+        out += b'\x21\xFF\x0BNETSCAPE2.0\x03\x01' + struct.pack('<H', loop) + b'\x00'
+    for i, ((left, top, sub), delay) in enumerate(images):
+        flags = 1 << 2  # disposal: leave the frame in place
+        if transparent is not None and i:
+            flags |= 1
+        control = struct.pack('<BHB', flags, min(delay, 0xFFFF), transparent or 0)
+        out += b'\x21\xF9\x04' + control + b'\x00'
+        out += b'\x2C' + struct.pack('<HHHHB', left, top, sub.shape[1], sub.shape[0], 0)
+        out += _image_data(sub)
+    out += b'\x3B'
+
+    if len(out) >= before:
+        return before, before
+    write_atomic(path, bytes(out))
+    return before, len(out)
@@ -0,0 +1,174 @@
+"""Batched DOM queries so element discovery costs one round trip."""
+
+import itertools
+from collections import namedtuple
+
+HANDLE_ATTRIBUTE = 'data-capture-id'
+
+# Shared by the queries below: tag an element with a stable handle id and
+# describe it the way DomElement expects.
+_DESCRIBE_JS = """
+const describe = (el, attribute) => {
+    window.__captureIds = window.__captureIds || 0;
+    let id = el.getAttribute(attribute);
+    if (!id) {
+        id = String(++window.__captureIds);
+        el.setAttribute(attribute, id);
+    }
+    const r = el.getBoundingClientRect();
+    const box = r.width > 0 && r.height > 0
+        ? {x: r.x, y: r.y, width: r.width, height: r.height}
+        : null;
+    return {handle: id, tag: el.tagName.toLowerCase(), text: el.innerText || '', box};
+};
+"""
+
+_DISCOVER_JS = """
+({selector, textContains, attribute}) => {
+""" + _DESCRIBE_JS + """
+    return Array.from(document.querySelectorAll(selector))
+        .filter((el) => !textContains || (el.innerText || '').includes(textContains))
+        .map((el) => describe(el, attribute));
+}
+"""
+
+# Snapshot a menu's items and report back once the menu closes (Radix flips
+# data-state to "closed" and then unmounts the content).
+_MENU_JS = """
+({menu, items, attribute, callback}) => {
+""" + _DESCRIBE_JS + """
+    const root = document.querySelector(menu);
+    if (!root) return null;
+    const observer = new MutationObserver(() => {
+        if (!root.isConnected || root.getAttribute('data-state') === 'closed') {
+            observer.disconnect();
+            window[callback]();
+        }
+    });
+    observer.observe(document.body, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['data-state'],
+    });
+    return Array.from(root.querySelectorAll(items)).map((el) => describe(el, attribute));
+}
+"""
+
+USER_NAV_MENU = '[data-testid="user-nav-menu"]'
+
+PLAN_KEYWORDS = ('month', 'year', 'trial', 'plan')
+
+
+class DomElement(namedtuple('DomElement', 'handle tag text box')):
+    """Snapshot of one element: stable handle id, tag, innerText and box.
+
+    ``box`` is viewport-relative like ``Locator.bounding_box()`` and is
+    ``None`` for elements that aren't rendered.
+    """
+
+    __slots__ = ()
+
+    @property
+    def selector(self):
+        return f'[{HANDLE_ATTRIBUTE}="{self.handle}"]'
+
+    def locator(self, page):
+        return page.locator(self.selector)
+
+
+def discover_elements(page, selectors, text_contains=None):
+    """Return every element matching ``selectors`` from a single ``evaluate``.
+
+    ``selectors`` is a CSS selector or a list of them (matched as one
+    selector list, in document order). ``text_contains`` filters inside the
+    page so large candidate sets don't have to cross the wire. Each element
+    is tagged with a ``data-capture-id`` attribute so it can be targeted
+    again later through :meth:`DomElement.locator`.
+    """
+    if not isinstance(selectors, str):
+        selectors = ', '.join(selectors)
+    rows = page.evaluate(_DISCOVER_JS, {
+        'selector': selectors,
+        'textContains': text_contains,
+        'attribute': HANDLE_ATTRIBUTE,
+    })
+    return [DomElement(**row) for row in rows]
+
+
+def unique_by_position(elements, key=lambda box: (round(box['x']), round(box['y']))):
+    """Drop unrendered elements and all but the first element per position."""
+    seen = set()
+    unique = []
+    for element in elements:
+        if element.box is None:
+            continue
+        position = key(element.box)
+        if position not in seen:
+            seen.add(position)
+            unique.append(element)
+    return unique
+
+
+def looks_like_plan_card(element):
+    text = element.text.lower()
+    return '$' in text and any(keyword in text for keyword in PLAN_KEYWORDS)
+
+
+class MenuSnapshot:
+    """Cached items of an open menu, fetched with one ``evaluate``.
+
+    The first access to :attr:`items` records the text, box and handle of
+    every item under ``menu_selector``. Lookups and hovers then run from that
+    snapshot without resolving locators again. A MutationObserver in the page
+    calls back when the menu closes or unmounts, which invalidates the
+    snapshot so the next access re-reads the reopened menu.
+    """
+
+    _callback_ids = itertools.count(1)
+
+    def __init__(self, page, menu_selector=USER_NAV_MENU, item_selector='a, button'):
+        self.page = page
+        self.menu_selector = menu_selector
+        self.item_selector = item_selector
+        self.callback = f'__captureMenuClosed{next(self._callback_ids)}'
+        self._items = None
+        page.expose_function(self.callback, self.invalidate)
+
+    @property
+    def items(self):
+        if self._items is None:
+            rows = self.page.evaluate(_MENU_JS, {
+                'menu': self.menu_selector,
+                'items': self.item_selector,
+                'attribute': HANDLE_ATTRIBUTE,
+                'callback': self.callback,
+            })
+            if rows is None:
+                return []
+            self._items = [DomElement(**row) for row in rows]
+        return self._items
+
+    @property
+    def texts(self):
+        return [item.text.strip() for item in self.items]
+
+    def invalidate(self):
+        self._items = None
+
+    def find(self, text):
+        """First item whose text contains ``text`` (case-insensitive), or None."""
+        needle = text.lower()
+        for item in self.items:
+            if needle in item.text.lower():
+                return item
+        return None
+
+    def hover(self, item):
+        """Move the mouse to the centre of ``item``'s snapshotted box.
+
+        Uses the cached box rather than resolving a locator, so take the
+        snapshot once the menu's open animation has finished.
+        """
+        box = item.box
+        if box is None:
+            item.locator(self.page).hover()
+            return
+        self.page.mouse.move(box['x'] + box['width'] / 2, box['y'] + box['height'] / 2)
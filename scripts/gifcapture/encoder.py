@@ -0,0 +1,301 @@
+"""ffmpeg-backed GIF encoding for the demo capture scripts."""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+from gifcapture.common import cache_dir, move_atomic
+from gifcapture.delta import optimize_gif
+from gifcapture.formats import (
+    encode_formats,
+    format_report,
+    gif_row,
+    save_report,
+    scale_filter,
+    write_concat,
+)
+from gifcapture.gif import set_frame_delays
+
+PALETTE_DIR = cache_dir('GIF_PALETTE_DIR', 'palettes')
+
+SCALE_FLAGS = 'lanczos'
+PALETTEGEN_OPTIONS = 'max_colors=256'
+PALETTEUSE_OPTIONS = 'diff_mode=rectangle'
+
+
+def gif_graph(widths, cached=False):
+    """``-filter_complex`` decoding the input once and feeding every width.
+
+    Output ``i`` is labelled ``[gif<i>]``. Without ``cached`` palettes each
+    width runs palettegen and also exposes its palette as ``[pal<i>]`` so it
+    can be saved; with ``cached`` palette ``i`` is read from input ``i + 1``
+    and palettegen is skipped entirely. ``paletteuse`` only re-dithers the
+    rectangle that changed since the previous frame, so the rest of the
+    frame keeps identical pixels that the GIF muxer leaves out.
+    """
+    chains = [f"[0:v]split={len(widths)}{''.join(f'[in{i}]' for i in range(len(widths)))}"]
+    for i, width in enumerate(widths):
+        if cached:
+            chains.append(f'[in{i}]{scale_filter(width, SCALE_FLAGS)}[s{i}]')
+            chains.append(f'[s{i}][{i + 1}:v]paletteuse={PALETTEUSE_OPTIONS}[gif{i}]')
+        else:
+            chains.append(f'[in{i}]{scale_filter(width, SCALE_FLAGS)},split[a{i}][b{i}]')
+            chains.append(f'[a{i}]palettegen={PALETTEGEN_OPTIONS},split[p{i}][pal{i}]')
+            chains.append(f'[b{i}][p{i}]paletteuse={PALETTEUSE_OPTIONS}[gif{i}]')
+    return ';'.join(chains)
+
+
+def palette_path(frames_digest, width, directory=PALETTE_DIR):
+    """Cached palette for a frame set (see :attr:`StreamingGifEncoder.frames_digest`)."""
+    key = hashlib.blake2b(
+        f'{frames_digest}:{width}:{SCALE_FLAGS}:{PALETTEGEN_OPTIONS}'.encode(), digest_size=16
+    ).hexdigest()
+    return os.path.join(directory, f'{key}.png')
+
+
+def frames_digest(frames):
+    digest = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        digest.update(frame)
+    return digest.hexdigest()
+
+
+class StreamingGifEncoder:
+    """Pipe screenshot bytes straight into a long-lived ffmpeg process.
+
+    Frames are handed to ffmpeg over stdin (image2pipe) while the scenario is
+    still running, so no intermediate PNGs touch the disk and the GIF is
+    finished as soon as the encoder is closed.
+
+    Frames play at ``framerate`` unless ``write()`` is given an explicit
+    duration; any non-default durations are patched into the finished GIF's
+    frame delays.
+
+    ``extra_outputs`` adds more ``(path, width)`` outputs. Every frame is decoded
+    once and split across one filter graph with a sink per output. Each
+    width's generated palette is saved under :data:`PALETTE_DIR`, keyed by a
+    hash of the frame set and the scale settings. When ``frames_digest`` is
+    passed up front (the frames are already known, e.g. when re-encoding
+    stored frames) and every palette is cached, palettegen is skipped and
+    the cached palettes are applied directly.
+
+    Every finished GIF is then rewritten by
+    :func:`~gifcapture.delta.optimize_gif` to store only the changed
+    sub-rectangle of each frame (``delta_tolerance=None`` skips this);
+    :attr:`sizes` holds each output's size before and after. Fallbacks that
+    still leave a valid GIF (constant delays, frames kept as ffmpeg wrote
+    them) are printed as warnings and kept in :attr:`warnings`.
+
+    ``formats`` (any of :data:`~gifcapture.formats.FORMATS`) also renders
+    the main output as animated WebP/AVIF, MP4 or a poster PNG next to the
+    GIF. The frames are then kept in a scratch directory while capturing,
+    and once the GIF is done every format is encoded by its own ffmpeg
+    process in parallel; :attr:`formats` and ``<name>.formats.json`` report
+    the size, encode time and SSIM against the source frames of each,
+    including the GIF.
+
+    ffmpeg writes to ``.partial`` files next to the targets (or in
+    ``GIF_SCRATCH_DIR`` when set, so concurrent runs never share scratch
+    files), which replace the previous GIFs only once encoding succeeds. Use
+    it as a context manager: a clean exit finalises the GIFs, an exception
+    kills ffmpeg and leaves the previous GIFs untouched.
+    """
+
+    def __init__(self, output_path, framerate, width=1000, extra_outputs=(), frames_digest=None,
+                 delta_tolerance=0, formats=()):
+        self.output_path = output_path
+        self.framerate = framerate
+        self.width = width
+        self.delta_tolerance = delta_tolerance
+        self.outputs = [(output_path, width), *extra_outputs]
+        self.sizes = []
+        self.formats = []
+        self._formats = tuple(formats)
+        self._frame_paths = []
+        self.count = 0
+        self.durations = []
+        self.returncode = None
+        self.stderr = ''
+        self.warnings = []
+        self.frames_digest = None
+        self._digest = hashlib.blake2b(digest_size=16)
+        self._expected_digest = frames_digest
+        scratch = os.environ.get('GIF_SCRATCH_DIR')
+        self._partial_paths = []
+        for path, _ in self.outputs:
+            root, ext = os.path.splitext(path)
+            if scratch:
+                root = os.path.join(scratch, os.path.basename(root))
+            self._partial_paths.append(f'{root}.partial{ext}')
+        widths = [w for _, w in self.outputs]
+        palettes = [palette_path(frames_digest, w) for w in widths] if frames_digest else []
+        self.palette_hit = bool(palettes) and all(os.path.exists(p) for p in palettes)
+        self._palette_partials = []
+        self._frame_dir = None
+        if self._formats:
+            self._frame_dir = tempfile.mkdtemp(prefix='gif-frames-', dir=scratch or None)
+
+        command = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 'image2pipe', '-framerate', str(framerate), '-i', '-',
+        ]
+        if self.palette_hit:
+            for palette in palettes:
+                command += ['-i', palette]
+        command += ['-filter_complex', gif_graph(widths, cached=self.palette_hit)]
+        for i, partial in enumerate(self._partial_paths):
+            command += ['-map', f'[gif{i}]', '-y', partial]
+            if not self.palette_hit:
+                palette_partial = f'{os.path.splitext(partial)[0]}.palette.png'
+                self._palette_partials.append(palette_partial)
+                command += ['-map', f'[pal{i}]', '-frames:v', '1', '-update', '1', '-y', palette_partial]
+        self._log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=self._log,
+        )
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def write(self, image_bytes, duration=None):
+        """Queue one encoded image (PNG or JPEG bytes) as the next frame."""
+        self.process.stdin.write(image_bytes)
+        self._digest.update(image_bytes)
+        if self._frame_dir is not None:
+            path = os.path.join(self._frame_dir, f'frame{self.count:05d}')
+            with open(path, 'wb') as f:
+                f.write(image_bytes)
+            self._frame_paths.append(path)
+        self.durations.append(1 / self.framerate if duration is None else duration)
+        self.count += 1
+
+    def close(self):
+        """Flush stdin, wait for ffmpeg and return True if the GIF was written."""
+        if self.returncode is not None:
+            return self.ok
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.returncode = self.process.wait()
+        self._log.seek(0)
+        self.stderr = self._log.read().decode(errors='replace')
+        self._log.close()
+        if self.count == 0:
+            self.returncode = self.returncode or 1
+            self.stderr = self.stderr or 'no frames were captured'
+        self.frames_digest = self._digest.hexdigest()
+        if self.palette_hit and self.frames_digest != self._expected_digest:
+            # The cached palettes were for a different frame set
+            self.returncode = self.returncode or 1
+            self.stderr += 'frames did not match frames_digest\n'
+        if self.ok:
+            self._save_palettes()
+            for partial, (path, _) in zip(self._partial_paths, self.outputs):
+                self._apply_durations(partial)
+                self._optimize(partial)
+                move_atomic(partial, path)
+            if self._formats:
+                self._encode_formats()
+        self._remove_partials()
+        return self.ok
+
+    def _save_palettes(self):
+        for partial, (_, width) in zip(self._palette_partials, self.outputs):
+            if not os.path.exists(partial):
+                continue
+            move_atomic(partial, palette_path(self.frames_digest, width))
+
+    def _remove_partials(self):
+        for partial in [*self._partial_paths, *self._palette_partials]:
+            if os.path.exists(partial):
+                os.remove(partial)
+        if self._frame_dir is not None:
+            shutil.rmtree(self._frame_dir, ignore_errors=True)
+
+    def _apply_durations(self, path):
+        default = 1 / self.framerate
+        if all(abs(d - default) < 0.005 for d in self.durations):
+            return
+        try:
+            set_frame_delays(path, self.durations)
+        except ValueError as exc:
+            self._warn(f'kept constant frame delays, the frame timing is lost: {exc}')
+
+    def _warn(self, message):
+        # The encode still succeeds, so this can't wait for stderr to be shown
+        self.warnings.append(message)
+        print(f"Warning: {message}")
+
+    def _encode_formats(self):
+        concat = write_concat(
+            self._frame_paths, self.durations, os.path.join(self._frame_dir, 'frames.txt')
+        )
+        self.formats = [
+            gif_row(self.output_path, concat, self.width, SCALE_FLAGS),
+            *encode_formats(concat, self.output_path, self._formats, self.width, SCALE_FLAGS),
+        ]
+        save_report(self.formats, f'{os.path.splitext(self.output_path)[0]}.formats.json')
+
+    def _optimize(self, path):
+        before = after = os.path.getsize(path)
+        if self.delta_tolerance is not None:
+            try:
+                before, after = optimize_gif(path, self.delta_tolerance)
+            except (RuntimeError, ValueError) as exc:
+                self._warn(f'kept frames as ffmpeg wrote them: {exc}')
+        self.sizes.append((before, after))
+
+    def report(self):
+        """One line per output: its size, and the size before delta encoding."""
+        lines = []
+        for (path, _), (before, after) in zip(self.outputs, self.sizes):
+            saved = f", {before / 1024:.0f} KB before delta encoding" if after < before else ''
+            lines.append(f"{os.path.basename(path)}: {after / 1024:.0f} KB{saved}")
+        if self.formats:
+            lines += format_report(self.formats)
+        return lines
+
+    def abort(self):
+        """Stop ffmpeg without finalising and drop the partial GIF."""
+        if self.returncode is not None:
+            return
+        self.process.kill()
+        self.returncode = self.process.wait()
+        self._log.close()
+        self._remove_partials()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def encode_frames(frames, output_path, framerate, width=1000, durations=None, extra_outputs=(),
+                  delta_tolerance=0, formats=()):
+    """Encode an already captured frame sequence, reusing cached palettes.
+
+    Returns the closed :class:`StreamingGifEncoder`; its ``palette_hit`` says
+    whether palette generation was skipped.
+    """
+    frames = list(frames)
+    durations = durations or [None] * len(frames)
+    encoder = StreamingGifEncoder(
+        output_path, framerate, width, extra_outputs, frames_digest=frames_digest(frames),
+        delta_tolerance=delta_tolerance, formats=formats,
+    )
+    with encoder:
+        for frame, duration in zip(frames, durations):
+            encoder.write(frame, duration)
+    return encoder
@@ -0,0 +1,158 @@
+"""Animated WebP/AVIF/MP4 and poster PNG renditions of a capture."""
+
+import json
+import os
+import re
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gifcapture.common import pillow
+
+# ffmpeg output options per format. The video codecs need even dimensions.
+FORMAT_OPTIONS = {
+    'webp': ['-c:v', 'libwebp_anim', '-lossless', '0', '-quality', '80', '-loop', '0'],
+    'avif': ['-c:v', 'libaom-av1', '-crf', '32', '-cpu-used', '6', '-pix_fmt', 'yuv420p'],
+    'mp4': [
+        '-c:v', 'libx264', '-crf', '23', '-preset', 'slow', '-pix_fmt', 'yuv420p',
+        '-movflags', '+faststart',
+    ],
+    'png': ['-frames:v', '1', '-update', '1'],
+}
+FORMATS = tuple(FORMAT_OPTIONS)
+
+_SSIM = re.compile(r'All:([\d.]+)')
+
+
+def scale_filter(width, flags='lanczos', even=False):
+    """ffmpeg ``scale`` down to ``width`` but never up, so clipped captures stay sharp."""
+    return f"scale='min({width},iw)':{-2 if even else -1}:flags={flags}"
+
+
+def write_concat(frame_paths, durations, path):
+    """An ffconcat list playing each frame for its duration (in seconds)."""
+    lines = ['ffconcat version 1.0']
+    for frame, duration in zip(frame_paths, durations):
+        lines += [f"file '{frame}'", f'duration {duration:.4f}']
+    if frame_paths:
+        # The last duration only counts if the file is listed again
+        lines.append(f"file '{frame_paths[-1]}'")
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+def _expand_frames(path, directory):
+    """An ffconcat list of the frames of an animation ffmpeg can't decode."""
+    Image = pillow('scoring animated WebP')
+    from PIL import ImageSequence
+
+    frame_paths, durations = [], []
+    with Image.open(path) as image:
+        for i, frame in enumerate(ImageSequence.Iterator(image)):
+            frame_path = os.path.join(directory, f'{i:05d}.png')
+            frame.convert('RGB').save(frame_path, compress_level=1)
+            frame_paths.append(frame_path)
+            durations.append(frame.info.get('duration', 100) / 1000)
+    return write_concat(frame_paths, durations, os.path.join(directory, 'frames.txt'))
+
+
+def ssim(path, concat_path, scale):
+    """Mean SSIM of ``path`` against the source frames scaled with ``scale``."""
+    if path.endswith('.webp'):
+        # ffmpeg's WebP decoder doesn't support animation
+        with tempfile.TemporaryDirectory() as directory:
+            frames = _expand_frames(path, directory)
+            return _ssim(['-f', 'concat', '-safe', '0', '-i', frames], concat_path, scale)
+    return _ssim(['-i', path], concat_path, scale)
+
+
+def _ssim(input_options, concat_path, scale):
+    # shortest=1 scores a poster against the first frame only
+    command = [
+        'ffmpeg', '-hide_banner', '-nostats', *input_options,
+        '-f', 'concat', '-safe', '0', '-i', concat_path,
+        '-lavfi', f'[1:v]{scale},format=rgb24[ref];[0:v]format=rgb24[out];[out][ref]ssim=shortest=1',
+        '-f', 'null', '-',
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    match = _SSIM.search(result.stderr)
+    return float(match.group(1)) if match else None
+
+
+def encode_format(fmt, concat_path, output_path, width, flags):
+    """Encode one format from the source frames; returns its report row."""
+    scale = scale_filter(width, flags, even=fmt in ('avif', 'mp4'))
+    command = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'concat', '-safe', '0', '-i', concat_path,
+        '-vf', scale, '-fps_mode', 'passthrough', *FORMAT_OPTIONS[fmt], '-y', output_path,
+    ]
+    started = time.monotonic()
+    result = subprocess.run(command, capture_output=True, text=True)
+    row = {
+        'format': fmt,
+        'path': output_path,
+        'seconds': round(time.monotonic() - started, 2),
+        'bytes': None,
+        'ssim': None,
+        'error': None,
+    }
+    if result.returncode:
+        row['error'] = result.stderr.strip() or f'ffmpeg exited with {result.returncode}'
+        return row
+    row['bytes'] = os.path.getsize(output_path)
+    row['ssim'] = ssim(output_path, concat_path, scale)
+    return row
+
+
+def encode_formats(concat_path, base_path, formats=FORMATS, width=1000, flags='lanczos',
+                   workers=None):
+    """Encode ``formats`` next to ``base_path`` (``<root>.<format>``) at once.
+
+    Frames are scaled down to ``width`` with the ``flags`` scaler, like the
+    GIF. Every format is its own ffmpeg process, run side by side, followed
+    by an SSIM pass against the source frames scaled the same way. Returns
+    the report rows in ``formats`` order.
+    """
+    unknown = set(formats) - set(FORMAT_OPTIONS)
+    if unknown:
+        raise ValueError(f"unknown output formats: {', '.join(sorted(unknown))}")
+    root = os.path.splitext(base_path)[0]
+    with ThreadPoolExecutor(max_workers=workers or len(formats) or 1) as pool:
+        jobs = [
+            pool.submit(encode_format, fmt, concat_path, f'{root}.{fmt}', width, flags)
+            for fmt in formats
+        ]
+        return [job.result() for job in jobs]
+
+
+def gif_row(path, concat_path, width, flags='lanczos', seconds=None):
+    """Report row for the GIF itself, to compare the other formats against."""
+    return {
+        'format': 'gif',
+        'path': path,
+        'seconds': seconds,
+        'bytes': os.path.getsize(path),
+        'ssim': ssim(path, concat_path, scale_filter(width, flags)),
+        'error': None,
+    }
+
+
+def format_report(rows):
+    lines = [f"{'format':<6} {'size':>9} {'encode':>8} {'ssim':>7}"]
+    for row in rows:
+        if row['error']:
+            lines.append(f"{row['format']:<6} failed: {row['error'].splitlines()[-1]}")
+            continue
+        size = f"{row['bytes'] / 1024:.0f} KB"
+        seconds = '-' if row['seconds'] is None else f"{row['seconds']:.1f}s"
+        quality = '-' if row['ssim'] is None else f"{row['ssim']:.4f}"
+        lines.append(f"{row['format']:<6} {size:>9} {seconds:>8} {quality:>7}")
+    return lines
+
+
+def save_report(rows, path):
+    with open(path, 'w') as f:
+        json.dump({'formats': rows}, f, indent=2)
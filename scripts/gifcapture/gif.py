@@ -0,0 +1,64 @@
+"""Minimal GIF container helpers (no image decoding)."""
+
+import struct
+
+
+def _skip_sub_blocks(data, pos):
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+
+def frame_delay_offsets(data):
+    """Byte offsets of the delay field governing each image in a GIF.
+
+    Raises ``ValueError`` if an image has no Graphic Control Extension, since
+    its delay cannot be changed in place.
+    """
+    if data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ValueError('not a GIF file')
+    packed = data[10]
+    pos = 13
+    if packed & 0x80:
+        pos += 3 * (2 ** ((packed & 0x07) + 1))
+
+    offsets = []
+    pending = None
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x3B:
+            break
+        if block == 0x21:
+            if data[pos + 1] == 0xF9:
+                pending = pos + 4
+            pos = _skip_sub_blocks(data, pos + 2)
+        elif block == 0x2C:
+            if pending is None:
+                raise ValueError(f'image {len(offsets)} has no graphic control extension')
+            offsets.append(pending)
+            pending = None
+            packed = data[pos + 9]
+            pos += 10
+            if packed & 0x80:
+                pos += 3 * (2 ** ((packed & 0x07) + 1))
+            pos = _skip_sub_blocks(data, pos + 1)
+        else:
+            raise ValueError(f'unexpected GIF block 0x{block:02x} at offset {pos}')
+    return offsets
+
+
+def set_frame_delays(path, delays):
+    """Rewrite per-frame delays (in seconds) of the GIF at ``path`` in place.
+
+    Delays are stored in centiseconds and clamped to 2cs, the smallest value
+    browsers honour.
+    """
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    offsets = frame_delay_offsets(data)
+    if len(offsets) != len(delays):
+        raise ValueError(f'GIF has {len(offsets)} frames but {len(delays)} delays were given')
+    for offset, seconds in zip(offsets, delays):
+        struct.pack_into('<H', data, offset, max(2, min(0xFFFF, round(seconds * 100))))
+    with open(path, 'wb') as f:
+        f.write(data)
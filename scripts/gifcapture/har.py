@@ -0,0 +1,57 @@
+"""Record a scenario's network traffic into a HAR archive and replay it offline."""
+
+import os
+
+from gifcapture.common import cache_dir, private_dir
+
+HAR_DIR = cache_dir('GIF_HAR_DIR', 'har')
+HAR_MODES = ('record', 'replay')
+
+
+def har_mode():
+    """Mode selected with the GIF_HAR_MODE environment variable, or None."""
+    mode = os.environ.get('GIF_HAR_MODE') or None
+    if mode is not None and mode not in HAR_MODES:
+        raise ValueError(f"GIF_HAR_MODE must be one of {HAR_MODES}, got {mode!r}")
+    return mode
+
+
+class HarArchive:
+    """One scenario's responses, recorded and replayed with ``route_from_har``.
+
+    ``record`` lets every request through and writes the responses to
+    ``<name>.har.zip`` (bodies stored as separate zip entries) when the
+    context closes. ``replay`` answers requests from that archive only, so a
+    run needs neither the app server nor a network connection and every page
+    gets byte-for-byte the same responses. With ``fallback`` requests missing
+    from the archive go to the network instead of being aborted.
+    """
+
+    def __init__(self, name, directory=HAR_DIR):
+        self.name = name
+        self.directory = directory
+        self.path = os.path.join(directory, f'{name}.har.zip')
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def attach(self, context, mode, fallback=False):
+        if mode == 'record':
+            # Recorded requests carry the session cookies
+            private_dir(self.directory)
+            context.route_from_har(self.path, update=True, update_content='attach')
+            print(f"Recording network to {self.path}")
+        elif mode == 'replay':
+            if not self.exists:
+                raise RuntimeError(
+                    f'No HAR recorded for {self.name} at {self.path}; run once with --har record'
+                )
+            context.route_from_har(self.path, not_found='fallback' if fallback else 'abort')
+            print(f"Replaying network from {self.path}")
+        else:
+            raise ValueError(f"Unknown HAR mode {mode!r}")
+
+    def clear(self):
+        if self.exists:
+            os.remove(self.path)
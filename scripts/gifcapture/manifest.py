@@ -0,0 +1,68 @@
+"""Per-frame timing record, saved next to a scenario's GIF as ``<output>.frames.json``."""
+
+import json
+
+from gifcapture.common import write_atomic
+
+
+class FrameManifest:
+    """Timestamp and playback duration of every frame sent to the encoder.
+
+    Timestamps come from the capture backend's clock (monotonic for polled
+    screenshots, compositor time for the screencast) and are stored relative
+    to the first frame. Frames captured during a scenario step also record
+    its index as ``step``.
+
+    ``index`` counts the frames as they were captured, before repeated
+    frames are merged into longer delays, so it is not a frame number of
+    the GIF.
+    """
+
+    def __init__(self):
+        self.frames = []
+        self._origin = None
+
+    def add(self, timestamp, duration, step=None):
+        if timestamp is not None and self._origin is None:
+            self._origin = timestamp
+        frame = {
+            'index': len(self.frames),
+            'timestamp': None if timestamp is None else round(timestamp - self._origin, 4),
+            'duration': None if duration is None else round(duration, 4),
+        }
+        if step is not None:
+            frame['step'] = step
+        self.frames.append(frame)
+
+    @classmethod
+    def from_steps(cls, steps):
+        """The manifest of frames stored per step (``[key, duration]`` pairs).
+
+        Stored frames keep only their durations, so timestamps are where
+        each frame starts on the GIF's timeline.
+        """
+        manifest = cls()
+        elapsed = 0
+        for index, step in enumerate(steps):
+            for _, duration in step['frames']:
+                manifest.add(elapsed, duration, step=index)
+                elapsed += duration or 0
+        return manifest
+
+    @property
+    def durations(self):
+        return [frame['duration'] for frame in self.frames]
+
+    @property
+    def total_duration(self):
+        return sum(d for d in self.durations if d is not None)
+
+    def save(self, path):
+        write_atomic(path, json.dumps({'frames': self.frames}, indent=2).encode())
+
+    @classmethod
+    def load(cls, path):
+        manifest = cls()
+        with open(path) as f:
+            manifest.frames = json.load(f)['frames']
+        return manifest
@@ -0,0 +1,95 @@
+"""Event-driven waits that replace fixed sleeps in capture scenarios."""
+
+import contextlib
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+# Resolve once every finite animation under ``selector`` (or the whole
+# document) has finished. Infinite ones such as spinners are ignored.
+_ANIMATIONS_JS = """
+async ({selector, timeout}) => {
+    const root = selector ? document.querySelector(selector) : null;
+    if (selector && !root) return 0;
+    const animations = (root ? root.getAnimations({subtree: true}) : document.getAnimations())
+        .filter((a) => a.effect && a.effect.getComputedTiming().iterations !== Infinity);
+    await Promise.race([
+        Promise.allSettled(animations.map((a) => a.finished)),
+        new Promise((resolve) => setTimeout(resolve, timeout)),
+    ]);
+    return animations.length;
+}
+"""
+
+
+class Readiness:
+    """Wait for concrete UI signals and record how long each wait took.
+
+    Every wait returns as soon as the app is ready. When a capture engine is
+    tracked, the time spent waiting is removed from its frame timeline, so
+    GIF pacing comes from explicit ``engine.hold()`` calls rather than from
+    how slow the app happened to be.
+    """
+
+    def __init__(self, page, timeout=15000):
+        self.page = page
+        self.timeout = timeout
+        self.engine = None
+        self.waits = []
+
+    def track(self, engine):
+        self.engine = engine
+
+    @property
+    def total(self):
+        return sum(seconds for _, seconds in self.waits)
+
+    def report(self):
+        return f"{len(self.waits)} waits, {self.total:.2f}s waiting on the app"
+
+    def visible(self, selector, timeout=None):
+        with self._timed(f'visible {selector}'):
+            self.page.wait_for_selector(selector, state='visible', timeout=timeout or self.timeout)
+
+    def hidden(self, selector, timeout=None):
+        with self._timed(f'hidden {selector}'):
+            self.page.wait_for_selector(selector, state='hidden', timeout=timeout or self.timeout)
+
+    def animations_settled(self, selector=None, timeout=None):
+        """Wait for CSS transitions/animations (``getAnimations()``) to finish."""
+        with self._timed(f'animations {selector or "document"}'):
+            self.page.evaluate(_ANIMATIONS_JS, {
+                'selector': selector,
+                'timeout': timeout or self.timeout,
+            })
+
+    def network_idle(self, timeout=None):
+        """Wait for network idle; apps that never go idle just time out."""
+        with self._timed('network idle'):
+            try:
+                self.page.wait_for_load_state('networkidle', timeout=timeout or self.timeout)
+            except PlaywrightTimeoutError:
+                pass
+
+    def url(self, pattern, timeout=None):
+        """Wait until the page URL matches ``pattern`` (glob, regex or callable)."""
+        with self._timed(f'url {pattern}'):
+            self.page.wait_for_url(pattern, timeout=timeout or self.timeout)
+
+    def menu_open(self, selector):
+        """Wait for a dropdown to be visible and done animating in."""
+        self.visible(selector)
+        self.animations_settled(selector)
+
+    @contextlib.contextmanager
+    def _timed(self, label):
+        started = time.monotonic()
+        waiting = self.engine.backend.waiting() if self.engine else contextlib.nullcontext()
+        try:
+            with waiting:
+                yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.waits.append((label, elapsed))
+            if self.engine is not None:
+                self.engine.exclude_wait(elapsed)
@@ -0,0 +1,167 @@
+"""Mask or blur sensitive parts of every frame before it is encoded."""
+
+import base64
+import functools
+import io
+
+from gifcapture.common import arrays
+from gifcapture.region import LayoutWatcher, testid_selectors
+
+REDACT_MODES = ('mask', 'blur')
+
+_arrays = functools.partial(arrays, 'redaction')
+
+
+def _pixel_boxes(boxes, frame_box, shape, scale):
+    """``boxes`` (viewport CSS pixels) as pixel slices of a frame covering ``frame_box``."""
+    height, width = shape[:2]
+    for box in boxes:
+        left = max(0, round((box['x'] - frame_box['x']) * scale))
+        top = max(0, round((box['y'] - frame_box['y']) * scale))
+        right = min(width, round((box['x'] + box['width'] - frame_box['x']) * scale))
+        bottom = min(height, round((box['y'] + box['height'] - frame_box['y']) * scale))
+        if right > left and bottom > top:
+            yield slice(top, bottom), slice(left, right)
+
+
+def _hulls(previous, current):
+    """The area each element swept from its ``previous`` to its ``current`` box."""
+    if len(previous) != len(current):
+        return []
+    hulls = []
+    for a, b in zip(previous, current):
+        left, top = min(a['x'], b['x']), min(a['y'], b['y'])
+        right = max(a['x'] + a['width'], b['x'] + b['width'])
+        bottom = max(a['y'] + a['height'], b['y'] + b['height'])
+        hulls.append({'x': left, 'y': top, 'width': right - left, 'height': bottom - top})
+    return hulls
+
+
+def _blur(area, block):
+    """Mosaic ``area``: the mean of every ``block`` x ``block`` tile."""
+    np, _ = _arrays()
+    height, width, channels = area.shape
+    padded = np.pad(area, ((0, -height % block), (0, -width % block), (0, 0)), mode='edge')
+    tiles = padded.reshape(
+        padded.shape[0] // block, block, padded.shape[1] // block, block, channels
+    ).mean(axis=(1, 3))
+    return np.repeat(np.repeat(tiles, block, axis=0), block, axis=1)[:height, :width]
+
+
+def redact_pixels(pixels, boxes, frame_box, mode='mask', color=(229, 229, 229), block=12):
+    """Redact ``boxes`` in an RGB array covering ``frame_box``, in place."""
+    scale = pixels.shape[1] / frame_box['width']
+    for rows, cols in _pixel_boxes(boxes, frame_box, pixels.shape, scale):
+        if mode == 'mask':
+            pixels[rows, cols] = color
+        else:
+            pixels[rows, cols] = _blur(pixels[rows, cols], max(1, round(block * scale)))
+    return pixels
+
+
+def _redact_frame(data, boxes, frame_box, mode, color, block):
+    np, Image = _arrays()
+    if callable(data):
+        data = data()
+    elif isinstance(data, str):
+        data = base64.b64decode(data)
+    with Image.open(io.BytesIO(data)) as image:
+        pixels = np.array(image.convert('RGB'))
+    redact_pixels(pixels, boxes, frame_box, mode, color, block)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+class Redactor:
+    """Frame stage that hides ``testids`` / ``selectors`` in pixels.
+
+    Unlike hiding them with injected CSS this can't be undone by a
+    navigation or a re-render, and needs nothing in the page but a layout
+    observer. After every grab the page is asked whether its layout changed
+    since the boxes were read (see
+    :meth:`~gifcapture.region.LayoutWatcher.check`) and only then are they
+    re-read; a frame grabbed across a change is redacted with the old boxes,
+    the new ones and the area each element moved through in between, so
+    nothing slips through.
+
+    :meth:`wrap` runs on the scenario thread and only records which boxes
+    overlap the frame; decoding, the NumPy masking (``mode='mask'`` fills
+    with ``color``, ``'blur'`` mosaics in ``block``-pixel tiles) and
+    re-encoding happen in the writer's workers. Frames that show none of the
+    elements are passed through untouched.
+    """
+
+    def __init__(self, page, testids=(), selectors=(), mode='mask', color=(229, 229, 229),
+                 block=12, padding=4):
+        if mode not in REDACT_MODES:
+            raise ValueError(f"redaction mode must be one of {REDACT_MODES}, got {mode!r}")
+        _arrays()
+        self.layout = LayoutWatcher(page, testid_selectors(testids, selectors))
+        self.mode = mode
+        self.color = tuple(color)
+        self.block = block
+        self.padding = padding
+        self.frames = 0
+        self.redacted = 0
+        self._state = None
+        self._boxes = []
+
+    def refresh(self):
+        """Padded viewport boxes to redact the frame just grabbed with.
+
+        Asks the page whether its layout changed since the boxes were read
+        and re-reads them only then.
+        """
+        self.layout.check()
+        state = self.layout.read()
+        if state is self._state:
+            return self._boxes
+        previous = self._boxes
+        pad = self.padding
+        self._state = state
+        self._boxes = [
+            {'x': b['x'] - pad, 'y': b['y'] - pad,
+             'width': b['width'] + 2 * pad, 'height': b['height'] + 2 * pad}
+            for b in state['boxes']
+        ]
+        # The frame being wrapped may show any point of the change
+        return previous + self._boxes + _hulls(previous, self._boxes)
+
+    def viewport(self):
+        state = self.layout.read()
+        return {'x': 0, 'y': 0, 'width': state['width'], 'height': state['height']}
+
+    def wrap(self, data, frame_box=None):
+        """``data`` with redaction queued, or unchanged if nothing sensitive shows.
+
+        ``frame_box`` is the viewport rect the frame covers (a capture
+        region's box); the whole viewport by default.
+        """
+        candidates = self.refresh()
+        frame_box = frame_box or self.viewport()
+        self.frames += 1
+        boxes = [
+            box for box in candidates
+            if box['x'] < frame_box['x'] + frame_box['width']
+            and frame_box['x'] < box['x'] + box['width']
+            and box['y'] < frame_box['y'] + frame_box['height']
+            and frame_box['y'] < box['y'] + box['height']
+        ]
+        if not boxes:
+            return data
+        self.redacted += 1
+        return functools.partial(
+            _redact_frame, data, boxes, dict(frame_box), self.mode, self.color, self.block
+        )
+
+    def redact_document(self, pixels, scroll_x, scroll_y, scale):
+        """Redact a full-page screenshot taken while scrolled to (scroll_x, scroll_y)."""
+        frame_box = {'x': -scroll_x, 'y': -scroll_y, 'width': pixels.shape[1] / scale}
+        return redact_pixels(pixels, self.refresh(), frame_box, self.mode, self.color, self.block)
+
+    def report(self):
+        return (
+            f"{self.redacted}/{self.frames} frames redacted, "
+            f"boxes read {self.layout.reads} times"
+        )
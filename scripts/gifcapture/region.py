@@ -0,0 +1,255 @@
+"""Clip captures to the part of the page a GIF is about."""
+
+import base64
+import io
+import itertools
+
+# Read the viewport-relative boxes of every element matching ``selectors``,
+# and (once per document) start tracking layout changes: elements added,
+# removed or restyled, observed elements or the viewport resizing, scrolling
+# (of the page or any container), and transitions/animations. Every change
+# bumps a generation counter synchronously, before it is painted; reports to
+# Python are coalesced to one per animation frame. Given the ``generation``
+# of an earlier read, returns null if nothing changed or moves since.
+_LAYOUT_JS = """
+({selectors, callback, generation}) => {
+    let state = window[callback + 'State'];
+    if (state && state.generation === generation && !state.moving) return null;
+    if (!state) {
+        let queued = false;
+        const changed = () => {
+            state.generation++;
+            if (queued) return;
+            queued = true;
+            requestAnimationFrame(() => {
+                queued = false;
+                window[callback]();
+            });
+        };
+        const moving = (delta) => () => {
+            state.moving = Math.max(0, state.moving + delta);
+            changed();
+        };
+        state = window[callback + 'State'] = {
+            generation: 0,
+            moving: 0,
+            resize: new ResizeObserver(changed),
+            observed: new WeakSet(),
+        };
+        state.resize.observe(document.documentElement);
+        new MutationObserver(changed).observe(document.body, {
+            childList: true, attributes: true, characterData: true, subtree: true,
+        });
+        // Scroll events don't bubble; the capture phase hears every container
+        document.addEventListener('scroll', changed, {capture: true, passive: true});
+        for (const type of ['transitionrun', 'animationstart']) {
+            document.addEventListener(type, moving(1), true);
+        }
+        const ended = ['transitionend', 'transitioncancel', 'animationend', 'animationcancel'];
+        for (const type of ended) {
+            document.addEventListener(type, moving(-1), true);
+        }
+    }
+    const boxes = [];
+    for (const selector of selectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            if (!state.observed.has(el)) {
+                state.observed.add(el);
+                state.resize.observe(el);
+            }
+            const r = el.getBoundingClientRect();
+            if (r.width > 0 && r.height > 0) {
+                boxes.push({x: r.x, y: r.y, width: r.width, height: r.height});
+            }
+        }
+    }
+    return {
+        boxes,
+        generation: state.generation,
+        scrollX: window.scrollX,
+        scrollY: window.scrollY,
+        width: window.innerWidth,
+        height: window.innerHeight,
+    };
+}
+"""
+
+
+def _clamp(value, low, high):
+    return max(low, min(value, high))
+
+
+def crop_frame(data, box, viewport_width):
+    """Crop a screencast frame (base64) to ``box`` given in CSS pixels."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(base64.b64decode(data))) as image:
+        scale = image.width / viewport_width
+        cropped = image.crop((
+            round(box['x'] * scale), round(box['y'] * scale),
+            round((box['x'] + box['width']) * scale), round((box['y'] + box['height']) * scale),
+        ))
+        buffer = io.BytesIO()
+        cropped.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+class LayoutWatcher:
+    """Viewport boxes of the elements matching ``selectors``, read lazily.
+
+    The page reports layout changes through an exposed function, like
+    :class:`~gifcapture.dom.MenuSnapshot`; :meth:`read` only runs an
+    ``evaluate`` again after one (or after a navigation). Those reports
+    arrive a frame late, so :meth:`check` asks the page directly.
+    """
+
+    _callback_ids = itertools.count(1)
+
+    def __init__(self, page, selectors):
+        self.page = page
+        self.selectors = list(selectors)
+        self.callback = f'__captureLayoutChanged{next(self._callback_ids)}'
+        self.reads = 0
+        self._state = None
+        page.expose_function(self.callback, self.invalidate)
+        page.on('framenavigated', self._on_navigated)
+
+    @property
+    def stale(self):
+        return self._state is None
+
+    def invalidate(self):
+        self._state = None
+
+    def read(self):
+        """``{boxes, generation, scrollX, scrollY, width, height}`` for the current layout."""
+        if self._state is None:
+            self._state = self._evaluate(None)
+        return self._state
+
+    def check(self):
+        """Re-read the layout if the page changed it since the last read.
+
+        Called right after a frame is grabbed this sees every change the
+        frame can show, since the page counts them before painting. While
+        anything is transitioning or animating it always re-reads. Returns
+        True if the layout was re-read.
+        """
+        if self._state is None:
+            self.read()
+            return True
+        state = self._evaluate(self._state['generation'])
+        if state is None:
+            return False
+        self._state = state
+        return True
+
+    def _evaluate(self, generation):
+        state = self.page.evaluate(_LAYOUT_JS, {
+            'selectors': self.selectors,
+            'callback': self.callback,
+            'generation': generation,
+        })
+        if state is not None:
+            self.reads += 1
+        return state
+
+    def _on_navigated(self, frame):
+        if frame == self.page.main_frame:
+            self.invalidate()
+
+
+def testid_selectors(testids=(), selectors=()):
+    return [*(f'[data-testid="{testid}"]' for testid in testids), *selectors]
+
+
+class CaptureRegion:
+    """The part of the viewport every frame is clipped to.
+
+    Either a fixed ``rect`` (``{x, y, width, height}`` in viewport CSS
+    pixels) or the union of the boxes of ``testids`` / ``selectors`` on the
+    page, grown by ``padding`` and to at least ``min_width`` x
+    ``min_height``, and kept inside the viewport.
+
+    Every frame of a GIF shares one canvas, so the size is fixed the first
+    time the region is resolved and later resolutions only move it. Reserve
+    room with ``min_width``/``min_height`` for elements that appear later,
+    such as a menu opening above its button. The boxes are only re-read on
+    the next grab after a layout change (see :class:`LayoutWatcher`).
+    """
+
+    def __init__(self, page, rect=None, testids=(), selectors=(), padding=0,
+                 min_width=0, min_height=0):
+        if rect is None and not (testids or selectors):
+            raise ValueError('a capture region needs a rect or elements to cover')
+        self.rect = rect
+        self.layout = LayoutWatcher(page, testid_selectors(testids, selectors))
+        self.padding = padding
+        self.min_width = min_width
+        self.min_height = min_height
+        self.size = None
+        self.view_box = None
+        self.overflows = 0
+        self._clip = None
+
+    def clip(self):
+        """``clip`` for ``Page.captureScreenshot``, in document coordinates."""
+        if self._clip is None or self.layout.stale:
+            self._resolve()
+        return self._clip
+
+    def report(self):
+        width, height = self.size or (0, 0)
+        overflow = f", {self.overflows} layouts larger than the clip" if self.overflows else ''
+        return f"{width}x{height} clip, resolved {self.layout.reads} times{overflow}"
+
+    def _resolve(self):
+        state = self.layout.read()
+        view_width, view_height = state['width'], state['height']
+        boxes = [self.rect] if self.rect else state['boxes']
+        if boxes:
+            pad = self.padding
+            left = min(b['x'] for b in boxes) - pad
+            top = min(b['y'] for b in boxes) - pad
+            right = max(b['x'] + b['width'] for b in boxes) + pad
+            bottom = max(b['y'] + b['height'] for b in boxes) + pad
+        elif self.view_box is not None:
+            # The elements are gone (e.g. after navigating); stay put.
+            box = self.view_box
+            left, top = box['x'], box['y']
+            right, bottom = left + box['width'], top + box['height']
+        else:
+            left, top, right, bottom = 0, 0, view_width, view_height
+
+        if self.size is None:
+            self.size = (
+                round(min(max(right - left, self.min_width), view_width)),
+                round(min(max(bottom - top, self.min_height), view_height)),
+            )
+        width, height = self.size
+        # Padding beyond the viewport edge can't be shown anyway
+        left, right = _clamp(left, 0, view_width), _clamp(right, 0, view_width)
+        top, bottom = _clamp(top, 0, view_height), _clamp(bottom, 0, view_height)
+        if right - left > width or bottom - top > height:
+            self.overflows += 1
+
+        box = self.view_box
+        if box is None or not (
+            box['x'] <= left and right <= box['x'] + width
+            and box['y'] <= top and bottom <= box['y'] + height
+        ):
+            # Centre on the covered elements, then push back inside the viewport
+            box = {
+                'x': round(_clamp((left + right - width) / 2, 0, view_width - width)),
+                'y': round(_clamp((top + bottom - height) / 2, 0, view_height - height)),
+                'width': width,
+                'height': height,
+            }
+        self.view_box = box
+        self._clip = {
+            'x': box['x'] + state['scrollX'],
+            'y': box['y'] + state['scrollY'],
+            'width': width,
+            'height': height,
+            'scale': 1,
+        }
@@ -0,0 +1,119 @@
+"""Block irrelevant requests and serve static assets from a shared disk cache."""
+
+import fnmatch
+import hashlib
+import json
+import os
+from urllib.parse import urlparse
+
+from gifcapture.common import cache_dir, write_atomic
+
+ASSET_CACHE_DIR = cache_dir('GIF_ASSET_CACHE_DIR', 'assets')
+
+# Analytics and error reporting never show up in a GIF (see app/layout.tsx
+# and the Sentry config in next.config.ts).
+BLOCKED_URLS = (
+    '*/_vercel/insights/*',
+    '*/_vercel/speed-insights/*',
+    '*va.vercel-scripts.com/*',
+    '*.sentry.io/*',
+    '*google-analytics.com/*',
+    '*googletagmanager.com/*',
+)
+
+# Response headers replayed with a cached body. The body is stored decoded,
+# so content-encoding and content-length must not be carried over.
+_KEPT_HEADERS = ('content-type', 'cache-control', 'access-control-allow-origin')
+
+# Cache-Control directives that keep a response out of the disk cache.
+_UNSHARED = {'no-store', 'no-cache', 'private'}
+
+
+def _megabytes(size):
+    return f'{size / 1e6:.1f} MB'
+
+
+class RequestFilter:
+    """Context route that aborts blocked URLs and caches immutable assets.
+
+    ``block`` holds ``fnmatch`` patterns matched against the full URL.
+    Images and ``/_next/static/*`` files the server marks ``immutable`` are
+    written to ``cache_dir`` (shared by every run and scenario, keyed by URL)
+    and served from there on later requests without touching the network;
+    the ``next dev`` server doesn't mark its chunks immutable, so they are
+    always fetched. Responses marked ``private``, ``no-store`` or
+    ``no-cache``, or setting a cookie, are never cached. Everything else
+    falls through to other routes (such as a HAR replay) or the network.
+    """
+
+    def __init__(self, block=BLOCKED_URLS, cache=True, cache_dir=ASSET_CACHE_DIR):
+        self.block = tuple(block)
+        self.cache = cache
+        self.cache_dir = cache_dir
+        self.blocked = 0
+        self.hits = 0
+        self.hit_bytes = 0
+        self.stored = 0
+
+    def install(self, context):
+        context.route('**/*', self._handle)
+        return self
+
+    def report(self):
+        return (
+            f"{self.blocked} requests blocked, {self.hits} assets "
+            f"({_megabytes(self.hit_bytes)}) served from disk cache, {self.stored} newly cached"
+        )
+
+    def _handle(self, route):
+        request = route.request
+        if any(fnmatch.fnmatch(request.url, pattern) for pattern in self.block):
+            self.blocked += 1
+            route.abort('blockedbyclient')
+            return
+        if not self.cache or request.method != 'GET' or not self._cacheable(request):
+            route.fallback()
+            return
+        key = hashlib.blake2b(request.url.encode(), digest_size=16).hexdigest()
+        body_path = os.path.join(self.cache_dir, f'{key}.body')
+        meta_path = os.path.join(self.cache_dir, f'{key}.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            self.hits += 1
+            self.hit_bytes += len(body)
+            route.fulfill(status=meta['status'], headers=meta['headers'], body=body)
+            return
+        response = route.fetch()
+        if response.status == 200 and self._immutable(request, response):
+            self._store(body_path, meta_path, request.url, response)
+        route.fulfill(response=response)
+
+    @staticmethod
+    def _cacheable(request):
+        return request.resource_type == 'image' or '/_next/static/' in urlparse(request.url).path
+
+    @staticmethod
+    def _immutable(request, response):
+        directives = {
+            d.strip().split('=')[0].lower()
+            for d in response.headers.get('cache-control', '').split(',')
+        }
+        # Avatars and other per-user images must not end up in a shared cache
+        if directives & _UNSHARED or 'set-cookie' in response.headers:
+            return False
+        if '/_next/static/' in urlparse(request.url).path:
+            return 'immutable' in directives
+        return request.resource_type == 'image'
+
+    def _store(self, body_path, meta_path, url, response):
+        headers = {k: v for k, v in response.headers.items() if k in _KEPT_HEADERS}
+        meta = {'url': url, 'status': response.status, 'headers': headers}
+        # Scenarios run concurrently share the cache, so write each file
+        # under a temporary name and move it into place; the metadata goes
+        # last since its presence marks the entry complete.
+        for path, data in ((body_path, response.body()), (meta_path, json.dumps(meta).encode())):
+            write_atomic(path, data)
+        self.stored += 1
@@ -0,0 +1,180 @@
+"""Regenerate several demo GIFs concurrently against one shared browser.
+
+    cd scripts && python3 -m gifcapture.runner --concurrency 3
+
+Each scenario file (see ``gifcapture.scenario``) runs as its own process
+attached (over CDP) to a single Chromium started here with Playwright's async
+API, so every scenario gets its own browser context and scratch directory
+while sharing one browser. Scenarios that need a login rely on the cached
+session (see ``gifcapture.session``). With ``--incremental`` (or
+``--resume``) each scenario keeps its frames in the frame store and GIFs
+whose frames didn't change are not re-encoded; ``--resume`` also continues
+scenarios whose last run failed from their last completed step.
+
+With ``--matrix`` every variant in a scenario's ``matrix`` (desktop,
+retina, mobile, ...) is recorded as its own job, each in its own context of
+the shared browser. The login and asset cache are prepared once per
+scenario first, so the variants only pay for their own frames.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from playwright.async_api import async_playwright
+
+from gifcapture.backends import launch_options
+from gifcapture.browser import browser_endpoint
+from gifcapture.har import HAR_MODES, har_mode
+from gifcapture.scenario import load_scenario
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'dropdown': 'profile-dropdown',
+    'subscription-page': 'subscription-page',
+    'full-flow': 'subscription-flow',
+}
+
+ScenarioResult = namedtuple('ScenarioResult', 'name returncode elapsed scratch')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def scenario_command(scenario, options=()):
+    """Command line running ``scenario`` with extra ``gifcapture.scenario`` flags."""
+    return [sys.executable, '-m', 'gifcapture.scenario', scenario, *options]
+
+
+async def run_scenario(name, scenario, endpoint, limit, backend, har=None, options=()):
+    """Run one scenario file with its own scratch directory.
+
+    ``options`` are extra ``gifcapture.scenario`` command line flags.
+    """
+    async with limit:
+        scratch = tempfile.mkdtemp(prefix=f'gif-{name}-')
+        env = {
+            **os.environ,
+            'GIF_BROWSER_ENDPOINT': endpoint,
+            'GIF_SCRATCH_DIR': scratch,
+            'GIF_CAPTURE_BACKEND': backend,
+            'GIF_HAR_MODE': har or '',
+        }
+        started = time.monotonic()
+        print(f"[{name}] starting {scenario}")
+        process = await asyncio.create_subprocess_exec(
+            *scenario_command(scenario, options),
+            cwd=SCRIPTS_DIR, env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        async for line in process.stdout:
+            print(f"[{name}] {line.decode(errors='replace').rstrip()}")
+        returncode = await process.wait()
+        elapsed = time.monotonic() - started
+        if returncode == 0:
+            shutil.rmtree(scratch, ignore_errors=True)
+        return ScenarioResult(name, returncode, elapsed, scratch)
+
+
+def matrix_jobs(names):
+    """``(label, scenario, options)`` for every variant of the named scenarios."""
+    jobs = []
+    for name in names:
+        for variant in load_scenario(SCENARIOS[name]).expand_matrix():
+            jobs.append((
+                f'{name}/{variant.variant_name}', SCENARIOS[name],
+                ['--variant', variant.variant_name],
+            ))
+    return jobs
+
+
+async def run_all(names, concurrency=3, backend='polling', headed=False, har=None, options=(),
+                  matrix=False):
+    limit = asyncio.Semaphore(concurrency)
+    endpoint = browser_endpoint()
+    async with async_playwright() as p:
+        browser = None
+        if endpoint is None:
+            port = _free_port()
+            launch = launch_options(backend)
+            launch['args'] = [*launch['args'], f'--remote-debugging-port={port}']
+            launch['headless'] = not headed
+            launch.pop('slow_mo', None)
+            browser = await p.chromium.launch(**launch)
+            endpoint = f'http://127.0.0.1:{port}'
+        try:
+            if not matrix:
+                return await asyncio.gather(*(
+                    run_scenario(name, SCENARIOS[name], endpoint, limit, backend, har, options)
+                    for name in names
+                ))
+            # One login and asset warm-up per scenario, one at a time since
+            # they may share a session, then every variant at once.
+            setup = []
+            for name in names:
+                setup.append(await run_scenario(
+                    f'{name}/setup', SCENARIOS[name], endpoint, limit, backend, har, ['--prepare']
+                ))
+            failed = {r.name.split('/')[0] for r in setup if r.returncode}
+            return setup + list(await asyncio.gather(*(
+                run_scenario(label, scenario, endpoint, limit, backend, har, [*options, *variant])
+                for label, scenario, variant in matrix_jobs(names)
+                if label.split('/')[0] not in failed
+            )))
+        finally:
+            if browser is not None:
+                await browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regenerate demo GIFs concurrently.')
+    parser.add_argument('scenarios', nargs='*', help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--concurrency', type=int, default=3)
+    parser.add_argument('--backend', default=os.environ.get('GIF_CAPTURE_BACKEND', 'polling'))
+    parser.add_argument('--headed', action='store_true', help='show the shared browser window')
+    parser.add_argument('--har', choices=HAR_MODES, default=har_mode(),
+                        help='record every scenario to a HAR archive, or replay them offline')
+    parser.add_argument('--incremental', action='store_true',
+                        help='skip re-encoding GIFs whose frames are unchanged')
+    parser.add_argument('--resume', action='store_true',
+                        help='also continue interrupted scenarios and re-run only the steps '
+                             'that changed')
+    parser.add_argument('--matrix', action='store_true',
+                        help="record every viewport/device variant in each scenario's matrix")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    options = [flag for flag, on in (('--incremental', args.incremental),
+                                     ('--resume', args.resume)) if on]
+    started = time.monotonic()
+    results = asyncio.run(run_all(
+        args.scenarios or list(SCENARIOS), args.concurrency, args.backend, args.headed, args.har,
+        options, args.matrix,
+    ))
+    total = time.monotonic() - started
+
+    print("\n=== SUMMARY ===")
+    for result in results:
+        status = "ok" if result.returncode == 0 else f"FAILED ({result.returncode}), scratch kept at {result.scratch}"
+        print(f"{result.name:<28} {result.elapsed:6.1f}s  {status}")
+    longest = max((r.elapsed for r in results), default=0)
+    print(f"Total {total:.1f}s (longest scenario {longest:.1f}s, sum {sum(r.elapsed for r in results):.1f}s)")
+    sys.exit(0 if all(r.returncode == 0 for r in results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,843 @@
+"""Declarative capture scenarios executed by one shared engine.
+
+A scenario is a JSON file (YAML works too when PyYAML is installed) in
+``scripts/scenarios`` describing the page setup and a list of steps::
+
+    {
+        "output": "profile-dropdown.gif",
+        "login": true,
+        "steps": [
+            {"action": "goto", "path": "/new"},
+            {"action": "require", "testid": "user-nav-button"},
+            {"action": "capture", "repeat": 3, "hold_ms": 100},
+            {"action": "click", "testid": "user-nav-button"},
+            {"action": "menu_open"},
+            {"action": "hover_menu_items", "hold_ms": 350}
+        ]
+    }
+
+Run one with::
+
+    cd scripts && python3 -m gifcapture.scenario profile-dropdown
+
+Every step is checked against :data:`STEPS` when the file is loaded, so a
+typo fails before a browser is started. Any step may carry a ``log`` message
+that is printed before it runs. The capture engine is started by the first
+step that records, so login and navigation never end up in the GIF.
+
+A scenario's ``matrix`` lists viewport/device variants of it, each recorded
+to its own output (``--variant NAME``); ``python3 -m gifcapture.runner
+--matrix`` prepares the login and asset cache once and then records every
+variant concurrently against one browser.
+
+With ``--incremental`` frames go to the content-addressed frame store (see
+``gifcapture.store``) and the GIFs are only re-encoded when the frames
+changed or the files on disk are no longer the ones last encoded;
+``--resume`` also skips every step up to the last page checkpoint before
+the first step that changed since the previous run. Such runs are
+journaled as they go, so after a crash or a failed encode ``--resume``
+continues from the last completed step, or only encodes if every frame was
+captured, instead of repeating the whole flow.
+"""
+
+import argparse
+import functools
+import inspect
+import json
+import os
+import sys
+from collections import namedtuple
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright
+
+from gifcapture.backends import BACKENDS, capture_backend
+from gifcapture.browser import CaptureBrowser
+from gifcapture.capture import CaptureEngine
+from gifcapture.dom import (
+    USER_NAV_MENU,
+    MenuSnapshot,
+    discover_elements,
+    looks_like_plan_card,
+    unique_by_position,
+)
+from gifcapture.encoder import StreamingGifEncoder, encode_frames
+from gifcapture.har import HAR_MODES, HarArchive, har_mode
+from gifcapture.manifest import FrameManifest
+from gifcapture.readiness import Readiness
+from gifcapture.redact import Redactor
+from gifcapture.region import CaptureRegion
+from gifcapture.routing import BLOCKED_URLS, RequestFilter
+from gifcapture.scroll import synthesize_scroll
+from gifcapture.session import SessionCache
+from gifcapture.store import (
+    CAPTURE_ONLY_ACTIONS,
+    CHECKPOINT_ACTIONS,
+    FrameRecorder,
+    FrameStore,
+    RunJournal,
+    collapse,
+    encoding_key,
+    output_digests,
+    save_checkpoint,
+    step_keys,
+)
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO_DIR = os.path.join(SCRIPTS_DIR, 'scenarios')
+OUTPUT_DIR = os.environ.get(
+    'GIF_OUTPUT_DIR', "/home/qualia/Desktop/Projects/aiagents/aibossbrainz/docs/demo/gifs"
+)
+
+# Settings a scenario file may override.
+DEFAULTS = {
+    'base_url': 'http://localhost:3000',
+    'login': False,
+    'viewport': {'width': 1400, 'height': 900},
+    'device_scale_factor': 1,
+    'is_mobile': False,
+    'has_touch': False,
+    'slow_mo': 50,
+    # Frames per second of the GIF timeline; the screencast backend records
+    # at ``screencast_framerate`` instead.
+    'framerate': 6,
+    'screencast_framerate': 20,
+    'width': 1000,
+    # Extra outputs from the same encode: [{"output": "x-800.gif", "width": 800}]
+    'extra_outputs': [],
+    # Colour change (per channel) below which a pixel counts as unchanged
+    # when frames are cut down to the rectangle that changed; null keeps
+    # ffmpeg's frames as they are.
+    'delta_tolerance': 0,
+    # Other renditions of the main output: any of "webp", "avif", "mp4" and
+    # "png" (a poster), reported with their size and SSIM in
+    # <output>.formats.json.
+    'formats': [],
+    'playback_speed': 1,
+    # URL patterns to abort on top of routing.BLOCKED_URLS, and whether to
+    # serve images and immutable Next.js assets from the shared disk cache.
+    'block': [],
+    'asset_cache': True,
+    # CaptureRegion arguments ({"testids": [...], "padding": 16, ...} or
+    # {"rect": {...}}) to clip every frame to; the whole viewport if unset.
+    'region': None,
+    # Redactor arguments ({"testids": [...], "mode": "blur", ...}) for
+    # elements to hide in every frame.
+    'redact': None,
+    # Variants to record with --variant / runner --matrix: names from
+    # VIEWPORT_PRESETS or {"name": ..., "viewport": ..., ...} (see
+    # VARIANT_KEYS).
+    'matrix': [],
+}
+
+VIEWPORT_PRESETS = {
+    'desktop': {'suffix': ''},
+    'retina': {'device_scale_factor': 2},
+    'mobile': {
+        'viewport': {'width': 390, 'height': 844},
+        'device_scale_factor': 3,
+        'is_mobile': True,
+        'has_touch': True,
+    },
+}
+
+# What a matrix entry may set. ``suffix`` is appended to the scenario name
+# and output files (``-<name>`` by default); ``width`` defaults to the
+# scenario's scaled by the change in device scale factor.
+VARIANT_KEYS = (
+    'name', 'suffix', 'viewport', 'device_scale_factor', 'is_mobile', 'has_touch', 'width',
+)
+
+# ``unique_by`` keys for hover_cards: one card per (x, y) or per row.
+POSITION_KEYS = {
+    'xy': lambda box: (round(box['x']), round(box['y'])),
+    'y': lambda box: int(box['y']),
+}
+
+# Appends a stylesheet to every document the page loads.
+_STYLE_JS = """
+(() => {
+    const add = () => {
+        const style = document.createElement('style');
+        style.textContent = %s;
+        document.head.appendChild(style);
+    };
+    if (document.head) add();
+    else document.addEventListener('DOMContentLoaded', add);
+})();
+"""
+
+Step = namedtuple('Step', 'action log run')
+
+
+class ScenarioError(ValueError):
+    """A scenario file that can't be run: bad settings or an invalid step."""
+
+
+class Scenario:
+    """A loaded scenario: its settings plus the compiled steps."""
+
+    def __init__(self, name, steps, output=None, **settings):
+        unknown = set(settings) - set(DEFAULTS)
+        if unknown:
+            raise ScenarioError(f"{name}: unknown settings {', '.join(sorted(unknown))}")
+        self.name = name
+        self.output = output or f'{name}.gif'
+        self.settings = {**DEFAULTS, **settings}
+        for key, cls in (('region', CaptureRegion), ('redact', Redactor)):
+            if self.settings[key] is not None:
+                try:
+                    inspect.signature(cls).bind(None, **self.settings[key])
+                except TypeError as exc:
+                    raise ScenarioError(f"{name} {key}: {exc}") from None
+        self.specs = [dict(spec) for spec in steps]
+        self.steps = [compile_step(name, i, spec) for i, spec in enumerate(steps, 1)]
+        self._validate_matrix()
+
+    def __getattr__(self, key):
+        try:
+            return self.__dict__['settings'][key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def framerate_for(self, backend):
+        return self.screencast_framerate if backend == 'screencast' else self.framerate
+
+    def expand_matrix(self):
+        """One scenario per ``matrix`` entry."""
+        return [self.variant(spec) for spec in self.matrix]
+
+    def _validate_matrix(self):
+        names = [self._matrix_spec(spec)['name'] for spec in self.matrix]
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ScenarioError(f"{self.name}: duplicate variants {', '.join(duplicates)}")
+
+    def _matrix_spec(self, spec):
+        """A ``matrix`` entry as a dict, with presets expanded."""
+        if isinstance(spec, str):
+            if spec not in VIEWPORT_PRESETS:
+                raise ScenarioError(
+                    f"{self.name}: unknown variant {spec!r} "
+                    f"(expected one of {', '.join(VIEWPORT_PRESETS)})"
+                )
+            spec = {'name': spec, **VIEWPORT_PRESETS[spec]}
+        if 'name' not in spec or set(spec) - set(VARIANT_KEYS):
+            raise ScenarioError(
+                f"{self.name}: variants need a name and may only set {', '.join(VARIANT_KEYS[1:])}"
+            )
+        return spec
+
+    def variant(self, spec):
+        """This scenario with a matrix entry's viewport and device settings."""
+        spec = self._matrix_spec(spec)
+        suffix = spec.get('suffix', f"-{spec['name']}")
+        settings = {**self.settings, 'matrix': []}
+        for key in ('viewport', 'device_scale_factor', 'is_mobile', 'has_touch'):
+            settings[key] = spec.get(key, settings[key])
+        ratio = settings['device_scale_factor'] / self.device_scale_factor
+        settings['width'] = spec.get('width', round(self.width * ratio))
+        settings['extra_outputs'] = [
+            {'output': _suffixed(o['output'], suffix), 'width': round(o['width'] * ratio)}
+            for o in self.extra_outputs
+        ]
+        scenario = Scenario(
+            f'{self.name}{suffix}', self.specs, _suffixed(self.output, suffix), **settings
+        )
+        scenario.variant_name = spec['name']
+        return scenario
+
+
+def _suffixed(path, suffix):
+    root, ext = os.path.splitext(path)
+    return f'{root}{suffix}{ext}'
+
+
+def compile_step(name, index, spec):
+    """Bind one step dict to its action, checking its arguments."""
+    spec = dict(spec)
+    action = spec.pop('action', None)
+    log = spec.pop('log', None)
+    if action not in STEPS:
+        raise ScenarioError(
+            f"{name} step {index}: unknown action {action!r} (expected one of {', '.join(STEPS)})"
+        )
+    function = STEPS[action]
+    try:
+        inspect.signature(function).bind(None, **spec)
+    except TypeError as exc:
+        raise ScenarioError(f"{name} step {index} ({action}): {exc}") from None
+    return Step(action, log, functools.partial(function, **spec))
+
+
+def scenario_path(name):
+    """``name`` itself if it is a file, else the matching file in SCENARIO_DIR."""
+    if os.path.isfile(name):
+        return name
+    for extension in ('.json', '.yaml', '.yml'):
+        path = os.path.join(SCENARIO_DIR, f'{name}{extension}')
+        if os.path.isfile(path):
+            return path
+    raise ScenarioError(f"No scenario {name!r} in {SCENARIO_DIR}")
+
+
+def load_scenario(path):
+    path = scenario_path(path)
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as exc:
+                raise ScenarioError('YAML scenarios need PyYAML installed') from exc
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    name = os.path.splitext(os.path.basename(path))[0]
+    if not isinstance(data, dict) or 'steps' not in data:
+        raise ScenarioError(f"{name}: expected an object with a 'steps' list")
+    return Scenario(name, **data)
+
+
+class ScenarioRun:
+    """Page, readiness waits, engine and menu cache shared by a run's steps.
+
+    A ``checkpoint`` (see :func:`~gifcapture.store.save_checkpoint`) reopens
+    the page where an earlier run saved it instead of starting blank.
+    """
+
+    def __init__(self, scenario, browser, encoder, backend, output_dir, har=None,
+                 har_fallback=False, checkpoint=None):
+        self.scenario = scenario
+        self.encoder = encoder
+        self.backend = backend
+        self.output_dir = output_dir
+        self.checkpoint = checkpoint
+        self.step = None
+        self.styles = []
+        options = {
+            'viewport': scenario.viewport,
+            'device_scale_factor': scenario.device_scale_factor,
+            'is_mobile': scenario.is_mobile,
+            'has_touch': scenario.has_touch,
+        }
+        self.session = SessionCache(scenario.base_url) if scenario.login else None
+        if checkpoint is not None:
+            context = browser.new_context(storage_state=checkpoint['storage_state'], **options)
+        elif self.session is not None:
+            context = self.session.new_context(browser, **options)
+        else:
+            context = browser.new_context(**options)
+        # Routes added later run first, so a HAR replay answers before the
+        # filter and only its fallbacks reach it.
+        self.requests = RequestFilter([*BLOCKED_URLS, *scenario.block], scenario.asset_cache)
+        self.requests.install(context)
+        if har:
+            HarArchive(scenario.name).attach(context, har, har_fallback)
+        self.page = context.new_page()
+        self.ready = Readiness(self.page)
+        self._engine = None
+        self._menus = {}
+        if checkpoint is not None:
+            for css in checkpoint['styles']:
+                inject_css(self, css)
+            self.page.goto(checkpoint['url'])
+            self.ready.network_idle()
+            self.page.evaluate('([x, y]) => window.scrollTo(x, y)', checkpoint['scroll'])
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            # Grabs stay on this thread; decoding and piping to ffmpeg happen
+            # in background workers. Each frame plays for as long as it was
+            # on screen, and repeated "hold" frames are merged into one
+            # longer GIF frame.
+            region = redactor = None
+            if self.scenario.region is not None:
+                region = CaptureRegion(self.page, **self.scenario.region)
+                saved = self.checkpoint and self.checkpoint['region']
+                if saved:
+                    # Frames reused from the earlier run fixed the canvas size
+                    region.size = tuple(saved['size'])
+                    region.view_box = saved['view_box']
+            if self.scenario.redact is not None:
+                redactor = Redactor(self.page, **self.scenario.redact)
+            # Stored frames are collapsed when they are encoded instead.
+            self._engine = CaptureEngine(
+                self.page, self.encoder, backend=self.backend,
+                collapse_duplicates=not isinstance(self.encoder, FrameRecorder),
+                variable_frame_rate=True, playback_speed=self.scenario.playback_speed,
+                region=region, redactor=redactor,
+            )
+            self._engine.writer.step = self.step
+            self.ready.track(self._engine)
+        return self._engine
+
+    @property
+    def started(self):
+        return self._engine is not None
+
+    @property
+    def submitted(self):
+        """Frames handed to the capture engine so far."""
+        return self._engine.writer.submitted if self._engine is not None else 0
+
+    def begin_step(self, index):
+        """Tag the frames captured from now on with step ``index``."""
+        self.step = index
+        if self._engine is not None:
+            self._engine.writer.step = index
+
+    def save_checkpoint(self):
+        region = self._engine.region if self._engine is not None else None
+        return save_checkpoint(self.page, self.styles, region)
+
+    def menu(self, menu_selector, item_selector):
+        """One MenuSnapshot per menu; it refreshes itself when the menu reopens."""
+        key = (menu_selector, item_selector)
+        if key not in self._menus:
+            self._menus[key] = MenuSnapshot(self.page, menu_selector, item_selector)
+        return self._menus[key]
+
+    def hover_frames(self, hover, settle_selector, repeat, hold_ms, linger_ms=0):
+        """Hover, let the hover styles finish, then capture ``repeat`` frames."""
+        engine = self.engine
+        hover()
+        self.ready.animations_settled(settle_selector)
+        for i in range(repeat):
+            if i and hold_ms:
+                engine.hold(hold_ms / 1000)
+            engine.capture()
+        if linger_ms:
+            engine.hold(linger_ms / 1000)
+
+    def close(self):
+        if self._engine is not None:
+            self._engine.close()
+            print(f"Capture stats: {self._engine.report()}")
+        print(f"Readiness: {self.ready.report()}")
+        print(f"Network: {self.requests.report()}")
+
+
+def _target(testid, selector):
+    if testid:
+        return f'[data-testid="{testid}"]'
+    if selector:
+        return selector
+    raise ScenarioError('step needs a "testid" or a "selector"')
+
+
+def _find_menu_item(run, text, menu, items):
+    snapshot = run.menu(menu, items)
+    item = snapshot.find(text)
+    if item is None:
+        options = ', '.join(snapshot.texts) or 'none'
+        raise RuntimeError(f"No menu item containing {text!r} (available: {options})")
+    return item
+
+
+def goto(run, path):
+    """Open ``path``; login scenarios log in first if the session expired."""
+    if run.session is not None:
+        run.session.ensure_logged_in(run.page, path)
+    else:
+        run.page.goto(f'{run.scenario.base_url}{path}')
+    run.ready.network_idle()
+
+
+def require(run, testid=None, selector=None, timeout=5000, debug_screenshot=None):
+    """Stop the run unless the element shows up, optionally saving a screenshot."""
+    target = _target(testid, selector)
+    try:
+        run.page.locator(target).first.wait_for(state='visible', timeout=timeout)
+    except PlaywrightTimeoutError:
+        if debug_screenshot:
+            path = os.path.join(run.output_dir, debug_screenshot)
+            run.page.screenshot(path=path, full_page=True)
+            print(f"Debug screenshot saved: {path}")
+        raise RuntimeError(f"{target} not found on {run.page.url}") from None
+
+
+def click(run, testid=None, selector=None, optional=False, timeout=2000):
+    """Click an element; ``optional`` clicks skip it if it isn't shown in time."""
+    locator = run.page.locator(_target(testid, selector)).first
+    if optional:
+        try:
+            locator.wait_for(state='visible', timeout=timeout)
+        except PlaywrightTimeoutError:
+            return
+    locator.click()
+
+
+def capture(run, repeat=1, hold_ms=0):
+    """Capture ``repeat`` frames, holding ``hold_ms`` after each."""
+    engine = run.engine
+    for _ in range(repeat):
+        engine.capture()
+        if hold_ms:
+            engine.hold(hold_ms / 1000)
+
+
+def hold(run, ms):
+    run.engine.hold(ms / 1000)
+
+
+def network_idle(run):
+    run.ready.network_idle()
+
+
+def menu_open(run, menu=USER_NAV_MENU):
+    run.ready.menu_open(menu)
+
+
+def settle(run, selector=None):
+    run.ready.animations_settled(selector)
+
+
+def wait_url(run, pattern):
+    run.ready.url(pattern)
+
+
+def hover_menu_items(run, hold_ms=250, repeat=2, menu=USER_NAV_MENU, items='a, button'):
+    """Hover every item of an open menu in turn."""
+    snapshot = run.menu(menu, items)
+    print(f"   Hovering {len(snapshot.items)} menu items...")
+    for item in snapshot.items:
+        print(f"   - {item.text.strip()}")
+        run.hover_frames(functools.partial(snapshot.hover, item), menu, repeat, hold_ms)
+
+
+def hover_menu_item(run, text, repeat=1, hold_ms=0, linger_ms=0, menu=USER_NAV_MENU,
+                    items='a, button'):
+    """Hover the first menu item containing ``text``."""
+    item = _find_menu_item(run, text, menu, items)
+    print(f"   Hovering {item.text.strip()}")
+    snapshot = run.menu(menu, items)
+    run.hover_frames(functools.partial(snapshot.hover, item), menu, repeat, hold_ms, linger_ms)
+
+
+def click_menu_item(run, text, menu=USER_NAV_MENU, items='a, button'):
+    _find_menu_item(run, text, menu, items).locator(run.page).click()
+
+
+def scroll(run, deltas, frames_per_step=4, step_ms=300):
+    """Scroll by each of ``deltas``, sliced from one full-page screenshot."""
+    synthesize_scroll(run.page, run.engine, deltas, frames_per_step, step_ms / 1000)
+
+
+def scroll_to(run, y=0):
+    run.page.evaluate('(y) => window.scrollTo(0, y)', y)
+
+
+def hover_cards(run, selectors, text_contains=None, plan_cards=False, min_size=0,
+                unique_by='xy', limit=None, scroll_into_view=False, repeat=2,
+                hold_ms=0, linger_ms=0):
+    """Hover card-like elements found with one ``evaluate``.
+
+    Candidates matching ``selectors`` are filtered to plan cards and/or
+    boxes larger than ``min_size`` in both directions, reduced to one per
+    position (``unique_by`` is ``"xy"`` or ``"y"``) and capped at ``limit``.
+    A card that can't be hovered is reported and skipped.
+    """
+    if unique_by not in POSITION_KEYS:
+        raise ScenarioError(f"unique_by must be one of {', '.join(POSITION_KEYS)}")
+    candidates = discover_elements(run.page, selectors, text_contains)
+    if plan_cards:
+        candidates = [c for c in candidates if looks_like_plan_card(c)]
+    if min_size:
+        candidates = [
+            c for c in candidates
+            if c.box and c.box['width'] > min_size and c.box['height'] > min_size
+        ]
+    cards = unique_by_position(candidates, POSITION_KEYS[unique_by])[:limit]
+    print(f"   Hovering {len(cards)} cards...")
+    for i, card in enumerate(cards, 1):
+        lines = card.text.strip().split('\n')
+        print(f"   {i}. {lines[0][:30]}")
+        locator = card.locator(run.page)
+        try:
+            if scroll_into_view:
+                locator.scroll_into_view_if_needed()
+            run.hover_frames(locator.hover, card.selector, repeat, hold_ms, linger_ms)
+        except PlaywrightError as exc:
+            print(f"   Could not hover card {i}: {exc}")
+
+
+def inject_css(run, css):
+    """Add ``css`` to the current page and every page loaded after it."""
+    run.styles.append(css)
+    run.page.context.add_init_script(_STYLE_JS % json.dumps(css))
+    if run.page.url != 'about:blank':
+        run.page.add_style_tag(content=css)
+
+
+STEPS = {
+    'goto': goto,
+    'require': require,
+    'click': click,
+    'capture': capture,
+    'hold': hold,
+    'network_idle': network_idle,
+    'menu_open': menu_open,
+    'settle': settle,
+    'wait_url': wait_url,
+    'hover_menu_items': hover_menu_items,
+    'hover_menu_item': hover_menu_item,
+    'click_menu_item': click_menu_item,
+    'scroll': scroll,
+    'scroll_to': scroll_to,
+    'hover_cards': hover_cards,
+    'inject_css': inject_css,
+}
+
+
+def execute_scenario(scenario, backend='polling', output_dir=OUTPUT_DIR, har=None,
+                     har_fallback=False):
+    """Run every step of ``scenario`` and return the finished encoder.
+
+    The frame timings (see :class:`~gifcapture.manifest.FrameManifest`) are
+    saved next to the GIF as ``<output>.frames.json``. ``har`` is ``'record'``
+    or ``'replay'`` to capture against a recorded copy of the network (see
+    :class:`~gifcapture.har.HarArchive`).
+    """
+    gif_path = os.path.join(output_dir, scenario.output)
+    extra_outputs = [
+        (os.path.join(output_dir, o['output']), o['width']) for o in scenario.extra_outputs
+    ]
+    # Frames are piped straight into ffmpeg, so nothing is written to
+    # output_dir until the finished GIF.
+    with sync_playwright() as p, StreamingGifEncoder(
+        gif_path, framerate=scenario.framerate_for(backend), width=scenario.width,
+        extra_outputs=extra_outputs, delta_tolerance=scenario.delta_tolerance,
+        formats=scenario.formats,
+    ) as encoder:
+        # Attaches to the warm browser (python3 -m gifcapture.browser) if running
+        browser = CaptureBrowser(p, backend, slow_mo=scenario.slow_mo)
+        try:
+            run = ScenarioRun(scenario, browser, encoder, backend, output_dir, har, har_fallback)
+            for index, step in enumerate(scenario.steps):
+                if step.log:
+                    print(step.log)
+                run.begin_step(index)
+                step.run(run)
+            run.close()
+            print(f"\nCaptured {encoder.count} frames")
+        finally:
+            browser.close()
+        print("\nFinishing GIF...")
+    if encoder.ok and run.started:
+        run.engine.manifest.save(_frames_path(gif_path))
+    return encoder
+
+
+def _frames_path(gif_path):
+    return f'{os.path.splitext(gif_path)[0]}.frames.json'
+
+
+def prepare_scenario(scenario, backend='polling', har=None, har_fallback=False):
+    """Run ``scenario`` up to its first ``goto`` without capturing anything.
+
+    This logs in (refreshing the cached session) and fills the asset cache,
+    so variants started together afterwards share both instead of racing
+    to create them.
+    """
+    actions = [step.action for step in scenario.steps]
+    if 'goto' not in actions:
+        return
+    with sync_playwright() as p:
+        browser = CaptureBrowser(p, backend, slow_mo=scenario.slow_mo)
+        try:
+            run = ScenarioRun(scenario, browser, None, backend, OUTPUT_DIR, har, har_fallback)
+            for step in scenario.steps[:actions.index('goto') + 1]:
+                step.run(run)
+            run.close()
+        finally:
+            browser.close()
+
+
+def build_scenario(scenario, backend='polling', output_dir=OUTPUT_DIR, har=None,
+                   har_fallback=False, resume=False, store=None):
+    """Capture ``scenario`` into the frame store; encode only if its frames changed.
+
+    Returns the closed encoder, or None when the GIFs on disk already show
+    exactly these frames. The run is logged to a :class:`RunJournal` as it
+    goes and the journal is removed once the GIFs are written, next to
+    their frame timings (``<output>.frames.json``).
+
+    With ``resume`` a run interrupted by an error picks up after its last
+    completed step, or only encodes if every frame was captured. Otherwise
+    it restarts from the last checkpoint before the first step that changed
+    since the previous build, reusing the stored frames of the steps before
+    it.
+    """
+    store = store or FrameStore()
+    previous = store.load_manifest(scenario.name)
+    keys = step_keys(scenario, backend)
+    journal_path = store.journal_path(scenario.name)
+    start = replay = 0
+    checkpoint, steps = None, []
+    if resume:
+        interrupted = RunJournal.load(journal_path)
+        point = interrupted.resume_point(keys, store)
+        if point is not None:
+            start, replay, checkpoint = point
+            steps = interrupted.step_entries(start)
+            if start == len(keys) and interrupted.captured:
+                print("Every frame of the interrupted run was captured")
+        elif previous is not None:
+            start, checkpoint = store.resume_point(previous, keys)
+            replay, steps = start, previous['steps'][:start]
+    framerate = scenario.framerate_for(backend)
+    journal = RunJournal(journal_path)
+    journal.begin(keys, steps)
+    carried = len(journal.frames)
+    recorder = FrameRecorder(store, framerate, journal)
+
+    try:
+        if start < len(scenario.steps):
+            if start:
+                print(f"Resuming after step {start} ({scenario.steps[start - 1].action})")
+            if replay < start:
+                print(f"Replaying {start - replay} steps since the last checkpoint "
+                      "to restore the page")
+                recorder.skip = float('inf')
+            with sync_playwright() as p:
+                browser = CaptureBrowser(p, backend, slow_mo=scenario.slow_mo)
+                try:
+                    run = ScenarioRun(
+                        scenario, browser, recorder, backend, output_dir, har, har_fallback,
+                        checkpoint=store.load_checkpoint(checkpoint) if checkpoint else None,
+                    )
+                    for index in range(replay, len(scenario.steps)):
+                        step = scenario.steps[index]
+                        if index == start:
+                            # Frames submitted so far belong to replayed steps
+                            recorder.skip = run.submitted
+                        replaying = index < start
+                        if replaying and step.action in CAPTURE_ONLY_ACTIONS:
+                            continue
+                        if step.log and not replaying:
+                            print(step.log)
+                        run.begin_step(index)
+                        step.run(run)
+                        saved = step.action in CHECKPOINT_ACTIONS
+                        if saved:
+                            store.save_checkpoint(keys[index], run.save_checkpoint())
+                        if not replaying:
+                            journal.step(
+                                index, step.action, saved,
+                                carried + run.submitted - recorder.skip,
+                            )
+                    run.close()
+                finally:
+                    browser.close()
+        journal.finish_capture()
+    finally:
+        journal.close()
+    steps = journal.step_entries()
+    print(f"\nCaptured {recorder.count} frames, reused {start} steps; {store.report()}")
+
+    frames = collapse([frame for step in steps for frame in step['frames']])
+    outputs = [
+        (os.path.join(output_dir, scenario.output), scenario.width),
+        *((os.path.join(output_dir, o['output']), o['width']) for o in scenario.extra_outputs),
+    ]
+    manifest = {
+        'scenario': scenario.name,
+        'backend': backend,
+        'steps': steps,
+        'encoding': encoding_key(
+            frames, framerate, outputs, scenario.delta_tolerance, scenario.formats
+        ),
+    }
+    root = os.path.splitext(outputs[0][0])[0]
+    paths = [*(path for path, _ in outputs), *(f'{root}.{fmt}' for fmt in scenario.formats)]
+    # Other scenarios and scripts write some of the same files, so the
+    # outputs must still be the ones this manifest's encode produced.
+    digests = output_digests(paths)
+    if (previous is not None and previous.get('encoding') == manifest['encoding']
+            and None not in digests.values() and previous.get('outputs') == digests):
+        manifest['outputs'] = digests
+        store.save_manifest(scenario.name, manifest)
+        FrameManifest.from_steps(steps).save(_frames_path(outputs[0][0]))
+        journal.remove()
+        store.prune_checkpoints()
+        return None
+
+    print("\nEncoding GIF...")
+    encoder = encode_frames(
+        (store.get(key) for key, _ in frames), outputs[0][0], framerate, scenario.width,
+        durations=[duration for _, duration in frames], extra_outputs=outputs[1:],
+        delta_tolerance=scenario.delta_tolerance, formats=scenario.formats,
+    )
+    if encoder.ok:
+        manifest['outputs'] = output_digests(paths)
+        FrameManifest.from_steps(steps).save(_frames_path(outputs[0][0]))
+        journal.remove()
+    else:
+        # The journal keeps the captured frames for an encode-only --resume
+        manifest['encoding'] = None
+    store.save_manifest(scenario.name, manifest)
+    store.prune_checkpoints()
+    return encoder
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record a demo GIF from a scenario file.')
+    parser.add_argument('scenario', help='scenario file, or the name of one in scripts/scenarios')
+    parser.add_argument('--backend', choices=BACKENDS, default=capture_backend())
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--har', choices=HAR_MODES, default=har_mode(),
+                        help='record the network to a HAR archive, or replay it offline')
+    parser.add_argument('--har-fallback', action='store_true',
+                        help='when replaying, fetch requests missing from the archive')
+    parser.add_argument('--incremental', action='store_true',
+                        help='keep frames in the frame store and skip unchanged encodes')
+    parser.add_argument('--resume', action='store_true',
+                        help='like --incremental, continuing an interrupted run or '
+                             're-running only the steps that changed')
+    parser.add_argument('--variant', help="record one entry of the scenario's matrix")
+    parser.add_argument('--prepare', action='store_true',
+                        help='only log in and warm the asset cache for the variants')
+    parser.add_argument('--check', action='store_true', help='validate the scenario and exit')
+    args = parser.parse_args(argv)
+    try:
+        scenario = load_scenario(args.scenario)
+    except ScenarioError as exc:
+        parser.error(str(exc))
+    if args.check:
+        variants = ', '.join(v.variant_name for v in scenario.expand_matrix()) or 'none'
+        print(f"{scenario.name}: {len(scenario.steps)} steps OK, variants: {variants}")
+        return
+    if args.variant:
+        matching = [v for v in scenario.expand_matrix() if v.variant_name == args.variant]
+        if not matching:
+            parser.error(f"{scenario.name} has no variant {args.variant!r}")
+        scenario = matching[0]
+    if args.prepare:
+        prepare_scenario(scenario, args.backend, args.har, args.har_fallback)
+        return
+
+    if args.incremental or args.resume:
+        encoder = build_scenario(
+            scenario, args.backend, args.output_dir, args.har, args.har_fallback, args.resume
+        )
+        if encoder is None:
+            print(f"\n✓ GIFs unchanged, skipped encoding {scenario.output}")
+            return
+    else:
+        encoder = execute_scenario(
+            scenario, args.backend, args.output_dir, args.har, args.har_fallback
+        )
+    if not encoder.ok:
+        print("FFmpeg error:", encoder.stderr)
+        if args.incremental or args.resume:
+            print("The frames are kept; run again with --resume to only re-encode them")
+        sys.exit(1)
+    for path, _ in encoder.outputs:
+        print(f"\n✓ GIF created: {path}")
+    print("\n" + "\n".join(encoder.report()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Synthesize scroll animations by slicing a single full-page screenshot."""
+
+import functools
+import io
+
+from gifcapture.common import arrays
+
+
+def ease_in_out_cubic(t):
+    if t < 0.5:
+        return 4 * t * t * t
+    return 1 - (-2 * t + 2) ** 3 / 2
+
+
+def cumulative_targets(start, deltas):
+    """Turn ``window.scrollBy`` deltas into absolute scroll targets."""
+    targets = []
+    position = start
+    for delta in deltas:
+        position += delta
+        targets.append(position)
+    return targets
+
+
+def scroll_positions(start, targets, frames_per_step=1, easing=ease_in_out_cubic, limit=None):
+    """Eased scroll offsets that visit each target in turn.
+
+    Every move from one target to the next is split into ``frames_per_step``
+    frames; positions are clamped to ``[0, limit]`` like a real scroll.
+    """
+    positions = []
+    previous = start
+    for target in targets:
+        if limit is not None:
+            target = max(0, min(target, limit))
+        for k in range(1, frames_per_step + 1):
+            positions.append(round(previous + (target - previous) * easing(k / frames_per_step)))
+        previous = target
+    return positions
+
+
+def _encode_png(pixels):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def synthesize_scroll(page, engine, deltas, frames_per_step=4, step_duration=0.3,
+                      easing=ease_in_out_cubic):
+    """Capture one full-page screenshot and emit the scroll as sliced frames.
+
+    ``deltas`` are the ``window.scrollBy`` amounts a scenario would have used;
+    each becomes ``frames_per_step`` eased frames spread over
+    ``step_duration`` seconds. Frames are handed to the engine's background
+    workers for PNG encoding, and the page is left scrolled to the final
+    position. A screencast backend is paused meanwhile so the temporary
+    full-page resize is never recorded. With a capture region each slice is
+    cropped to the region's place in the viewport; with a redactor the
+    screenshot is redacted once, before it is sliced. Fixed or sticky
+    elements are drawn where they sit in the full document, so use this for
+    pages whose chrome scrolls with the content.
+    """
+    np, Image = arrays('scroll synthesis')
+
+    engine.backend.pause()
+    started = engine.backend.clock()
+    metrics = page.evaluate(
+        '() => ({y: window.scrollY, width: window.innerWidth, height: window.innerHeight,'
+        ' dpr: window.devicePixelRatio})'
+    )
+    with Image.open(io.BytesIO(page.screenshot(full_page=True))) as image:
+        document = np.array(image.convert('RGB'))
+
+    scale = metrics['dpr']
+    if engine.redactor is not None:
+        engine.redactor.redact_document(document, 0, metrics['y'], scale)
+    view_height = round(metrics['height'] * scale)
+    view_width = round(metrics['width'] * scale)
+    limit = (document.shape[0] - view_height) / scale
+    left, top, width, height = 0, 0, view_width, view_height
+    if engine.region is not None:
+        engine.region.clip()
+        box = engine.region.view_box
+        left, top = round(box['x'] * scale), round(box['y'] * scale)
+        width, height = round(box['width'] * scale), round(box['height'] * scale)
+    targets = cumulative_targets(metrics['y'], deltas)
+    positions = scroll_positions(metrics['y'], targets, frames_per_step, easing, limit)
+
+    frames = []
+    for position in positions:
+        y = round(position * scale) + top
+        frames.append(functools.partial(
+            _encode_png, np.ascontiguousarray(document[y:y + height, left:left + width])
+        ))
+    engine.insert_frames(frames, step_duration / frames_per_step, started=started)
+
+    final = positions[-1] if positions else metrics['y']
+    page.evaluate(f'window.scrollTo(0, {final})')
+    engine.backend.resume()
+    return final
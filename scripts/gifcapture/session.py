@@ -0,0 +1,90 @@
+"""Cached authenticated sessions so capture runs don't need a manual login."""
+
+import json
+import os
+import re
+import sys
+from urllib.parse import urlparse
+
+from gifcapture.common import cache_dir, write_atomic
+
+SESSION_DIR = cache_dir('GIF_SESSION_DIR', 'sessions')
+
+
+def is_login_url(url):
+    return urlparse(url).path.rstrip('/') in ('/login', '/signup')
+
+
+class SessionCache:
+    """Playwright ``storage_state`` (cookies + localStorage) per base URL.
+
+    The first run logs in once, either with ``GIF_LOGIN_EMAIL`` /
+    ``GIF_LOGIN_PASSWORD`` or, on an interactive terminal, by waiting for
+    you to log in in the browser. Later runs start already authenticated;
+    if the app redirects to ``/login`` anyway the session is refreshed and
+    saved again. The saved cookies are readable by their owner only.
+    """
+
+    def __init__(self, base_url, directory=SESSION_DIR):
+        self.base_url = base_url.rstrip('/')
+        self.directory = directory
+        key = re.sub(r'[^A-Za-z0-9.-]+', '_', urlparse(self.base_url).netloc)
+        self.path = os.path.join(directory, f'{key}.json')
+
+    @property
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def new_context(self, browser, **options):
+        """``browser.new_context()`` preloaded with the cached session."""
+        if self.exists:
+            options['storage_state'] = self.path
+        return browser.new_context(**options)
+
+    def ensure_logged_in(self, page, path='/new', login=None):
+        """Open ``path``; log in and refresh the cache if sent to the login page.
+
+        ``login`` is a callable taking the page that authenticates it (the
+        default uses credentials or a manual login). Returns True when the
+        session had to be refreshed.
+        """
+        page.goto(f'{self.base_url}{path}')
+        if not is_login_url(page.url):
+            return False
+        (login or self.login)(page)
+        if is_login_url(page.url):
+            raise RuntimeError(f'Still on {page.url} after logging in')
+        self.save(page.context)
+        page.goto(f'{self.base_url}{path}')
+        return True
+
+    def login(self, page):
+        email = os.environ.get('GIF_LOGIN_EMAIL')
+        password = os.environ.get('GIF_LOGIN_PASSWORD')
+        if email and password:
+            page.goto(f'{self.base_url}/login')
+            page.locator('input[name="email"]').fill(email)
+            page.locator('input[name="password"]').fill(password)
+            page.locator('button[type="submit"]').click()
+            page.wait_for_url(lambda url: not is_login_url(url))
+            return
+        if not sys.stdin.isatty():
+            raise RuntimeError(
+                f'No cached session for {self.base_url}; set GIF_LOGIN_EMAIL and '
+                'GIF_LOGIN_PASSWORD or run once from a terminal'
+            )
+        print("=" * 60)
+        print(" NO CACHED SESSION - PLEASE LOG IN ")
+        print("=" * 60)
+        print("1. Log in to your account in the browser window")
+        print("2. Come back here and press Enter")
+        print(f"The session is saved to {self.path} for later runs.")
+        print("=" * 60)
+        input("\nPress Enter after you've logged in...")
+
+    def save(self, context):
+        write_atomic(self.path, json.dumps(context.storage_state()).encode(), private=True)
+
+    def clear(self):
+        if self.exists:
+            os.remove(self.path)
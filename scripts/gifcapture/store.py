@@ -0,0 +1,377 @@
+"""Content-addressed frame store with per-step manifests and page checkpoints."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from gifcapture.common import cache_dir, write_atomic
+
+FRAME_STORE_DIR = cache_dir('GIF_FRAME_STORE_DIR', 'frames')
+
+# Steps after which the page can be rebuilt from its URL, storage and scroll
+# position alone: nothing is open, hovered or half-animated.
+CHECKPOINT_ACTIONS = ('goto', 'wait_url', 'scroll_to')
+
+# Steps that only record frames; replaying a run to rebuild the page skips them.
+CAPTURE_ONLY_ACTIONS = ('capture', 'hold')
+
+# Settings that only change how frames are encoded, not what is captured.
+_ENCODE_SETTINGS = ('width', 'extra_outputs', 'delta_tolerance', 'formats')
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def step_keys(scenario, backend):
+    """One key per step covering it and everything that ran before it.
+
+    Changing a step (or a capture setting) changes its key and every later
+    one, so matching keys mean the run up to there would capture the same.
+    """
+    settings = {k: v for k, v in scenario.settings.items() if k not in _ENCODE_SETTINGS}
+    key = _digest(json.dumps([backend, settings], sort_keys=True).encode())
+    keys = []
+    for spec in scenario.specs:
+        key = _digest(json.dumps([key, spec], sort_keys=True).encode())
+        keys.append(key)
+    return keys
+
+
+def encoding_key(frames, framerate, outputs, delta_tolerance=0, formats=()):
+    """Identifies an encode: the collapsed frames, their timing and the outputs."""
+    return _digest(
+        json.dumps([frames, framerate, outputs, delta_tolerance, list(formats)]).encode()
+    )
+
+
+def output_digests(paths):
+    """``{path: digest}`` of the files at ``paths``, None for missing ones."""
+    digests = {}
+    for path in paths:
+        if not os.path.exists(path):
+            digests[path] = None
+            continue
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        digests[path] = digest.hexdigest()
+    return digests
+
+
+def collapse(frames):
+    """Merge consecutive ``[key, duration]`` frames showing the same image."""
+    collapsed = []
+    for key, duration in frames:
+        if collapsed and collapsed[-1][0] == key:
+            collapsed[-1][1] = round(collapsed[-1][1] + duration, 4)
+        else:
+            collapsed.append([key, duration])
+    return collapsed
+
+
+class FrameStore:
+    """Frames on disk keyed by the hash of their bytes.
+
+    Identical frames, within a run or across runs and scenarios, are stored
+    once. Each scenario's last run is described by a manifest listing, per
+    step, its key (see :func:`step_keys`), the frames it captured and
+    whether a checkpoint of the page was saved after it. Checkpoints hold
+    session cookies, so only their owner can read them and they are pruned
+    once nothing refers to them.
+    """
+
+    def __init__(self, directory=FRAME_STORE_DIR):
+        self.directory = directory
+        self.stored = 0
+        self.reused = 0
+        self._known = set()
+
+    def _object_path(self, key):
+        return os.path.join(self.directory, 'objects', key[:2], key)
+
+    def _manifest_path(self, name):
+        return os.path.join(self.directory, 'manifests', f'{name}.json')
+
+    def _checkpoint_path(self, key):
+        return os.path.join(self.directory, 'checkpoints', f'{key}.json')
+
+    def journal_path(self, name):
+        return os.path.join(self.directory, 'journals', f'{name}.jsonl')
+
+    def has(self, key):
+        return key in self._known or os.path.exists(self._object_path(key))
+
+    def put(self, image_bytes):
+        key = _digest(image_bytes)
+        if self.has(key):
+            self.reused += 1
+        else:
+            path = self._object_path(key)
+            write_atomic(path, image_bytes)
+            self.stored += 1
+        self._known.add(key)
+        return key
+
+    def get(self, key):
+        with open(self._object_path(key), 'rb') as f:
+            return f.read()
+
+    def load_manifest(self, name):
+        path = self._manifest_path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def save_manifest(self, name, manifest):
+        path = self._manifest_path(name)
+        write_atomic(path, json.dumps(manifest, indent=2).encode())
+
+    def has_checkpoint(self, key):
+        return os.path.exists(self._checkpoint_path(key))
+
+    def load_checkpoint(self, key):
+        with open(self._checkpoint_path(key)) as f:
+            return json.load(f)
+
+    def save_checkpoint(self, key, checkpoint):
+        path = self._checkpoint_path(key)
+        write_atomic(path, json.dumps(checkpoint).encode(), private=True)
+
+    def prune_checkpoints(self, keep_recent=3600):
+        """Delete the checkpoints no manifest or run journal refers to.
+
+        They hold the run's session cookies, so they shouldn't outlive the
+        builds that can resume from them. Checkpoints written in the last
+        ``keep_recent`` seconds are kept, since a concurrent run may not
+        have journaled them yet. Returns how many were deleted.
+        """
+        directory = os.path.join(self.directory, 'checkpoints')
+        if not os.path.isdir(directory):
+            return 0
+        referenced = set()
+        for name in self._listdir('manifests'):
+            with open(os.path.join(self.directory, 'manifests', name)) as f:
+                steps = json.load(f)['steps']
+            referenced.update(step['key'] for step in steps if step['checkpoint'])
+        for name in self._listdir('journals'):
+            journal = RunJournal.load(os.path.join(self.directory, 'journals', name))
+            referenced.update(event['key'] for event in journal.steps if event['checkpoint'])
+        cutoff = time.time() - keep_recent
+        removed = 0
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name[:-len('.json')] in referenced or os.path.getmtime(path) > cutoff:
+                continue
+            os.remove(path)
+            removed += 1
+        return removed
+
+    def _listdir(self, kind):
+        directory = os.path.join(self.directory, kind)
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def resume_point(self, manifest, keys):
+        """``(first step to run, checkpoint key)`` for resuming after ``manifest``.
+
+        The run resumes after the last checkpointed step whose key (and so
+        every step before it) is unchanged and whose frames are all stored;
+        the frames of the steps before it are reused from ``manifest``.
+        """
+        start, checkpoint = 0, None
+        steps = manifest['steps']
+        for index, key in enumerate(keys):
+            if index >= len(steps) or steps[index]['key'] != key:
+                break
+            if not all(self.has(k) for k, _ in steps[index]['frames']):
+                break
+            if steps[index]['checkpoint'] and self.has_checkpoint(key):
+                start, checkpoint = index + 1, key
+        return start, checkpoint
+
+    def report(self):
+        return f"{self.stored} frames stored, {self.reused} already in the frame store"
+
+
+class RunJournal:
+    """Append-only log of a build in progress, so an interrupted one can resume.
+
+    Each line is one JSON event, flushed as it happens: the run's step keys,
+    every frame stored (``[key, duration]``), every completed step with the
+    number of frames submitted up to its end, and finally ``captured``. A
+    crash leaves at most a truncated last line, which :meth:`load` ignores.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.keys = None
+        self.frames = []
+        self.steps = []
+        self.captured = False
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        journal = cls(path)
+        if not os.path.exists(path):
+            return journal
+        with open(path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if 'keys' in event:
+                    journal.keys = event['keys']
+                elif 'frame' in event:
+                    journal.frames.append(event['frame'])
+                elif 'step' in event:
+                    journal.steps.append(event)
+                elif 'captured' in event:
+                    journal.captured = True
+        return journal
+
+    def _append(self, event, sync=False):
+        with self._lock:
+            self._file.write(json.dumps(event) + '\n')
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def begin(self, keys, steps=()):
+        """Start a new journal, carrying over ``steps`` already completed.
+
+        ``steps`` are manifest entries (``{'key', 'action', 'checkpoint',
+        'frames'}``) for the first ``len(steps)`` steps.
+        """
+        self.close()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'w')
+        self.keys, self.frames, self.steps, self.captured = keys, [], [], False
+        self._append({'keys': keys})
+        for index, step in enumerate(steps):
+            for key, duration in step['frames']:
+                self.frame(key, duration)
+            self.step(index, step['action'], step['checkpoint'], len(self.frames))
+
+    def frame(self, key, duration):
+        self.frames.append([key, duration])
+        self._append({'frame': [key, duration]})
+
+    def step(self, index, action, checkpoint, frames):
+        """Record step ``index`` as done once ``frames`` frames are in the journal."""
+        event = {
+            'step': index, 'key': self.keys[index], 'action': action,
+            'checkpoint': checkpoint, 'frames': frames,
+        }
+        self.steps.append(event)
+        self._append(event, sync=True)
+
+    def finish_capture(self):
+        self.captured = True
+        self._append({'captured': True}, sync=True)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def completed(self, keys, store):
+        """Leading steps of the journal that a run with ``keys`` can keep.
+
+        A step counts once every frame up to its end reached the journal
+        and the store, and its key (and so every step before it) still
+        matches ``keys``.
+        """
+        if self.keys is None:
+            return []
+        done = []
+        for event in self.steps:
+            index = len(done)
+            if (event['step'] != index or index >= len(keys) or event['key'] != keys[index]
+                    or event['frames'] > len(self.frames)):
+                break
+            done.append(event)
+        while done and not all(store.has(key) for key, _ in self.frames[:done[-1]['frames']]):
+            done.pop()
+        return done
+
+    def resume_point(self, keys, store):
+        """``(first step to capture, first step to replay, checkpoint key)``.
+
+        The run picks up after the last completed step. The page is rebuilt
+        from the last checkpoint before it (or from scratch without one),
+        and the steps between the two are replayed with their frames
+        discarded. Returns None when no step can be kept.
+        """
+        done = self.completed(keys, store)
+        if not done:
+            return None
+        replay, checkpoint = 0, None
+        for event in done:
+            if event['checkpoint'] and store.has_checkpoint(event['key']):
+                replay, checkpoint = event['step'] + 1, event['key']
+        return len(done), replay, checkpoint
+
+    def step_entries(self, count=None):
+        """Manifest entries for the first ``count`` completed steps (default all)."""
+        entries, start = [], 0
+        for event in self.steps[:count]:
+            entries.append({
+                'key': event['key'], 'action': event['action'],
+                'checkpoint': event['checkpoint'],
+                'frames': self.frames[start:event['frames']],
+            })
+            start = event['frames']
+        return entries
+
+
+class FrameRecorder:
+    """Sink that puts every frame in a :class:`FrameStore` instead of encoding it.
+
+    :attr:`keys` lists the stored frames in order. With a :class:`RunJournal`
+    each frame from the ``skip``-th on is also logged there with its
+    duration; ``skip`` leaves out frames of replayed steps.
+    """
+
+    def __init__(self, store, framerate, journal=None):
+        self.store = store
+        self.framerate = framerate
+        self.journal = journal
+        self.skip = 0
+        self.keys = []
+
+    @property
+    def count(self):
+        return len(self.keys)
+
+    def write(self, image_bytes, duration=None):
+        key = self.store.put(image_bytes)
+        if self.journal is not None and len(self.keys) >= self.skip:
+            self.journal.frame(key, round(1 / self.framerate if duration is None else duration, 4))
+        self.keys.append(key)
+
+
+def save_checkpoint(page, styles=(), region=None):
+    """Everything needed to reopen ``page`` where it is now."""
+    scroll_x, scroll_y = page.evaluate('() => [window.scrollX, window.scrollY]')
+    checkpoint = {
+        'url': page.url,
+        'scroll': [scroll_x, scroll_y],
+        'storage_state': page.context.storage_state(),
+        'styles': list(styles),
+        'region': None,
+    }
+    if region is not None and region.size is not None:
+        checkpoint['region'] = {'size': list(region.size), 'view_box': region.view_box}
+    return checkpoint
@@ -0,0 +1,136 @@
+"""Build GIFs from a Playwright screen recording instead of screenshots."""
+
+import functools
+import io
+import subprocess
+import time
+
+from gifcapture.common import arrays
+
+_arrays = functools.partial(arrays, 'video frame extraction')
+
+
+def video_frames(path, size, start=0.0, end=None, fps=25):
+    """Decode ``path`` between ``start`` and ``end`` seconds as RGB arrays.
+
+    Yields ``(timestamp, frame)`` at a constant ``fps``, scaled to ``size``
+    (``{width, height}``, normally the recorded viewport).
+    """
+    np, _ = _arrays()
+    width, height = size['width'], size['height']
+    command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', path, '-ss', str(start)]
+    if end is not None:
+        command += ['-to', str(end)]
+    command += [
+        '-vf', f'fps={fps},scale={width}:{height}',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-',
+    ]
+    frame_size = width * height * 3
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        index = 0
+        while True:
+            data = process.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            yield start + index / fps, np.frombuffer(data, np.uint8).reshape(height, width, 3)
+            index += 1
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode(errors='replace')
+        process.stderr.close()
+        if process.wait() and not index:
+            raise RuntimeError(f'ffmpeg could not decode {path}: {stderr}')
+
+
+def change_score(frame, reference, noise=12):
+    """Fraction of pixels that differ from ``reference`` by more than ``noise``.
+
+    Scored on every other row and column; video compression noise below
+    ``noise`` (per channel) doesn't count as a change.
+    """
+    np, _ = _arrays()
+    a = frame[::2, ::2].astype(np.int16)
+    b = reference[::2, ::2].astype(np.int16)
+    return float((np.abs(a - b).max(axis=2) > noise).mean())
+
+
+class FrameSelector:
+    """Pick the frames of a recording worth keeping in a GIF.
+
+    A frame is kept when it differs from the last kept frame in more than
+    ``threshold`` of its pixels (see :func:`change_score`), so a held
+    screen becomes one long frame while every step of a transition is
+    kept, at most one per ``min_interval`` seconds. Each kept frame plays
+    until the next one was kept, divided by ``playback_speed``.
+    """
+
+    def __init__(self, threshold=0.001, noise=12, min_interval=0.0, playback_speed=1.0):
+        self.threshold = threshold
+        self.noise = noise
+        self.min_interval = min_interval
+        self.playback_speed = playback_speed
+        self.decoded = 0
+        self.kept = 0
+
+    def select(self, frames, end=None):
+        """Yield ``(frame, duration)`` for the kept frames of ``(timestamp, frame)``."""
+        held = None
+        timestamp = None
+        for timestamp, frame in frames:
+            self.decoded += 1
+            if held is not None:
+                if timestamp - held[0] < self.min_interval:
+                    continue
+                if change_score(frame, held[1], self.noise) <= self.threshold:
+                    continue
+                yield held[1], (timestamp - held[0]) / self.playback_speed
+            held = (timestamp, frame)
+            self.kept += 1
+        if held is not None:
+            last = end if end is not None else timestamp
+            yield held[1], max(last - held[0], 0.1) / self.playback_speed
+
+    def report(self):
+        return f"{self.kept} of {self.decoded} video frames kept"
+
+
+class VideoClip:
+    """Mark the part of a page's screen recording that belongs in the GIF.
+
+    Create it right after the page, whose recording starts with it; call
+    :meth:`start` and :meth:`stop` around the interesting part of the
+    scenario. The recording's offsets are measured on this clock.
+    """
+
+    def __init__(self, page):
+        if page.video is None:
+            raise RuntimeError('the page is not being recorded; pass record_video_dir')
+        self.page = page
+        self.size = page.viewport_size
+        self._origin = time.monotonic()
+        self.start_time = 0.0
+        self.end_time = None
+
+    def start(self):
+        self.start_time = time.monotonic() - self._origin
+
+    def stop(self):
+        self.end_time = time.monotonic() - self._origin
+
+    def encode(self, encoder, selector=None, fps=25):
+        """Feed the selected frames of the clip to ``encoder``.
+
+        The page's context must be closed first so the video is complete.
+        Returns the :class:`FrameSelector` used.
+        """
+        _, Image = _arrays()
+        selector = selector or FrameSelector()
+        frames = video_frames(
+            self.page.video.path(), self.size, self.start_time, self.end_time, fps
+        )
+        for frame, duration in selector.select(frames, self.end_time):
+            buffer = io.BytesIO()
+            Image.fromarray(frame).save(buffer, format='PNG', compress_level=1)
+            encoder.write(buffer.getvalue(), duration=duration)
+        return selector
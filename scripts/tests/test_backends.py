@@ -0,0 +1,105 @@
+import base64
+import io
+
+import pytest
+
+from gifcapture.backends import ScreencastBackend
+from gifcapture.scroll import synthesize_scroll
+
+Image = pytest.importorskip('PIL.Image')
+
+VIEWPORT = {'width': 200, 'height': 100}
+DPR = 2
+
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def size(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return image.size
+
+
+class FakeCDP:
+    def __init__(self):
+        self.handlers = {}
+        self.params = None
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def send(self, method, params=None):
+        if method == 'Page.startScreencast':
+            self.params = params
+
+    def paint(self):
+        """Deliver a frame the way Chromium does: fitted inside maxWidth/maxHeight."""
+        width, height = VIEWPORT['width'] * DPR, VIEWPORT['height'] * DPR
+        fit = min(1, self.params.get('maxWidth', width) / width,
+                  self.params.get('maxHeight', height) / height)
+        data = png(round(width * fit), round(height * fit))
+        self.handlers['Page.screencastFrame']({
+            'sessionId': 1, 'data': base64.b64encode(data).decode(),
+            'metadata': {'timestamp': 1.0, 'deviceWidth': VIEWPORT['width']},
+        })
+
+
+class FakePage:
+    viewport_size = VIEWPORT
+
+    def __init__(self):
+        self.cdp = FakeCDP()
+        self.context = self
+
+    def new_cdp_session(self, page):
+        return self.cdp
+
+    def evaluate(self, script):
+        if 'innerWidth' in script:
+            return {'y': 0, 'dpr': DPR, **VIEWPORT}
+        if 'devicePixelRatio' in script:
+            return DPR
+        return None
+
+    def screenshot(self, full_page=False):
+        return png(VIEWPORT['width'] * DPR, VIEWPORT['height'] * 4 * DPR)
+
+
+class Writer:
+    submitted = 0
+
+    def __init__(self):
+        self.frames = []
+
+    def submit(self, frame, timestamp, transform=True):
+        self.frames.append(frame)
+
+
+class Engine:
+    """The parts of CaptureEngine that synthesize_scroll uses."""
+
+    region = redactor = None
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.frames = []
+
+    def insert_frames(self, frames, frame_duration, started=None):
+        self.frames.extend(frame() for frame in frames)
+
+
+def test_screencast_frames_match_scroll_slices_at_device_scale():
+    page = FakePage()
+    writer = Writer()
+    backend = ScreencastBackend(page, writer, fps=10, resample=False)
+    backend.start()
+    page.cdp.paint()
+    screencast = size(base64.b64decode(writer.frames[0]))
+    assert screencast == (VIEWPORT['width'] * DPR, VIEWPORT['height'] * DPR)
+
+    engine = Engine(backend)
+    synthesize_scroll(page, engine, [100], frames_per_step=2)
+    assert {size(frame) for frame in engine.frames} == {screencast}
@@ -0,0 +1,57 @@
+import contextlib
+import os
+import stat
+
+from gifcapture import browser
+
+
+class Context:
+    pages = []
+
+    def __init__(self, seen):
+        self.seen = seen
+        self.closed = False
+
+    def new_page(self):
+        return self
+
+    def wait_for_timeout(self, ms):
+        path = browser.ENDPOINT_FILE
+        with open(path) as f:
+            self.seen['endpoint'] = f.read()
+        self.seen['modes'] = (
+            stat.S_IMODE(os.stat(path).st_mode),
+            stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode),
+        )
+        raise KeyboardInterrupt
+
+    def close(self):
+        self.closed = True
+
+
+class Chromium:
+    def __init__(self, seen):
+        self.seen = seen
+
+    def launch_persistent_context(self, profile, args=(), **options):
+        self.seen['args'] = args
+        # Chromium reports the port it picked in the profile directory
+        with open(os.path.join(profile, 'DevToolsActivePort'), 'w') as f:
+            f.write('41873\n/devtools/browser/0b1c\n')
+        self.seen['context'] = Context(self.seen)
+        return self.seen['context']
+
+
+def test_serve_picks_a_free_port_and_writes_a_private_endpoint_file(monkeypatch, tmp_path):
+    seen = {}
+    playwright = type('Playwright', (), {'chromium': Chromium(seen)})()
+    monkeypatch.setattr(browser, 'sync_playwright', lambda: contextlib.nullcontext(playwright))
+    monkeypatch.setattr(browser, 'ENDPOINT_FILE', str(tmp_path / 'browser' / 'endpoint'))
+    monkeypatch.setattr(browser.signal, 'signal', lambda *args: None)
+
+    browser.serve()
+    assert '--remote-debugging-port=0' in seen['args']
+    assert seen['endpoint'] == 'http://127.0.0.1:41873'
+    assert seen['modes'] == (0o600, 0o700)
+    assert seen['context'].closed
+    assert not os.path.exists(browser.ENDPOINT_FILE)
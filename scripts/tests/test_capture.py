@@ -0,0 +1,109 @@
+import base64
+import threading
+
+import pytest
+
+from gifcapture.capture import BackgroundFrameWriter
+
+
+class Sink:
+    framerate = 10
+
+    def __init__(self):
+        self.frames = []
+        self.durations = []
+        self.flushed = False
+
+    def write(self, frame, duration=None):
+        self.frames.append(frame)
+        self.durations.append(duration)
+
+    def flush(self):
+        self.flushed = True
+
+
+def blocked(data, event):
+    """A frame whose decoding finishes only once ``event`` is set."""
+    def decode():
+        assert event.wait(5)
+        return data
+    return decode
+
+
+def test_frames_reach_the_sink_in_submission_order():
+    sink = Sink()
+    writer = BackgroundFrameWriter(sink, workers=3)
+    second_done = threading.Event()
+
+    def second():
+        second_done.set()
+        return b'second'
+
+    writer.submit(blocked(b'first', second_done))
+    writer.submit(second)
+    writer.submit(base64.b64encode(b'third').decode())
+    writer.close()
+    assert sink.frames == [b'first', b'second', b'third']
+    assert sink.flushed
+    assert writer.written == writer.submitted == 3
+
+
+def test_full_slots_drop_frames():
+    sink = Sink()
+    writer = BackgroundFrameWriter(sink, workers=1, max_pending=1, on_full='drop')
+    release = threading.Event()
+    assert writer.submit(blocked(b'kept', release))
+    assert not writer.submit(b'dropped')
+    release.set()
+    writer.close()
+    assert sink.frames == [b'kept']
+    assert (writer.dropped, writer.delayed) == (1, 0)
+
+
+def test_full_slots_delay_the_submitter():
+    sink = Sink()
+    writer = BackgroundFrameWriter(sink, workers=1, max_pending=1)
+    release = threading.Event()
+    writer.submit(blocked(b'slow', release))
+    timer = threading.Timer(0.05, release.set)
+    timer.start()
+    assert writer.submit(b'waited')
+    writer.close()
+    timer.join()
+    assert sink.frames == [b'slow', b'waited']
+    assert (writer.dropped, writer.delayed) == (0, 1)
+    assert writer.wait_time > 0
+
+
+def test_variable_frame_rate_holds_each_frame_until_the_next():
+    sink = Sink()
+    writer = BackgroundFrameWriter(sink, variable_frame_rate=True, playback_speed=2)
+    writer.step = 3
+    for data, timestamp in ((b'a', 10.0), (b'b', 11.0), (b'c', 11.5)):
+        writer.submit(data, timestamp)
+    writer.close(end_timestamp=11.6)
+    # The last frame plays for at least one nominal frame
+    assert sink.durations == [0.5, 0.25, 0.1]
+    assert [frame['timestamp'] for frame in writer.manifest.frames] == [0, 1.0, 1.5]
+    assert {frame['step'] for frame in writer.manifest.frames} == {3}
+
+
+def test_constant_frame_rate_leaves_durations_to_the_encoder():
+    sink = Sink()
+    writer = BackgroundFrameWriter(sink)
+    writer.submit(b'a', 1.0)
+    writer.submit(b'b', 3.0)
+    writer.close(end_timestamp=4.0)
+    assert sink.durations == [None, None]
+    assert writer.manifest.durations == [0.1, 0.1]
+
+
+def test_a_failed_decode_fails_the_writer():
+    def broken():
+        raise ValueError('not an image')
+
+    writer = BackgroundFrameWriter(Sink())
+    writer.submit(broken)
+    with pytest.raises(RuntimeError, match='frame writer failed'):
+        writer.close()
+    assert isinstance(writer.error, ValueError)
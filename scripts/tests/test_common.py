@@ -0,0 +1,43 @@
+import os
+import stat
+
+import pytest
+
+from gifcapture import common
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.fixture
+def umask(monkeypatch):
+    previous = os.umask(0o027)
+    monkeypatch.setattr(common, '_umask', None)
+    yield 0o027
+    os.umask(previous)
+
+
+def test_shared_files_get_the_umask_mode(tmp_path, umask):
+    path = tmp_path / 'out' / 'demo.gif'
+    common.write_atomic(str(path), b'GIF89a')
+    assert path.read_bytes() == b'GIF89a'
+    assert mode(path) == 0o640
+    # Reading the umask left it as it was
+    assert os.umask(umask) == umask
+
+
+def test_private_files_are_owner_only(tmp_path, umask):
+    path = tmp_path / 'sessions' / 'app.json'
+    common.write_atomic(str(path), b'{}', private=True)
+    assert (mode(path), mode(path.parent)) == (0o600, 0o700)
+
+
+def test_move_atomic_replaces_the_target(tmp_path, umask):
+    source, target = tmp_path / 'partial.gif', tmp_path / 'demo.gif'
+    source.write_bytes(b'new')
+    target.write_bytes(b'old')
+    common.move_atomic(str(source), str(target))
+    assert target.read_bytes() == b'new'
+    assert not source.exists()
+    assert mode(target) == 0o640
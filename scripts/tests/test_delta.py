@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from gifcapture.delta import optimize_gif
+
+np = pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+
+def timeline(path):
+    """Composited frames with their durations, repeats merged."""
+    frames = []
+    with Image.open(path) as image:
+        for index in range(image.n_frames):
+            image.seek(index)
+            rgb = np.asarray(image.convert('RGB')).tobytes()
+            duration = image.info.get('duration', 0)
+            if frames and frames[-1][0] == rgb:
+                frames[-1][1] += duration
+            else:
+                frames.append([rgb, duration])
+    return frames
+
+
+def write_gif(path, noise=0):
+    rng = np.random.default_rng(1)
+    # A busy background is expensive to store again in every frame
+    background = rng.integers(150, 250, (60, 100, 3), dtype=np.uint8)
+    frames = []
+    for i, x in enumerate((10, 20, 20, 30)):
+        pixels = background.copy()
+        pixels[20:30, x:x + 10] = (20, 40, 200)
+        # A blinking cursor far from the square widens the changed area
+        pixels[40:50, 90:92] = (0, 0, 0) if i % 2 else (255, 255, 255)
+        if noise:
+            # Dither-like speckle in a corner that changes every frame
+            pixels[50:60, 80:100] = 240 - rng.integers(0, noise, (10, 20, 1), dtype=np.uint8)
+        frames.append(Image.fromarray(pixels))
+    # One global palette, as ffmpeg's palettegen/paletteuse writes
+    reference = frames[0].quantize(colors=32, method=Image.Quantize.MEDIANCUT)
+    frames = [frame.quantize(palette=reference, dither=Image.Dither.NONE) for frame in frames]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=[100, 100, 150, 200],
+                   loop=0, optimize=False, disposal=1)
+
+
+def test_lossless_at_tolerance_zero(tmp_path):
+    path = str(tmp_path / 'demo.gif')
+    write_gif(path)
+    expected = timeline(path)
+    before, after = optimize_gif(path)
+    assert after < before
+    assert os.path.getsize(path) == after
+    assert timeline(path) == expected
+
+
+def test_tolerance_drops_small_changes(tmp_path):
+    path = str(tmp_path / 'demo.gif')
+    write_gif(path, noise=8)
+    exact = str(tmp_path / 'exact.gif')
+    write_gif(exact, noise=8)
+    _, lossless = optimize_gif(exact)
+    _, tolerant = optimize_gif(path, tolerance=16)
+    assert tolerant < lossless
+    # The moving square still reaches its last position
+    last_frames = []
+    for gif in (path, exact):
+        with Image.open(gif) as image:
+            image.seek(image.n_frames - 1)
+            last_frames.append(np.asarray(image.convert('RGB'))[20:30, 30:40])
+    assert np.array_equal(*last_frames)
+
+
+def test_not_replaced_unless_smaller(tmp_path):
+    path = tmp_path / 'one.gif'
+    Image.new('RGB', (4, 4), 'red').quantize(colors=2).save(path)
+    data = path.read_bytes()
+    before, after = optimize_gif(str(path))
+    assert before == after
+    assert path.read_bytes() == data
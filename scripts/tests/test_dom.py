@@ -0,0 +1,149 @@
+from gifcapture.dom import (
+    DomElement,
+    MenuSnapshot,
+    discover_elements,
+    looks_like_plan_card,
+    unique_by_position,
+)
+
+
+def element(handle, text='', box=None):
+    return DomElement(handle, 'div', text, box)
+
+
+def at(x, y):
+    return {'x': x, 'y': y, 'width': 100, 'height': 40}
+
+
+class Page:
+    """Answers the discovery query from a fixed list of rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def evaluate(self, script, arg):
+        self.queries.append(arg)
+        return [row for row in self.rows
+                if not arg['textContains'] or arg['textContains'] in row['text']]
+
+    def locator(self, selector):
+        return selector
+
+
+def test_discovery_is_one_query_for_every_selector():
+    page = Page([
+        {'handle': '1', 'tag': 'div', 'text': 'Pro $20/month', 'box': at(0, 0)},
+        {'handle': '2', 'tag': 'a', 'text': 'Docs', 'box': None},
+    ])
+    elements = discover_elements(page, ['.card', 'a.plan'])
+    assert len(page.queries) == 1
+    assert page.queries[0]['selector'] == '.card, a.plan'
+    assert page.queries[0]['attribute'] == 'data-capture-id'
+    assert [e.handle for e in elements] == ['1', '2']
+    assert elements[0].locator(page) == '[data-capture-id="1"]'
+
+
+def test_text_filter_runs_in_the_page():
+    page = Page([
+        {'handle': '1', 'tag': 'div', 'text': 'Pro $20/month', 'box': at(0, 0)},
+        {'handle': '2', 'tag': 'div', 'text': 'Team $50/month', 'box': at(200, 0)},
+    ])
+    elements = discover_elements(page, '.card', text_contains='Team')
+    assert page.queries[0]['textContains'] == 'Team'
+    assert [e.handle for e in elements] == ['2']
+
+
+def test_unique_by_position_keeps_the_first_rendered_element_per_spot():
+    elements = [
+        element('hidden'),
+        element('outer', box=at(10.2, 50)),
+        element('inner', box=at(9.8, 50)),
+        element('next', box=at(10, 120)),
+    ]
+    assert [e.handle for e in unique_by_position(elements)] == ['outer', 'next']
+    by_row = unique_by_position(elements, key=lambda box: int(box['y']))
+    assert [e.handle for e in by_row] == ['outer', 'next']
+
+
+def test_plan_cards_have_a_price_and_a_plan_word():
+    assert looks_like_plan_card(element('1', 'Starter\n$9 / Month'))
+    assert not looks_like_plan_card(element('2', 'Monthly newsletter'))
+    assert not looks_like_plan_card(element('3', '$9 credit'))
+
+
+class MenuPage:
+    """A page with a menu that the test opens, closes and reopens."""
+
+    def __init__(self, items):
+        self.items = items
+        self.open = True
+        self.evaluations = 0
+        self.moves = []
+        self.mouse = self
+        self.hovered = []
+
+    def expose_function(self, name, callback):
+        self.on_closed = callback
+
+    def evaluate(self, script, arg):
+        self.evaluations += 1
+        if not self.open:
+            return None
+        return [
+            {'handle': str(i), 'tag': 'a', 'text': text, 'box': box}
+            for i, (text, box) in enumerate(self.items, 1)
+        ]
+
+    def close_menu(self):
+        self.open = False
+        self.on_closed()
+
+    def move(self, x, y):
+        self.moves.append((x, y))
+
+    def locator(self, selector):
+        page = self
+
+        class Locator:
+            def hover(self):
+                page.hovered.append(selector)
+        return Locator()
+
+
+def test_menu_items_are_read_once_while_the_menu_stays_open():
+    page = MenuPage([(' Settings ', at(0, 0)), ('Billing', at(0, 40))])
+    menu = MenuSnapshot(page)
+    assert menu.texts == ['Settings', 'Billing']
+    assert menu.find('billing').handle == '2'
+    assert menu.find('Log out') is None
+    assert page.evaluations == 1
+
+
+def test_closing_the_menu_invalidates_the_snapshot():
+    page = MenuPage([('Settings', at(0, 0))])
+    menu = MenuSnapshot(page)
+    assert menu.texts == ['Settings']
+    page.close_menu()
+    assert menu.items == []
+    # Not cached while closed, so reopening is seen on the next access
+    page.open = True
+    page.items = [('Settings', at(0, 0)), ('Log out', at(0, 40))]
+    assert menu.texts == ['Settings', 'Log out']
+    assert page.evaluations == 3
+
+
+def test_hover_uses_the_snapshotted_box():
+    page = MenuPage([('Settings', at(10, 20)), ('Hidden', None)])
+    menu = MenuSnapshot(page)
+    settings, hidden = menu.items
+    menu.hover(settings)
+    assert page.moves == [(60, 40)]
+    # Unrendered items fall back to a locator
+    menu.hover(hidden)
+    assert page.hovered == ['[data-capture-id="2"]']
+
+
+def test_snapshots_register_separate_callbacks():
+    first, second = MenuSnapshot(MenuPage([])), MenuSnapshot(MenuPage([]))
+    assert first.callback != second.callback
@@ -0,0 +1,34 @@
+import io
+import shutil
+
+import pytest
+
+from gifcapture import encoder as encoder_module
+
+pytestmark = pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='needs ffmpeg')
+
+
+def png(color):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 16), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def test_lost_frame_timing_is_a_warning(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(encoder_module, 'PALETTE_DIR', str(tmp_path / 'palettes'))
+
+    def mismatch(path, durations):
+        raise ValueError('GIF has 2 frames, got 3 durations')
+
+    monkeypatch.setattr(encoder_module, 'set_frame_delays', mismatch)
+    encoder = encoder_module.encode_frames(
+        [png('red'), png('blue')], str(tmp_path / 'demo.gif'), 10, width=32,
+        durations=[0.5, 0.1],
+    )
+    assert encoder.ok
+    assert encoder.warnings == [
+        'kept constant frame delays, the frame timing is lost: GIF has 2 frames, got 3 durations'
+    ]
+    assert 'Warning: kept constant frame delays' in capsys.readouterr().out
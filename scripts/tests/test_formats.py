@@ -0,0 +1,121 @@
+import subprocess
+
+import pytest
+
+from gifcapture import formats
+from gifcapture.formats import (
+    encode_formats,
+    format_report,
+    scale_filter,
+    ssim,
+    write_concat,
+)
+
+SSIM_LOG = (
+    '[Parsed_ssim_4 @ 0x6000] SSIM R:0.981 (17.2) G:0.984 (17.9) B:0.979 (16.8) '
+    'All:0.981532 (17.337)\n'
+)
+
+
+class FakeFFmpeg:
+    """Stands in for subprocess.run: writes outputs and prints an SSIM line."""
+
+    def __init__(self, fail=()):
+        self.fail = fail
+        self.commands = []
+
+    def __call__(self, command, **kwargs):
+        self.commands.append(command)
+        output = command[-1]
+        if output == '-':
+            return subprocess.CompletedProcess(command, 0, '', SSIM_LOG)
+        fmt = output.rsplit('.', 1)[1]
+        if fmt in self.fail:
+            return subprocess.CompletedProcess(command, 1, '', f'Unknown encoder for {fmt}\n')
+        with open(output, 'wb') as f:
+            f.write(b'x' * 2048)
+        return subprocess.CompletedProcess(command, 0, '', '')
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch):
+    fake = FakeFFmpeg()
+    monkeypatch.setattr(formats.subprocess, 'run', fake)
+    return fake
+
+
+def test_scale_filter_never_scales_up():
+    assert scale_filter(800) == "scale='min(800,iw)':-1:flags=lanczos"
+    assert scale_filter(800, 'bicubic', even=True) == "scale='min(800,iw)':-2:flags=bicubic"
+
+
+def test_concat_file_repeats_the_last_frame(tmp_path):
+    path = write_concat(['a.png', 'b.png'], [0.1, 0.25], str(tmp_path / 'frames.txt'))
+    assert (tmp_path / 'frames.txt').read_text().splitlines() == [
+        'ffconcat version 1.0',
+        "file 'a.png'", 'duration 0.1000',
+        "file 'b.png'", 'duration 0.2500',
+        "file 'b.png'",
+    ]
+    assert path == str(tmp_path / 'frames.txt')
+
+
+def test_ssim_is_read_from_the_ffmpeg_log(ffmpeg):
+    assert ssim('demo.mp4', 'frames.txt', scale_filter(800)) == 0.981532
+    assert "[1:v]scale='min(800,iw)':-1:flags=lanczos" in ffmpeg.commands[0][-4]
+
+
+def test_ssim_is_none_without_a_score(monkeypatch):
+    monkeypatch.setattr(formats.subprocess, 'run', lambda command, **kwargs: (
+        subprocess.CompletedProcess(command, 1, '', 'Invalid data found\n')
+    ))
+    assert ssim('demo.mp4', 'frames.txt', scale_filter(800)) is None
+
+
+def test_encode_formats_reports_every_format_in_order(tmp_path, ffmpeg):
+    ffmpeg.fail = ('avif',)
+    rows = encode_formats('frames.txt', str(tmp_path / 'demo.gif'), ['mp4', 'avif', 'png'],
+                          width=640)
+    assert [row['format'] for row in rows] == ['mp4', 'avif', 'png']
+    mp4, avif, png = rows
+    assert (mp4['path'], mp4['bytes'], mp4['ssim']) == (str(tmp_path / 'demo.mp4'), 2048,
+                                                          0.981532)
+    assert avif['error'] == 'Unknown encoder for avif'
+    assert avif['bytes'] is avif['ssim'] is None
+    # Video codecs get even dimensions
+    mp4_command = next(c for c in ffmpeg.commands if c[-1].endswith('.mp4'))
+    assert mp4_command[mp4_command.index('-vf') + 1] == scale_filter(640, even=True)
+    png_command = next(c for c in ffmpeg.commands if c[-1].endswith('.png'))
+    assert png_command[png_command.index('-vf') + 1] == scale_filter(640)
+
+
+def test_unknown_formats_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match='unknown output formats: jxl'):
+        encode_formats('frames.txt', str(tmp_path / 'demo.gif'), ['webp', 'jxl'])
+
+
+def test_format_report():
+    rows = [
+        {'format': 'gif', 'bytes': 204800, 'seconds': None, 'ssim': 0.97, 'error': None},
+        {'format': 'webp', 'bytes': 51200, 'seconds': 1.26, 'ssim': None, 'error': None},
+        {'format': 'avif', 'error': 'first line\nUnknown encoder'},
+    ]
+    assert format_report(rows) == [
+        'format      size   encode    ssim',
+        'gif       200 KB        -  0.9700',
+        'webp       50 KB     1.3s       -',
+        'avif   failed: Unknown encoder',
+    ]
+
+
+def test_expanded_animation_frames_keep_their_durations(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    path = str(tmp_path / 'demo.gif')
+    frames = [Image.new('RGB', (8, 8), color) for color in ('red', 'blue')]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=[200, 300])
+    concat = formats._expand_frames(path, str(tmp_path))
+    lines = (tmp_path / 'frames.txt').read_text().splitlines()
+    assert concat == str(tmp_path / 'frames.txt')
+    assert [line for line in lines if line.startswith('duration')] == [
+        'duration 0.2000', 'duration 0.3000',
+    ]
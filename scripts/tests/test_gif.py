@@ -0,0 +1,53 @@
+import struct
+
+import pytest
+
+from gifcapture.gif import frame_delay_offsets, set_frame_delays
+
+
+def gif(frames=2, control=True):
+    """A 1x1 GIF with a global palette and ``frames`` images."""
+    data = bytearray(b'GIF89a' + struct.pack('<HHBBB', 1, 1, 0x80, 0, 0) + bytes(6))
+    for _ in range(frames):
+        if control:
+            data += b'\x21\xF9\x04\x00' + struct.pack('<H', 10) + b'\x00\x00'
+        data += b'\x2C' + struct.pack('<HHHHB', 0, 0, 1, 1, 0)
+        data += b'\x02\x02\x44\x01\x00'
+    return bytes(data + b'\x3B')
+
+
+def test_frame_delay_offsets_point_at_each_delay():
+    data = gif(3)
+    offsets = frame_delay_offsets(data)
+    assert len(offsets) == 3
+    assert all(struct.unpack_from('<H', data, offset) == (10,) for offset in offsets)
+
+
+def test_frame_delay_offsets_skip_other_extensions():
+    comment = b'\x21\xFE\x05hello\x00'
+    data = gif(1)
+    data = data[:19] + comment + data[19:]
+    assert len(frame_delay_offsets(data)) == 1
+
+
+def test_frames_without_a_control_extension_are_rejected():
+    with pytest.raises(ValueError, match='no graphic control extension'):
+        frame_delay_offsets(gif(1, control=False))
+    with pytest.raises(ValueError, match='not a GIF'):
+        frame_delay_offsets(b'\x89PNG\r\n\x1a\n')
+
+
+def test_set_frame_delays_rounds_and_clamps(tmp_path):
+    path = tmp_path / 'demo.gif'
+    path.write_bytes(gif(3))
+    set_frame_delays(path, [0.5, 0.004, 1000])
+    data = path.read_bytes()
+    delays = [struct.unpack_from('<H', data, offset)[0] for offset in frame_delay_offsets(data)]
+    assert delays == [50, 2, 0xFFFF]
+
+
+def test_set_frame_delays_needs_one_delay_per_frame(tmp_path):
+    path = tmp_path / 'demo.gif'
+    path.write_bytes(gif(2))
+    with pytest.raises(ValueError, match='2 frames but 1 delays'):
+        set_frame_delays(path, [0.1])
@@ -0,0 +1,258 @@
+import contextlib
+
+import pytest
+
+from gifcapture import scenario as scenario_module
+from gifcapture.manifest import FrameManifest
+from gifcapture.scenario import Scenario, Step, build_scenario
+from gifcapture.store import FrameRecorder, FrameStore, RunJournal, step_keys
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FrameStore(str(tmp_path / 'store'))
+
+
+def journal_for(store, keys):
+    journal = RunJournal(store.journal_path('demo'))
+    journal.begin(keys)
+    return journal
+
+
+def test_load_ignores_a_truncated_last_line(store):
+    journal = journal_for(store, ['k0', 'k1'])
+    journal.frame(store.put(b'a'), 0.1)
+    journal.step(0, 'goto', True, 1)
+    journal.close()
+    with open(journal.path, 'a') as f:
+        f.write('{"frame": ["ab')
+
+    loaded = RunJournal.load(journal.path)
+    assert loaded.keys == ['k0', 'k1']
+    assert len(loaded.frames) == 1
+    assert [event['step'] for event in loaded.steps] == [0]
+    assert not loaded.captured
+
+
+def test_a_step_is_completed_once_its_frames_are_journaled(store):
+    journal = journal_for(store, ['k0', 'k1', 'k2'])
+    journal.frame(store.put(b'a'), 0.1)
+    journal.step(0, 'capture', False, 1)
+    # Step 1 submitted two more frames, but the last one was never written
+    journal.frame(store.put(b'b'), 0.1)
+    journal.step(1, 'capture', False, 3)
+    journal.close()
+
+    loaded = RunJournal.load(journal.path)
+    assert [event['step'] for event in loaded.completed(['k0', 'k1', 'k2'], store)] == [0]
+    # A changed step key ends what can be kept
+    assert loaded.completed(['changed', 'k1', 'k2'], store) == []
+
+
+def test_resume_point_replays_from_the_last_checkpoint(store):
+    keys = ['k0', 'k1', 'k2', 'k3']
+    journal = journal_for(store, keys)
+    journal.step(0, 'goto', True, 0)
+    journal.frame(store.put(b'a'), 0.1)
+    journal.step(1, 'click', False, 1)
+    journal.step(2, 'menu_open', False, 1)
+    journal.close()
+    store.save_checkpoint('k0', {})
+
+    loaded = RunJournal.load(journal.path)
+    assert loaded.resume_point(keys, store) == (3, 1, 'k0')
+    assert [len(entry['frames']) for entry in loaded.step_entries(3)] == [0, 1, 0]
+
+
+def test_resume_point_without_a_checkpoint_replays_from_the_start(store):
+    keys = ['k0', 'k1']
+    journal = journal_for(store, keys)
+    journal.step(0, 'click', False, 0)
+    journal.close()
+    assert RunJournal.load(journal.path).resume_point(keys, store) == (1, 0, None)
+
+
+def test_begin_carries_over_completed_steps(store):
+    frame = store.put(b'a')
+    journal = journal_for(store, ['k0', 'k1'])
+    journal.begin(['k0', 'k1'], [
+        {'key': 'k0', 'action': 'capture', 'checkpoint': False, 'frames': [[frame, 0.5]]},
+    ])
+    journal.close()
+    loaded = RunJournal.load(journal.path)
+    assert loaded.frames == [[frame, 0.5]]
+    assert loaded.steps[0]['frames'] == 1
+
+
+def test_recorder_journals_frames_from_skip_on(store):
+    journal = journal_for(store, ['k0'])
+    recorder = FrameRecorder(store, framerate=10, journal=journal)
+    recorder.skip = 1
+    recorder.write(b'replayed', 0.3)
+    recorder.write(b'kept', None)
+    assert recorder.count == 2
+    journal.close()
+    assert journal.frames == [[store.put(b'kept'), 0.1]]
+
+
+class FakeRun:
+    """Stands in for ScenarioRun; frames reach the sink one behind, like VFR."""
+
+    runs = []
+
+    def __init__(self, scenario, browser, recorder, *args, checkpoint=None):
+        self.recorder = recorder
+        self.checkpoint = checkpoint
+        self.submitted = 0
+        self.step = None
+        self.held = None
+        self.ran = []
+        self.runs.append(self)
+        self.number = len(self.runs)
+
+    def begin_step(self, index):
+        self.step = index
+
+    def save_checkpoint(self):
+        return {'step': self.step}
+
+    def emit(self, action):
+        image = f'{action}@{self.number}'.encode()
+        self.submitted += 1
+        if self.held is not None:
+            self.recorder.write(self.held, 0.1)
+        self.held = image
+
+    def close(self):
+        if self.held is not None:
+            self.recorder.write(self.held, 0.1)
+
+
+class Browser:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+class Encoder:
+    def __init__(self, ok):
+        self.ok = ok
+
+
+def fake_step(action, crash):
+    def run(run):
+        run.ran.append(action)
+        if crash.get('before') == action:
+            raise RuntimeError('browser crashed')
+        if action.startswith(('capture', 'hover')):
+            run.emit(action)
+        if crash.get('after') == action:
+            raise RuntimeError('browser crashed')
+    return Step(action.split('-')[0], None, run)
+
+
+@pytest.fixture
+def flow(monkeypatch, store, tmp_path):
+    crash, encoded = {}, []
+    specs = [
+        {'action': 'goto', 'path': '/new'},
+        {'action': 'capture'},
+        {'action': 'click', 'testid': 'user-nav-button'},
+        {'action': 'scroll_to', 'y': 600},
+        {'action': 'hover_cards', 'selectors': ['.card']},
+        {'action': 'capture', 'repeat': 2},
+    ]
+    names = ['goto', 'capture-1', 'click', 'scroll_to', 'hover_cards', 'capture-2']
+    scenario = Scenario('demo', specs)
+    scenario.steps = [fake_step(name, crash) for name in names]
+
+    def encode(frames, *args, **kwargs):
+        encoded.append(list(frames))
+        return Encoder(not crash.get('encode'))
+
+    FakeRun.runs = []
+    monkeypatch.setattr(scenario_module, 'ScenarioRun', FakeRun)
+    monkeypatch.setattr(scenario_module, 'CaptureBrowser', Browser)
+    monkeypatch.setattr(scenario_module, 'sync_playwright', contextlib.nullcontext)
+    monkeypatch.setattr(scenario_module, 'encode_frames', encode)
+
+    def build(resume=False):
+        return build_scenario(scenario, 'polling', str(tmp_path / 'out'), resume=resume,
+                              store=store)
+    return scenario, crash, encoded, build
+
+
+def test_resume_replays_steps_after_the_checkpoint_and_keeps_their_frames(flow, store,
+                                                                          tmp_path):
+    scenario, crash, encoded, build = flow
+    crash['after'] = 'capture-2'
+    with pytest.raises(RuntimeError):
+        build()
+
+    crash.clear()
+    build(resume=True)
+    run = FakeRun.runs[-1]
+    assert run.checkpoint == {'step': 3}
+    # hover_cards is replayed to restore the page and its new frame dropped
+    assert run.ran == ['hover_cards', 'capture-2']
+    assert encoded[-1] == [b'capture-1@1', b'hover_cards@1', b'capture-2@2']
+    manifest = store.load_manifest('demo')
+    assert [len(step['frames']) for step in manifest['steps']] == [0, 1, 0, 0, 1, 1]
+    assert not RunJournal.load(store.journal_path('demo')).keys
+    timings = FrameManifest.load(str(tmp_path / 'out' / 'demo.frames.json'))
+    assert [frame['step'] for frame in timings.frames] == [1, 4, 5]
+
+
+def test_a_step_whose_last_frame_was_still_held_runs_again(flow, store):
+    scenario, crash, encoded, build = flow
+    # The hover frame is only written once the next frame arrives
+    crash['before'] = 'capture-2'
+    with pytest.raises(RuntimeError):
+        build()
+
+    crash.clear()
+    build(resume=True)
+    assert FakeRun.runs[-1].ran == ['hover_cards', 'capture-2']
+    assert encoded[-1] == [b'capture-1@1', b'hover_cards@2', b'capture-2@2']
+
+
+def test_resume_after_a_failed_encode_only_encodes(flow, store):
+    scenario, crash, encoded, build = flow
+    crash['encode'] = True
+    assert not build().ok
+    assert RunJournal.load(store.journal_path('demo')).captured
+
+    crash.clear()
+    runs = len(FakeRun.runs)
+    assert build(resume=True).ok
+    assert len(FakeRun.runs) == runs
+    assert encoded[-1] == encoded[0]
+
+
+def test_an_interrupted_journal_wins_over_the_previous_manifest(flow, store):
+    scenario, crash, encoded, build = flow
+    build()
+    keys = step_keys(scenario, 'polling')
+    assert store.load_manifest('demo')['steps'][-1]['key'] == keys[-1]
+
+    crash['after'] = 'capture-2'
+    with pytest.raises(RuntimeError):
+        build()
+    crash.clear()
+    build(resume=True)
+    # The manifest would re-capture hover_cards after the scroll_to
+    # checkpoint; the journal keeps the failed run's frames up to its crash
+    assert FakeRun.runs[-1].ran == ['hover_cards', 'capture-2']
+    assert encoded[-1] == [b'capture-1@2', b'hover_cards@2', b'capture-2@3']
+
+
+def test_without_resume_a_new_run_starts_over(flow, store):
+    scenario, crash, encoded, build = flow
+    crash['before'] = 'click'
+    with pytest.raises(RuntimeError):
+        build()
+    crash.clear()
+    build()
+    assert FakeRun.runs[-1].ran[0] == 'goto'
@@ -0,0 +1,30 @@
+from gifcapture.manifest import FrameManifest
+
+
+def test_manifest_round_trip(tmp_path):
+    manifest = FrameManifest()
+    manifest.add(10.0, 0.25, step=2)
+    manifest.add(10.25, None)
+    path = tmp_path / 'demo.frames.json'
+    manifest.save(path)
+
+    loaded = FrameManifest.load(path)
+    assert loaded.frames == [
+        {'index': 0, 'timestamp': 0.0, 'duration': 0.25, 'step': 2},
+        {'index': 1, 'timestamp': 0.25, 'duration': None},
+    ]
+    assert loaded.total_duration == 0.25
+
+
+def test_from_steps_lays_stored_frames_on_the_timeline():
+    steps = [
+        {'key': 'k0', 'frames': []},
+        {'key': 'k1', 'frames': [['a', 0.5], ['a', 0.5]]},
+        {'key': 'k2', 'frames': [['b', 0.25]]},
+    ]
+    manifest = FrameManifest.from_steps(steps)
+    # Repeated frames keep their own entries; the GIF merges them
+    assert [(f['index'], f['timestamp'], f['step']) for f in manifest.frames] == [
+        (0, 0, 1), (1, 0.5, 1), (2, 1.0, 2),
+    ]
+    assert manifest.total_duration == 1.25
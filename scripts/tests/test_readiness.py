@@ -0,0 +1,105 @@
+import contextlib
+
+import pytest
+
+from gifcapture import readiness
+from gifcapture.readiness import Readiness
+
+
+class Page:
+    def __init__(self, idle=True):
+        self.idle = idle
+        self.calls = []
+
+    def wait_for_selector(self, selector, state, timeout):
+        self.calls.append(('selector', selector, state, timeout))
+
+    def evaluate(self, script, arg):
+        self.calls.append(('animations', arg['selector'], arg['timeout']))
+        return 1
+
+    def wait_for_load_state(self, state, timeout):
+        self.calls.append(('load', state, timeout))
+        if not self.idle:
+            raise readiness.PlaywrightTimeoutError('networkidle not reached')
+
+    def wait_for_url(self, pattern, timeout):
+        self.calls.append(('url', pattern, timeout))
+
+
+class Backend:
+    def __init__(self, log):
+        self.log = log
+
+    @contextlib.contextmanager
+    def waiting(self):
+        self.log.append('waiting')
+        yield
+        self.log.append('done')
+
+
+class Engine:
+    def __init__(self):
+        self.log = []
+        self.backend = Backend(self.log)
+
+    def exclude_wait(self, seconds):
+        self.log.append(('excluded', seconds))
+
+
+def test_menu_open_waits_for_visibility_then_animations():
+    page = Page()
+    ready = Readiness(page, timeout=5000)
+    ready.menu_open('[role="menu"]')
+    assert page.calls == [
+        ('selector', '[role="menu"]', 'visible', 5000),
+        ('animations', '[role="menu"]', 5000),
+    ]
+    assert [label for label, _ in ready.waits] == [
+        'visible [role="menu"]', 'animations [role="menu"]',
+    ]
+
+
+def test_per_call_timeouts_override_the_default():
+    page = Page()
+    ready = Readiness(page)
+    ready.hidden('.spinner', timeout=250)
+    ready.url('**/pricing', timeout=900)
+    ready.animations_settled()
+    assert page.calls == [
+        ('selector', '.spinner', 'hidden', 250),
+        ('url', '**/pricing', 900),
+        ('animations', None, 15000),
+    ]
+    assert ready.waits[-1][0] == 'animations document'
+
+
+def test_network_that_never_goes_idle_just_times_out():
+    ready = Readiness(Page(idle=False))
+    ready.network_idle(timeout=100)
+    assert ready.waits[0][0] == 'network idle'
+
+
+def test_waits_are_kept_out_of_the_tracked_engine_timeline():
+    engine = Engine()
+    ready = Readiness(Page())
+    ready.track(engine)
+    ready.visible('.card')
+    assert engine.log[:2] == ['waiting', 'done']
+    assert engine.log[2] == ('excluded', ready.waits[0][1])
+    assert ready.total == ready.waits[0][1]
+    assert ready.report().startswith('1 waits, ')
+
+
+def test_a_failed_wait_is_still_recorded():
+    class Broken(Page):
+        def wait_for_url(self, pattern, timeout):
+            raise RuntimeError('navigation failed')
+
+    engine = Engine()
+    ready = Readiness(Broken())
+    ready.track(engine)
+    with pytest.raises(RuntimeError):
+        ready.url('**/done')
+    assert [label for label, _ in ready.waits] == ['url **/done']
+    assert engine.log[-1][0] == 'excluded'
@@ -0,0 +1,63 @@
+import functools
+
+from gifcapture.redact import Redactor
+
+
+class FakePage:
+    """Answers the layout script like a page with one sensitive element."""
+
+    def __init__(self):
+        self.box = {'x': 10, 'y': 10, 'width': 20, 'height': 10}
+        self.generation = 0
+        self.evaluations = 0
+
+    def expose_function(self, name, callback):
+        self.report_change = callback
+
+    def on(self, event, callback):
+        pass
+
+    def move(self, x, y):
+        # Like a class toggle: counted in the page, not yet reported to Python
+        self.box = {**self.box, 'x': x, 'y': y}
+        self.generation += 1
+
+    def evaluate(self, script, arg):
+        self.evaluations += 1
+        if arg['generation'] == self.generation:
+            return None
+        return {
+            'boxes': [dict(self.box)], 'generation': self.generation,
+            'scrollX': 0, 'scrollY': 0, 'width': 200, 'height': 100,
+        }
+
+
+def covered(boxes, x, y):
+    return any(
+        b['x'] <= x < b['x'] + b['width'] and b['y'] <= y < b['y'] + b['height'] for b in boxes
+    )
+
+
+def test_frame_grabbed_after_a_move_is_redacted_at_the_new_position():
+    page = FakePage()
+    redactor = Redactor(page, selectors=['.secret'], padding=0)
+    first = redactor.wrap(b'frame 1')
+    assert isinstance(first, functools.partial)
+    assert covered(first.args[1], 15, 15)
+
+    page.move(150, 60)
+    second = redactor.wrap(b'frame 2')
+    boxes = second.args[1]
+    assert covered(boxes, 155, 65)
+    # The frame may have been painted mid-move, so the path is covered too
+    assert covered(boxes, 80, 40)
+
+
+def test_unchanged_layout_is_not_reread():
+    page = FakePage()
+    redactor = Redactor(page, selectors=['.secret'])
+    redactor.wrap(b'frame 1')
+    reads = redactor.layout.reads
+    redactor.wrap(b'frame 2')
+    redactor.wrap(b'frame 3')
+    assert redactor.layout.reads == reads
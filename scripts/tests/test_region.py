@@ -0,0 +1,59 @@
+from gifcapture.region import CaptureRegion
+
+VIEWPORT = {'width': 1000, 'height': 800}
+# The sidebar's user-nav button, at the bottom edge of the viewport
+BUTTON = {'x': 100, 'y': 760, 'width': 200, 'height': 40}
+
+
+class FakePage:
+    """Answers the layout script with the boxes currently on the page."""
+
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.generation = 0
+
+    def expose_function(self, name, callback):
+        self.report_change = callback
+
+    def on(self, event, callback):
+        pass
+
+    def change(self, boxes):
+        self.boxes = boxes
+        self.generation += 1
+        self.report_change()
+
+    def evaluate(self, script, arg):
+        if arg['generation'] == self.generation:
+            return None
+        return {
+            'boxes': [dict(box) for box in self.boxes], 'generation': self.generation,
+            'scrollX': 0, 'scrollY': 0, **VIEWPORT,
+        }
+
+
+def test_an_element_at_the_edge_is_clipped_inside_the_viewport():
+    page = FakePage([BUTTON])
+    region = CaptureRegion(page, testids=['user-nav-button'], padding=16)
+    clip = region.clip()
+    # The padding below the button is off-screen, so the clip keeps it above
+    assert clip == {'x': 84, 'y': 728, 'width': 232, 'height': 72, 'scale': 1}
+
+    page.change([{**BUTTON, 'width': 190}])
+    assert region.clip() == clip
+    assert region.layout.reads == 2
+    assert not region.overflows
+
+
+def test_a_menu_opening_inside_the_reserved_box_does_not_move_the_clip():
+    page = FakePage([BUTTON])
+    region = CaptureRegion(page, testids=['user-nav-button'], padding=16,
+                           min_width=300, min_height=320)
+    clip = region.clip()
+    assert (clip['x'], clip['y'], clip['width'], clip['height']) == (50, 480, 300, 320)
+
+    # The menu opens above the button, a little right of its centre
+    menu = {'x': 110, 'y': 520, 'width': 210, 'height': 230}
+    page.change([BUTTON, menu])
+    assert region.clip() == clip
+    assert not region.overflows
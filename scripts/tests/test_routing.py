@@ -0,0 +1,93 @@
+import pytest
+
+from gifcapture.routing import RequestFilter
+
+
+class Request:
+    method = 'GET'
+
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class Response:
+    status = 200
+
+    def __init__(self, headers):
+        self.headers = {'content-type': 'image/png', **headers}
+
+    def body(self):
+        return b'pixels'
+
+
+class Route:
+    def __init__(self, url, resource_type='image', headers=None):
+        self.request = Request(url, resource_type)
+        self.response = Response(headers or {})
+        self.outcome = None
+
+    def abort(self, reason):
+        self.outcome = 'aborted'
+
+    def fallback(self):
+        self.outcome = 'network'
+
+    def fetch(self):
+        return self.response
+
+    def fulfill(self, response=None, **kwargs):
+        self.outcome = 'fetched' if response is not None else 'cached'
+
+
+@pytest.fixture
+def request_filter(tmp_path):
+    return RequestFilter(cache_dir=str(tmp_path / 'assets'))
+
+
+def served_twice(request_filter, url, resource_type='image', headers=None):
+    outcomes = []
+    for _ in range(2):
+        route = Route(url, resource_type, headers)
+        request_filter._handle(route)
+        outcomes.append(route.outcome)
+    return outcomes
+
+
+def test_blocked_urls_are_aborted(request_filter):
+    route = Route('https://o1.ingest.sentry.io/api/1/envelope/', 'fetch')
+    request_filter._handle(route)
+    assert route.outcome == 'aborted'
+    assert request_filter.blocked == 1
+
+
+def test_public_images_are_served_from_disk(request_filter):
+    headers = {'cache-control': 'public, max-age=60'}
+    assert served_twice(request_filter, 'https://app.example.com/logo.png',
+                        headers=headers) == ['fetched', 'cached']
+    assert request_filter.stored == request_filter.hits == 1
+
+
+@pytest.mark.parametrize('headers', [
+    {'cache-control': 'private, max-age=3600'},
+    {'cache-control': 'no-store'},
+    {'cache-control': 'No-Cache'},
+    {'set-cookie': 'session=1'},
+])
+def test_per_user_images_are_not_cached(request_filter, headers):
+    assert served_twice(request_filter, 'https://cdn.example.com/avatars/me.png',
+                        headers=headers) == ['fetched', 'fetched']
+    assert request_filter.stored == 0
+
+
+def test_next_static_files_need_immutable(request_filter):
+    chunk = 'https://app.example.com/_next/static/chunks/main.js'
+    assert served_twice(request_filter, chunk, 'script') == ['fetched', 'fetched']
+    headers = {'cache-control': 'public, max-age=31536000, immutable'}
+    assert served_twice(request_filter, chunk, 'script', headers) == ['fetched', 'cached']
+
+
+def test_other_requests_go_to_the_network(request_filter):
+    route = Route('https://app.example.com/api/plans', 'fetch')
+    request_filter._handle(route)
+    assert route.outcome == 'network'
@@ -0,0 +1,46 @@
+import asyncio
+import sys
+
+from gifcapture import runner
+
+
+def test_scenario_command_passes_flags():
+    command = runner.scenario_command('profile-dropdown', ['--resume', '--variant', 'retina'])
+    assert command == [
+        sys.executable, '-m', 'gifcapture.scenario', 'profile-dropdown',
+        '--resume', '--variant', 'retina',
+    ]
+
+
+def test_run_all_keeps_flags_when_launching_browser(monkeypatch):
+    launched, commands = [], []
+
+    class Browser:
+        async def close(self):
+            pass
+
+    class Chromium:
+        async def launch(self, **options):
+            launched.append(options)
+            return Browser()
+
+    class Playwright:
+        chromium = Chromium()
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def fake_run_scenario(name, scenario, endpoint, limit, backend, har=None, options=()):
+        commands.append(runner.scenario_command(scenario, options))
+        return runner.ScenarioResult(name, 0, 0.0, None)
+
+    monkeypatch.setattr(runner, 'browser_endpoint', lambda: None)
+    monkeypatch.setattr(runner, 'async_playwright', Playwright)
+    monkeypatch.setattr(runner, 'run_scenario', fake_run_scenario)
+    asyncio.run(runner.run_all(['dropdown'], options=['--incremental']))
+
+    assert launched and launched[0]['headless'] is True
+    assert commands == [runner.scenario_command('profile-dropdown', ['--incremental'])]
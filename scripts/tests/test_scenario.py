@@ -0,0 +1,100 @@
+import glob
+import json
+import os
+
+import pytest
+
+from gifcapture.scenario import SCENARIO_DIR, Scenario, ScenarioError, compile_step, load_scenario
+
+STEPS = [{'action': 'goto', 'path': '/'}, {'action': 'capture', 'repeat': 2}]
+
+
+def test_compile_step_binds_arguments():
+    step = compile_step('demo', 1, {'action': 'click', 'testid': 'save', 'log': 'Saving'})
+    assert step.action == 'click'
+    assert step.log == 'Saving'
+    assert step.run.keywords == {'testid': 'save'}
+
+
+def test_unknown_action():
+    with pytest.raises(ScenarioError, match=r"demo step 2: unknown action 'swipe'"):
+        compile_step('demo', 2, {'action': 'swipe'})
+    with pytest.raises(ScenarioError, match='unknown action None'):
+        compile_step('demo', 1, {'path': '/'})
+
+
+@pytest.mark.parametrize('spec', [
+    {'action': 'goto'},
+    {'action': 'scroll_to', 'x': 10},
+    {'action': 'hold', 'ms': 100, 'repeat': 2},
+])
+def test_bad_arguments_name_the_step(spec):
+    with pytest.raises(ScenarioError, match=rf"demo step 3 \({spec['action']}\): "):
+        compile_step('demo', 3, spec)
+
+
+def test_unknown_settings():
+    with pytest.raises(ScenarioError, match='demo: unknown settings colour, fps'):
+        Scenario('demo', STEPS, fps=10, colour='red')
+
+
+@pytest.mark.parametrize('key, value', [
+    ('region', {'testids': ['card'], 'margin': 4}),
+    ('redact', {'testids': ['email'], 'style': 'blur'}),
+])
+def test_bad_region_and_redact_arguments(key, value):
+    with pytest.raises(ScenarioError, match=f'demo {key}: '):
+        Scenario('demo', STEPS, **{key: value})
+
+
+def test_region_and_redact_arguments_are_accepted():
+    scenario = Scenario('demo', STEPS, region={'testids': ['card'], 'padding': 16},
+                        redact={'selectors': ['.email'], 'mode': 'blur'})
+    assert scenario.region['padding'] == 16
+    assert len(scenario.steps) == 2
+
+
+@pytest.mark.parametrize('matrix, message', [
+    (['tablet'], "unknown variant 'tablet'"),
+    ([{'viewport': {'width': 800, 'height': 600}}], 'variants need a name'),
+    ([{'name': 'wide', 'zoom': 2}], 'variants need a name'),
+    (['mobile', {'name': 'mobile', 'width': 400}], 'duplicate variants mobile'),
+])
+def test_bad_matrix(matrix, message):
+    with pytest.raises(ScenarioError, match=message):
+        Scenario('demo', STEPS, matrix=matrix)
+
+
+def test_matrix_variants():
+    scenario = Scenario('demo', STEPS, matrix=['retina', {'name': 'narrow', 'width': 600}],
+                        extra_outputs=[{'output': 'demo-800.gif', 'width': 800}])
+    retina, narrow = scenario.expand_matrix()
+    assert (retina.name, retina.output, retina.width) == ('demo-retina', 'demo-retina.gif', 2000)
+    assert retina.extra_outputs == [{'output': 'demo-800-retina.gif', 'width': 1600}]
+    assert (narrow.output, narrow.width) == ('demo-narrow.gif', 600)
+
+
+def test_load_scenario_needs_steps(tmp_path):
+    path = tmp_path / 'empty.json'
+    path.write_text(json.dumps({'width': 800}))
+    with pytest.raises(ScenarioError, match="empty: expected an object with a 'steps' list"):
+        load_scenario(str(path))
+
+
+def test_load_scenario_names_it_after_the_file(tmp_path):
+    path = tmp_path / 'flow.json'
+    path.write_text(json.dumps({'steps': STEPS, 'framerate': 8}))
+    scenario = load_scenario(str(path))
+    assert (scenario.name, scenario.output, scenario.framerate) == ('flow', 'flow.gif', 8)
+
+
+def test_missing_scenario():
+    with pytest.raises(ScenarioError, match="No scenario 'does-not-exist'"):
+        load_scenario('does-not-exist')
+
+
+@pytest.mark.parametrize('path', sorted(glob.glob(os.path.join(SCENARIO_DIR, '*.json'))))
+def test_shipped_scenarios_load(path):
+    scenario = load_scenario(path)
+    assert scenario.steps
+    scenario.expand_matrix()
@@ -0,0 +1,41 @@
+import pytest
+
+from gifcapture.scroll import cumulative_targets, ease_in_out_cubic, scroll_positions
+
+
+def test_easing_runs_from_zero_to_one_symmetrically():
+    assert ease_in_out_cubic(0) == 0
+    assert ease_in_out_cubic(0.5) == 0.5
+    assert ease_in_out_cubic(1) == 1
+    assert ease_in_out_cubic(0.25) == pytest.approx(1 - ease_in_out_cubic(0.75))
+    steps = [ease_in_out_cubic(k / 10) for k in range(11)]
+    assert steps == sorted(steps)
+
+
+def test_cumulative_targets():
+    assert cumulative_targets(100, [300, 300, -200]) == [400, 700, 500]
+    assert cumulative_targets(0, []) == []
+
+
+def test_one_frame_per_step_lands_on_each_target():
+    assert scroll_positions(0, [300, 600, 200]) == [300, 600, 200]
+
+
+def test_frames_are_eased_and_end_on_the_target():
+    positions = scroll_positions(0, [400], frames_per_step=4)
+    assert positions[-1] == 400
+    assert positions == sorted(positions)
+    # Slow at the start: the first frame moves less than a linear quarter
+    assert positions[0] < 100
+    assert positions[1] == 200
+
+
+def test_positions_are_clamped_to_the_scrollable_range():
+    positions = scroll_positions(100, [-300, 5000], frames_per_step=2, limit=1200)
+    assert positions == [50, 0, 600, 1200]
+    assert all(0 <= y <= 1200 for y in positions)
+
+
+def test_custom_easing():
+    linear = scroll_positions(0, [300], frames_per_step=3, easing=lambda t: t)
+    assert linear == [100, 200, 300]
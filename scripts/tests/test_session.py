@@ -0,0 +1,19 @@
+import json
+import os
+import stat
+
+from gifcapture.session import SessionCache
+
+
+class FakeContext:
+    def storage_state(self):
+        return {'cookies': [{'name': 'sb-access-token', 'value': 'secret'}], 'origins': []}
+
+
+def test_saved_session_is_private(tmp_path):
+    cache = SessionCache('https://app.example.com/', directory=str(tmp_path / 'sessions'))
+    cache.save(FakeContext())
+    with open(cache.path) as f:
+        assert json.load(f)['cookies'][0]['value'] == 'secret'
+    assert stat.S_IMODE(os.stat(cache.path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(tmp_path / 'sessions').st_mode) == 0o700
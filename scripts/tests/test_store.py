@@ -0,0 +1,111 @@
+import os
+import stat
+
+from gifcapture.scenario import Scenario
+from gifcapture.store import FrameStore, collapse, encoding_key, output_digests, step_keys
+
+STEPS = [
+    {'action': 'goto', 'path': '/new'},
+    {'action': 'capture', 'repeat': 2},
+    {'action': 'click', 'testid': 'user-nav-button'},
+]
+
+
+def scenario(steps=STEPS, **settings):
+    return Scenario('demo', steps, **settings)
+
+
+def test_step_keys_change_from_the_edited_step_on():
+    keys = step_keys(scenario(), 'polling')
+    edited = step_keys(scenario([*STEPS[:1], {'action': 'capture', 'repeat': 3}, *STEPS[2:]]),
+                       'polling')
+    assert len(set(keys)) == 3
+    assert edited[0] == keys[0]
+    assert edited[1] != keys[1] and edited[2] != keys[2]
+
+
+def test_step_keys_ignore_encode_settings_but_not_capture_settings():
+    keys = step_keys(scenario(), 'polling')
+    assert step_keys(scenario(width=800, formats=['webp']), 'polling') == keys
+    assert step_keys(scenario(framerate=12), 'polling')[0] != keys[0]
+    assert step_keys(scenario(), 'screencast')[0] != keys[0]
+
+
+def test_collapse_merges_consecutive_repeats_only():
+    frames = [['a', 0.1], ['a', 0.2], ['b', 0.1], ['a', 0.1]]
+    assert collapse(frames) == [['a', 0.3], ['b', 0.1], ['a', 0.1]]
+
+
+def test_encoding_key_covers_timing_and_outputs():
+    frames = [['a', 0.1]]
+    key = encoding_key(frames, 6, [('demo.gif', 1000)])
+    assert encoding_key([['a', 0.2]], 6, [('demo.gif', 1000)]) != key
+    assert encoding_key(frames, 6, [('demo.gif', 800)]) != key
+    assert encoding_key(frames, 6, [('demo.gif', 1000)], formats=['webp']) != key
+
+
+def test_resume_point_is_the_last_checkpoint_before_a_change(tmp_path):
+    store = FrameStore(str(tmp_path))
+    frame = store.put(b'frame')
+    keys = ['k0', 'k1', 'k2', 'k3']
+    manifest = {'steps': [
+        {'key': 'k0', 'checkpoint': True, 'frames': []},
+        {'key': 'k1', 'checkpoint': False, 'frames': [[frame, 0.1]]},
+        {'key': 'k2', 'checkpoint': True, 'frames': []},
+        {'key': 'old', 'checkpoint': True, 'frames': []},
+    ]}
+    store.save_checkpoint('k0', {})
+    store.save_checkpoint('k2', {})
+    assert store.resume_point(manifest, keys) == (3, 'k2')
+
+    # A checkpoint file that is gone can't be resumed from
+    os.remove(tmp_path / 'checkpoints' / 'k2.json')
+    assert store.resume_point(manifest, keys) == (1, 'k0')
+
+
+def test_resume_point_needs_the_frames_in_the_store(tmp_path):
+    store = FrameStore(str(tmp_path))
+    manifest = {'steps': [
+        {'key': 'k0', 'checkpoint': False, 'frames': [['missing', 0.1]]},
+        {'key': 'k1', 'checkpoint': True, 'frames': []},
+    ]}
+    store.save_checkpoint('k1', {})
+    assert store.resume_point(manifest, ['k0', 'k1']) == (0, None)
+
+
+def test_frame_store_keeps_identical_frames_once(tmp_path):
+    store = FrameStore(str(tmp_path))
+    key = store.put(b'same')
+    assert store.put(b'same') == key
+    assert store.get(key) == b'same'
+    assert (store.stored, store.reused) == (1, 1)
+
+
+def test_output_digests_change_with_content(tmp_path):
+    gif = tmp_path / 'demo.gif'
+    gif.write_bytes(b'GIF89a one')
+    missing = tmp_path / 'demo.webp'
+    before = output_digests([str(gif), str(missing)])
+    assert before[str(missing)] is None
+
+    gif.write_bytes(b'GIF89a two')
+    after = output_digests([str(gif)])
+    assert after[str(gif)] != before[str(gif)]
+
+
+def test_checkpoints_are_private_and_pruned(tmp_path):
+    store = FrameStore(str(tmp_path))
+    store.save_checkpoint('kept', {'storage_state': {'cookies': ['secret']}})
+    store.save_checkpoint('stale', {'storage_state': {'cookies': ['secret']}})
+    store.save_checkpoint('recent', {'storage_state': {'cookies': ['secret']}})
+    directory = tmp_path / 'checkpoints'
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(directory / 'kept.json').st_mode) == 0o600
+
+    store.save_manifest('demo', {'steps': [
+        {'key': 'kept', 'action': 'goto', 'checkpoint': True, 'frames': []},
+    ]})
+    for name in ('kept', 'stale'):
+        os.utime(directory / f'{name}.json', (0, 0))
+    assert store.prune_checkpoints() == 1
+    assert sorted(os.listdir(directory)) == ['kept.json', 'recent.json']
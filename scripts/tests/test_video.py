@@ -0,0 +1,62 @@
+import pytest
+
+from gifcapture.video import FrameSelector, VideoClip, change_score
+
+np = pytest.importorskip('numpy')
+
+
+def screen(value=255, box=None):
+    frame = np.full((40, 60, 3), value, dtype=np.uint8)
+    if box is not None:
+        top, left = box
+        frame[top:top + 10, left:left + 10] = 0
+    return frame
+
+
+def recording(*frames, fps=10):
+    return [(i / fps, frame) for i, frame in enumerate(frames)]
+
+
+def test_change_score_ignores_compression_noise():
+    reference = screen()
+    noisy = reference.copy()
+    noisy[::3, ::3] -= 8
+    assert change_score(noisy, reference) == 0
+    # A 10x10 box is 100 of 2400 pixels, sampled on every other row and column
+    assert change_score(screen(box=(0, 0)), reference) == pytest.approx(25 / 600)
+
+
+def test_a_held_screen_becomes_one_long_frame():
+    held, moved = screen(box=(0, 0)), screen(box=(0, 20))
+    selector = FrameSelector()
+    kept = list(selector.select(recording(held, held, held, moved, moved)))
+    assert [duration for _, duration in kept] == [pytest.approx(0.3), pytest.approx(0.1)]
+    assert kept[1][0] is moved
+    assert selector.report() == '2 of 5 video frames kept'
+
+
+def test_the_last_frame_plays_until_the_end_of_the_clip():
+    frames = recording(screen(box=(0, 0)), screen(box=(0, 20)))
+    kept = list(FrameSelector(playback_speed=2).select(frames, end=1.1))
+    assert [duration for _, duration in kept] == [pytest.approx(0.05), pytest.approx(0.5)]
+
+
+def test_min_interval_skips_intermediate_frames():
+    frames = recording(*(screen(box=(0, x)) for x in range(0, 50, 10)))
+    kept = list(FrameSelector(min_interval=0.2).select(frames))
+    assert [duration for _, duration in kept] == [
+        pytest.approx(0.2), pytest.approx(0.2), pytest.approx(0.1),
+    ]
+
+
+def test_small_changes_under_the_threshold_are_dropped():
+    cursor = screen()
+    cursor[0, 0] = 0
+    kept = list(FrameSelector(threshold=0.01).select(recording(screen(), cursor)))
+    assert len(kept) == 1
+
+
+def test_video_clip_needs_a_recorded_page():
+    page = type('Page', (), {'video': None, 'viewport_size': {'width': 60, 'height': 40}})()
+    with pytest.raises(RuntimeError, match='record_video_dir'):
+        VideoClip(page)